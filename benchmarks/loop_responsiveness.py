@@ -0,0 +1,112 @@
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, List
+from google.adk.tools import FunctionTool
+from muti_agent import market_data
+from muti_agent.subAgent.fundamental_analyzer import tools as fundamental_tools
+from muti_agent.subAgent.technical_analyzer import tools as technical_tools
+from .replay import ReplayTicker, synthesize
+
+SYNC_TOOLS = [
+    technical_tools.get_historical_prices,
+    technical_tools.calculate_technical_indicators,
+    fundamental_tools.get_financial_statements,
+    fundamental_tools.get_key_ratios,
+    fundamental_tools.get_analyst_ratings,
+]
+ASYNC_TOOLS = [
+    technical_tools.get_historical_prices_async,
+    technical_tools.calculate_technical_indicators_async,
+    fundamental_tools.get_financial_statements_async,
+    fundamental_tools.get_key_ratios_async,
+    fundamental_tools.get_analyst_ratings_async,
+]
+
+
+class SlowReplayTicker(ReplayTicker):
+    """ReplayTicker that waits `delay_s` on every payload, like a slow Yahoo response."""
+
+    def __init__(self, symbol: str, fixtures_dir: str, delay_s: float):
+        super().__init__(symbol, fixtures_dir)
+        self.delay_s = delay_s
+
+    @property
+    def info(self) -> dict:
+        time.sleep(self.delay_s)
+        return super().info
+
+    def history(self, *args, **kwargs):
+        time.sleep(self.delay_s)
+        return super().history(*args, **kwargs)
+
+    def _statement(self, name: str):
+        time.sleep(self.delay_s)
+        return super()._statement(name)
+
+
+async def _heartbeat(stop: asyncio.Event, lags: List[float], interval_s: float = 0.01) -> None:
+    # How much later than asked the loop wakes a sleeping task: ~0 when nothing blocks it
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval_s)
+        lags.append(loop.time() - start - interval_s)
+
+
+async def run_sessions(tools: List[Callable], symbols: List[str], sessions: int) -> dict:
+    """
+    `sessions` concurrent sessions, each calling every tool for its ticker one after another
+    through ADK's FunctionTool, exactly as an agent turn does, while a heartbeat measures loop lag.
+    """
+    declared = [FunctionTool(tool) for tool in tools]
+
+    async def session(symbol: str) -> None:
+        for tool in declared:
+            await tool.run_async(args={"ticker_symbol": symbol}, tool_context=None)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(session(symbols[i % len(symbols)]) for i in range(sessions)))
+    wall_s = time.perf_counter() - start
+    stop.set()
+    await heartbeat
+
+    ordered = sorted(lags) or [0.0]
+    return {
+        "wall_s": round(wall_s, 2),
+        "sessions_per_s": round(sessions / wall_s, 2),
+        "heartbeats": len(lags),
+        "loop_lag_p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "loop_lag_p99_ms": round(ordered[int(0.99 * (len(ordered) - 1))] * 1000, 1),
+        "loop_lag_max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+async def benchmark(sessions: int = 32, symbols: int = 16, delay_s: float = 0.1) -> dict:
+    """
+    Sync tools (what the agents registered before) against their async twins, with every yfinance
+    payload delayed by `delay_s`. Caches are emptied before each run, so every session fetches.
+    """
+    names = [f"SYM{i}" for i in range(symbols)]
+    report = {"sessions": sessions, "symbols": symbols, "yahoo_delay_s": delay_s, "workers": market_data.YFINANCE_WORKERS}
+    with tempfile.TemporaryDirectory() as fixtures_dir:
+        synthesize(names, fixtures_dir, articles=0)
+        try:
+            for label, tools in (("sync", SYNC_TOOLS), ("async", ASYNC_TOOLS)):
+                market_data.set_ticker_factory(lambda symbol: SlowReplayTicker(symbol, fixtures_dir, delay_s))
+                report[label] = await run_sessions(tools, names, sessions)
+        finally:
+            market_data.set_ticker_factory(None)
+    return report
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(asyncio.run(benchmark(sessions=int(os.getenv("SESSIONS", "32")))), indent=2))
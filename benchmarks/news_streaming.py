@@ -0,0 +1,105 @@
+import asyncio
+import os
+import re
+import statistics
+import tempfile
+import time
+from google.adk.agents import SequentialAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from muti_agent.agent import clone_agent
+from muti_agent.result_cache import ResultCache, set_result_cache
+from muti_agent.subAgent.news_analysis_pipeline import tools as news_tools
+from muti_agent.subAgent.news_analysis_pipeline.agent import news_analyzer_agent, news_batch_analyzer, news_collector, news_request_parser
+from muti_agent.subAgent.news_analysis_pipeline.cache import ArticleCache, get_article_cache, set_article_cache
+from muti_agent.subAgent.news_analysis_pipeline.extractor import close_http_client
+from muti_agent.subAgent.news_analysis_pipeline.streaming import StreamingNewsAgent
+from .replay import FixtureServer, synthesize
+from .stubs import StubLlm, stub_agent_tree
+
+SYMBOL = "NVDA"
+
+
+def build_pipelines(batch_size: int):
+    """The sequential pipeline (scrape everything, then analyze) and the streaming one, with fresh agents."""
+    batch = SequentialAgent(
+        name="batch_news_pipeline",
+        sub_agents=[clone_agent(news_collector, "batch_"), clone_agent(news_analyzer_agent, "batch_")],
+    )
+    streaming = StreamingNewsAgent(
+        name="streaming_news_pipeline",
+        sub_agents=[clone_agent(news_request_parser, "streaming_"), clone_agent(news_batch_analyzer, "streaming_")],
+        batch_size=batch_size,
+    )
+    return {"batch": batch, "streaming": streaming}
+
+
+def seed_links(fixtures_dir: str, origin: str) -> None:
+    # No browser here: put the fixture news page's links in the link cache, as a previous scrape would
+    with open(os.path.join(fixtures_dir, "html", "quote", SYMBOL, "news", "index.html"), encoding="utf-8") as f:
+        index = f.read()
+    links = [{"url": origin + href, "title": title} for href, title in re.findall(r"href='([^']+)' title='([^']+)'", index)]
+    get_article_cache().put_links(SYMBOL, links)
+
+
+async def run_once(agent, insight_authors) -> dict:
+    """Seconds until the first analysis text reaches the user, and until the run finishes."""
+    runner = InMemoryRunner(agent=agent, app_name="bench")
+    session = await runner.session_service.create_session(app_name="bench", user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text=f"Analyze the latest news of {SYMBOL}")])
+    first = None
+    start = time.perf_counter()
+    async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        has_text = event.content is not None and any(part.text for part in event.content.parts or [])
+        if first is None and has_text and event.author in insight_authors:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    session = await runner.session_service.get_session(app_name="bench", user_id="bench", session_id=session.id)
+    if "news_analysis_result" not in session.state:
+        raise RuntimeError("Pipeline finished without writing news_analysis_result")
+    return {"first_insight_s": first, "total_s": total}
+
+
+async def benchmark(runs: int = 3, articles: int = 6, slowest_s: float = 3.0, model_delay_s: float = 0.3, batch_size: int = 2) -> dict:
+    """
+    Time to first insight and total time of the sequential and the streaming news pipelines, with a
+    stub model and synthetic articles served locally with delays spread evenly up to `slowest_s`.
+    Caches are emptied before each run, so every article is fetched.
+    """
+    report = {"articles": articles, "slowest_article_s": slowest_s, "model_delay_s": model_delay_s, "batch_size": batch_size}
+    model = StubLlm(delay_s=model_delay_s, tool_args={"ticker": SYMBOL, "num_url": articles})
+
+    def delay(path: str) -> float:
+        # Article n of the synthetic set answers after (n + 1) / articles * slowest_s
+        match = re.search(r"-story-(\d+)-", path)
+        return (int(match.group(1)) + 1) / articles * slowest_s if match else 0.0
+
+    previous_url = news_tools.YAHOO_FINANCE_URL
+    with tempfile.TemporaryDirectory() as fixtures_dir:
+        synthesize([SYMBOL], fixtures_dir, articles=articles)
+        try:
+            with FixtureServer(fixtures_dir, delay_s=delay) as server:
+                news_tools.YAHOO_FINANCE_URL = server.url
+                for mode in ("batch", "streaming"):
+                    timings = []
+                    for _ in range(runs):
+                        set_result_cache(ResultCache(":memory:"))
+                        set_article_cache(ArticleCache(":memory:"))
+                        seed_links(fixtures_dir, server.url)
+                        agent = stub_agent_tree(build_pipelines(batch_size)[mode], model)
+                        insight_authors = {agent.name, agent.sub_agents[-1].name}
+                        timings.append(await run_once(agent, insight_authors))
+                    report[mode] = {
+                        key: round(statistics.median(timing[key] for timing in timings), 3)
+                        for key in ("first_insight_s", "total_s")
+                    }
+        finally:
+            news_tools.YAHOO_FINANCE_URL = previous_url
+            await close_http_client()
+    return report
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(asyncio.run(benchmark()), indent=2))
@@ -0,0 +1,47 @@
+import asyncio
+import statistics
+import time
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from muti_agent.agent import build_full_analysis_pipeline
+from muti_agent.result_cache import ResultCache, set_result_cache
+from .stubs import StubLlm, make_stub_data_tool, stub_agent_tree
+
+
+async def run_once(agent, prompt: str = "Give me a full analysis of NVDA") -> float:
+    runner = InMemoryRunner(agent=agent, app_name="bench")
+    session = await runner.session_service.create_session(app_name="bench", user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text=prompt)])
+    start = time.perf_counter()
+    async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        pass
+    elapsed = time.perf_counter() - start
+    session = await runner.session_service.get_session(app_name="bench", user_id="bench", session_id=session.id)
+    missing = [key for key in ("technical_analysis_result", "fundamental_analysis_result", "news_analysis_result", "full_analysis_result") if key not in session.state]
+    if missing:
+        raise RuntimeError(f"Pipeline finished without writing {missing}")
+    return elapsed
+
+
+async def benchmark(runs: int = 3, model_delay_s: float = 0.5, data_delay_s: float = 1.0) -> dict:
+    """
+    End-to-end latency of the full-analysis pipeline with branches run one after another vs. in a
+    ParallelAgent, using a stub model and stub data tools so only orchestration differs.
+    """
+    model = StubLlm(delay_s=model_delay_s)
+    tool = make_stub_data_tool(data_delay_s)
+    report = {"model_delay_s": model_delay_s, "data_delay_s": data_delay_s}
+    for mode, parallel in (("sequential", False), ("parallel", True)):
+        timings = []
+        for _ in range(runs):
+            # Every run must do the full work, not replay the previous run's results
+            set_result_cache(ResultCache(":memory:"))
+            agent = stub_agent_tree(build_full_analysis_pipeline(parallel=parallel), model, tool)
+            timings.append(await run_once(agent))
+        report[f"{mode}_median_s"] = round(statistics.median(timings), 3)
+    report["speedup"] = round(report["sequential_median_s"] / report["parallel_median_s"], 2)
+    return report
+
+
+if __name__ == "__main__":
+    print(asyncio.run(benchmark()))
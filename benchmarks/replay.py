@@ -0,0 +1,230 @@
+import contextlib
+import functools
+import io
+import json
+import os
+import re
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from muti_agent import market_data
+from muti_agent.subAgent.news_analysis_pipeline import tools as news_tools
+
+# Layout of a fixtures directory:
+#   market/<SYMBOL>/info.json, history_<period>_<interval>.json, <statement>.json, calendar.json
+#   html/quote/<SYMBOL>/news/index.html, html/news/<slug>.html
+# Frames are pandas JSON ("table" for histories, which keeps the tz-aware index; "split" for statements).
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+YAHOO_ORIGIN = "https://finance.yahoo.com"
+
+
+def _market_dir(fixtures_dir: str, symbol: str) -> str:
+    return os.path.join(fixtures_dir, "market", symbol.upper())
+
+
+def _write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+class ReplayTicker:
+    """Serves the yf.Ticker attributes market_data reads from recorded fixture files."""
+
+    def __init__(self, symbol: str, fixtures_dir: str = DEFAULT_FIXTURES_DIR):
+        self.ticker = symbol.upper()
+        self._dir = _market_dir(fixtures_dir, symbol)
+
+    @property
+    def info(self) -> dict:
+        return json.loads(_read(os.path.join(self._dir, "info.json")))
+
+    def history(self, period: str = "1mo", interval: str = "1d", **kwargs) -> pd.DataFrame:
+        path = os.path.join(self._dir, f"history_{period}_{interval}.json")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        hist = pd.read_json(io.StringIO(_read(path)), orient="table")
+        if hist.empty:
+            return hist
+        # Periods are sliced relative to today, so move the recording to end today
+        return hist.set_index(hist.index + (pd.Timestamp.now(tz=hist.index.tz).normalize() - hist.index[-1].normalize()))
+
+    def _statement(self, name: str) -> pd.DataFrame:
+        path = os.path.join(self._dir, f"{name}.json")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_json(io.StringIO(_read(path)), orient="split")
+
+    financials = property(lambda self: self._statement("financials"))
+    balance_sheet = property(lambda self: self._statement("balance_sheet"))
+    cashflow = property(lambda self: self._statement("cashflow"))
+
+    @property
+    def calendar(self):
+        path = os.path.join(self._dir, "calendar.json")
+        return json.loads(_read(path)) if os.path.exists(path) else {}
+
+
+def record_market_data(symbols: List[str], fixtures_dir: str = DEFAULT_FIXTURES_DIR, periods=(("1y", "1d"),)) -> None:
+    """Saves live yfinance payloads for `symbols` in the layout ReplayTicker reads."""
+    import yfinance as yf
+
+    for symbol in symbols:
+        ticker = yf.Ticker(symbol)
+        base = _market_dir(fixtures_dir, symbol)
+        _write(os.path.join(base, "info.json"), json.dumps(ticker.info, default=str))
+        for period, interval in periods:
+            hist = ticker.history(period=period, interval=interval)
+            _write(os.path.join(base, f"history_{period}_{interval}.json"), hist.to_json(orient="table", date_unit="ns"))
+        for statement in market_data.STATEMENTS:
+            _write(os.path.join(base, f"{statement}.json"), getattr(ticker, statement).to_json(orient="split", date_format="iso"))
+        _write(os.path.join(base, "calendar.json"), json.dumps(ticker.calendar, default=str))
+
+
+def _offline_html(html: str) -> str:
+    """Drops scripts and makes Yahoo links relative, so a saved page renders the same from the fixture server."""
+    html = re.sub(r"<script\b[^>]*>.*?</script>", "", html, flags=re.IGNORECASE | re.DOTALL)
+    return html.replace(YAHOO_ORIGIN + "/", "/")
+
+
+async def record_news(symbols: List[str], fixtures_dir: str = DEFAULT_FIXTURES_DIR, num_url: int = 5) -> None:
+    """Saves each symbol's rendered Yahoo news page and its first `num_url` article pages."""
+    from muti_agent.subAgent.news_analysis_pipeline.browser_pool import get_browser_pool, shutdown_browser_pool
+
+    pool = await get_browser_pool()
+    try:
+        for symbol in symbols:
+            links = await news_tools.collect_article_links(symbol, pool)
+            pages = [(f"{YAHOO_ORIGIN}/quote/{symbol}/news/", os.path.join("quote", symbol, "news", "index.html"))]
+            pages += [(link["url"], link["url"].split(YAHOO_ORIGIN + "/", 1)[-1]) for link in links[:num_url]]
+            for url, relative in pages:
+                async with pool.lease_page() as page:
+                    await page.goto(url, wait_until="load", timeout=60000)
+                    html = await page.content()
+                _write(os.path.join(fixtures_dir, "html", relative), _offline_html(html))
+    finally:
+        await shutdown_browser_pool()
+
+
+def synthesize(symbols: List[str], fixtures_dir: str = DEFAULT_FIXTURES_DIR, articles: int = 6, seed: int = 7) -> None:
+    """
+    Writes deterministic synthetic fixtures in the recorded layout, so the suite runs on a machine
+    that has never reached Yahoo. Shapes match the real payloads (one year of daily bars, four
+    annual statement columns, Yahoo's article markup); values are seeded random walks.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2025-06-13", periods=252, tz="America/New_York").rename("Date")
+    years = [pd.Timestamp(f"{2024 - i}-12-31") for i in range(4)]
+    for symbol in symbols:
+        base = _market_dir(fixtures_dir, symbol)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+        hist = pd.DataFrame({
+            "Open": close * (1 + rng.normal(0, 0.005, len(index))),
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": rng.integers(1_000_000, 100_000_000, len(index)),
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        }, index=index)
+        _write(os.path.join(base, "history_1y_1d.json"), hist.to_json(orient="table", date_unit="ns"))
+        revenue = rng.uniform(1e10, 1e11) * np.array([1.0, 0.9, 0.8, 0.7])
+        statements = {
+            "financials": {"Total Revenue": revenue, "Gross Profit": revenue * 0.6, "Operating Income": revenue * 0.3, "Net Income": revenue * 0.2},
+            "balance_sheet": {"Total Assets": revenue * 2, "Total Debt": revenue * 0.4, "Stockholders Equity": revenue * 1.1, "Cash And Cash Equivalents": revenue * 0.3},
+            "cashflow": {"Operating Cash Flow": revenue * 0.35, "Capital Expenditure": -revenue * 0.05, "Free Cash Flow": revenue * 0.3},
+        }
+        for name, rows in statements.items():
+            frame = pd.DataFrame(rows, index=years).T
+            _write(os.path.join(base, f"{name}.json"), frame.to_json(orient="split", date_format="iso"))
+        info = {
+            "symbol": symbol, "marketCap": int(revenue[0] * 10), "trailingPE": round(float(rng.uniform(10, 60)), 2),
+            "returnOnEquity": round(float(rng.uniform(0.05, 0.5)), 4), "grossMargins": 0.6, "recommendationKey": "buy",
+            "targetMeanPrice": round(float(close[-1] * 1.1), 2), "targetHighPrice": round(float(close[-1] * 1.4), 2),
+            "targetLowPrice": round(float(close[-1] * 0.8), 2),
+        }
+        _write(os.path.join(base, "info.json"), json.dumps(info))
+        _write(os.path.join(base, "calendar.json"), json.dumps({"Earnings Date": ["2025-08-27"]}))
+
+        items = []
+        for n in range(articles):
+            slug = f"{symbol.lower()}-story-{n}-{seed}.html"
+            # Random headline words, so title SimHash dedup keeps every synthetic story
+            title = f"{symbol} " + " ".join(f"t{int(x)}" for x in rng.integers(0, 5000, 8))
+            paragraphs = "".join(
+                f"<p>{symbol} paragraph {p} of story {n}. " + " ".join(f"w{int(x)}" for x in rng.integers(0, 5000, 40)) + ".</p>"
+                for p in range(8)
+            )
+            _write(os.path.join(fixtures_dir, "html", "news", slug), (
+                f"<html><body><main><h1 class='cover-title'>{title}</h1>"
+                f"<time class='byline-attr-meta-time'>Fri, Jun 13, 2025, 9:{n:02d} AM</time>"
+                f"<div class='caas-body'>{paragraphs}<div class='caas-da'>Advertisement</div></div></main></body></html>"
+            ))
+            items.append(f"<li class='stream-item'><a href='/news/{slug}' title='{title}'>{title}</a></li>")
+        _write(os.path.join(fixtures_dir, "html", "quote", symbol, "news", "index.html"),
+               f"<html><body><main><ul>{''.join(items)}</ul></main></body></html>")
+
+
+class FixtureServer:
+    """
+    Serves the fixtures' html/ tree on 127.0.0.1 in a background thread. `delay_s`, if given, maps a
+    request path to the seconds to wait before answering it, e.g. to make some articles slow.
+    """
+
+    def __init__(self, fixtures_dir: str = DEFAULT_FIXTURES_DIR, port: int = 0, delay_s: Optional[Callable[[str], float]] = None):
+        handler = functools.partial(_QuietHandler, directory=os.path.join(fixtures_dir, "html"), delay_s=delay_s)
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, delay_s: Optional[Callable[[str], float]] = None, **kwargs):
+        self.delay_s = delay_s
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.delay_s is not None:
+            time.sleep(self.delay_s(self.path))
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def replay(fixtures_dir: str = DEFAULT_FIXTURES_DIR) -> Iterator[FixtureServer]:
+    """
+    Points market_data at ReplayTicker and the news scraper at a local fixture server for the
+    duration of the block; both are restored afterwards.
+    """
+    previous_url = news_tools.YAHOO_FINANCE_URL
+    market_data.set_ticker_factory(lambda symbol: ReplayTicker(symbol, fixtures_dir))
+    try:
+        with FixtureServer(fixtures_dir) as server:
+            news_tools.YAHOO_FINANCE_URL = server.url
+            yield server
+    finally:
+        news_tools.YAHOO_FINANCE_URL = previous_url
+        market_data.set_ticker_factory(None)
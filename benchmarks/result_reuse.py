@@ -0,0 +1,28 @@
+import asyncio
+import statistics
+from muti_agent.agent import build_full_analysis_pipeline
+from muti_agent.result_cache import ResultCache, get_result_cache, set_result_cache
+from .parallel_fanout import run_once
+from .stubs import StubLlm, make_stub_data_tool, stub_agent_tree
+
+
+async def benchmark(sessions: int = 5, model_delay_s: float = 0.5, data_delay_s: float = 1.0) -> dict:
+    """
+    Latency of the full-analysis pipeline for the same ticker asked in several fresh sessions,
+    with a stub model and stub data tools. The first session runs every analyzer; the others should
+    be served from the cross-session result cache (only the synthesis step still calls the model).
+    """
+    set_result_cache(ResultCache(":memory:"))
+    # The stub tools are called with the ticker, which is what lets the cache store their analyses
+    model = StubLlm(delay_s=model_delay_s, tool_args={"ticker_symbol": "NVDA"})
+    agent = stub_agent_tree(build_full_analysis_pipeline(), model, make_stub_data_tool(data_delay_s))
+    timings = [await run_once(agent) for _ in range(sessions)]
+    return {
+        "first_session_s": round(timings[0], 3),
+        "later_sessions_median_s": round(statistics.median(timings[1:]), 3),
+        "cache": get_result_cache().stats(),
+    }
+
+
+if __name__ == "__main__":
+    print(asyncio.run(benchmark()))
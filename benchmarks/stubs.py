@@ -0,0 +1,86 @@
+import asyncio
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
+from google.adk.agents import LlmAgent
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+
+class StubLlm(BaseLlm):
+    """
+    Offline stand-in for Gemini. Waits `delay_s` per call; on the first call of an agent that has
+    tools it asks for the first tool (or, with `call_all_tools`, every tool except agent transfers
+    in one turn), afterwards (or without tools) it answers with fixed text. Responses carry
+    estimated token counts.
+    Tool arguments are filled from `tool_args` by parameter name, e.g. {"ticker_symbol": "NVDA"}, or
+    from `tool_args_fn`, which builds them from the user text of the request.
+    """
+
+    model: str = "stub-llm"
+    delay_s: float = 0.5
+    text: str = "Stub analysis."
+    tool_args: Dict[str, Any] = {}
+    tool_args_fn: Optional[Callable[[str], Dict[str, Any]]] = None
+    call_all_tools: bool = False
+
+    def _call(self, name: str, tool, available: Dict[str, Any]) -> types.Part:
+        declaration = tool._get_declaration()
+        properties = declaration.parameters.properties if declaration and declaration.parameters else {}
+        args = {key: value for key, value in available.items() if key in (properties or {})}
+        return types.Part(function_call=types.FunctionCall(name=name, args=args))
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.delay_s)
+        called_tool = any(part.function_response for content in llm_request.contents for part in (content.parts or []))
+        if llm_request.tools_dict and not called_tool:
+            tools = [(name, tool) for name, tool in llm_request.tools_dict.items() if name != "transfer_to_agent"]
+            if not self.call_all_tools:
+                tools = tools[:1]
+            available = dict(self.tool_args)
+            if self.tool_args_fn is not None:
+                request = " ".join(part.text for content in llm_request.contents if content.role == "user" for part in (content.parts or []) if part.text)
+                available.update(self.tool_args_fn(request))
+            parts = [self._call(name, tool, available) for name, tool in tools] or [types.Part(text=self.text)]
+        else:
+            parts = [types.Part(text=self.text)]
+        # Rough token counts (4 characters per token), so traces show usage like a real model's
+        prompt_chars = sum(len(content.model_dump_json(exclude_none=True)) for content in llm_request.contents)
+        output_chars = sum(len(part.model_dump_json(exclude_none=True)) for part in parts)
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_chars // 4,
+            candidates_token_count=output_chars // 4,
+            total_token_count=(prompt_chars + output_chars) // 4,
+        )
+        yield LlmResponse(content=types.Content(role="model", parts=parts), usage_metadata=usage)
+
+
+def make_stub_data_tool(delay_s: float):
+    """Returns a tool that stands in for yfinance/Playwright and just waits `delay_s`."""
+
+    async def fetch_stub_data(ticker_symbol: str = "") -> dict:
+        """Returns canned market data."""
+        await asyncio.sleep(delay_s)
+        return {"status": "ok", "source": "stub", "ticker_symbol": ticker_symbol}
+
+    return fetch_stub_data
+
+
+def stub_agent_tree(agent: BaseAgent, model: BaseLlm, tool=None) -> BaseAgent:
+    """
+    Points every LlmAgent in the tree at `model` and swaps its tools for `tool`. Without `tool`
+    the real tools stay, and agents wrapped in an AgentTool are stubbed as well.
+    """
+    if isinstance(agent, LlmAgent):
+        agent.model = model
+        if tool is not None:
+            agent.tools = [tool] if agent.tools else []
+        else:
+            for agent_tool in agent.tools:
+                if isinstance(agent_tool, AgentTool):
+                    stub_agent_tree(agent_tool.agent, model)
+    for sub_agent in agent.sub_agents:
+        stub_agent_tree(sub_agent, model, tool)
+    return agent
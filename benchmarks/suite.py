@@ -0,0 +1,268 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from muti_agent import market_data
+from muti_agent.agent import root_agent
+from muti_agent.result_cache import ResultCache, request_ticker, set_result_cache
+from muti_agent.subAgent.fundamental_analyzer.tools import get_financial_statements_async
+from muti_agent.subAgent.technical_analyzer.tools import calculate_technical_indicators_async
+from muti_agent.subAgent.news_analysis_pipeline.browser_pool import shutdown_browser_pool
+from muti_agent.subAgent.news_analysis_pipeline.cache import ArticleCache, set_article_cache
+from muti_agent.subAgent.news_analysis_pipeline.extractor import close_http_client
+from muti_agent.subAgent.news_analysis_pipeline.tools import scrape_news
+from .replay import DEFAULT_FIXTURES_DIR, record_market_data, record_news, replay, synthesize
+from .stubs import StubLlm, stub_agent_tree
+
+SCENARIOS = ("calculate_technical_indicators", "get_financial_statements", "scrape_news", "root_agent")
+# A p50 this much slower than the baseline counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+class ResourceSampler:
+    """
+    Samples, in a background thread, the RSS of this process plus its descendants (Chromium and its
+    helpers) and how many descendant Chromium processes exist. Reads /proc, so Linux only; elsewhere
+    it falls back to this process's own peak RSS.
+    """
+
+    def __init__(self, interval_s: float = 0.05):
+        self.interval_s = interval_s
+        self.peak_rss_mb = 0.0
+        self.peak_chromium = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _processes() -> Dict[int, tuple]:
+        processes = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    stat = f.read()
+                # comm is parenthesized and may contain spaces; ppid follows the closing paren
+                name = stat[stat.index("(") + 1:stat.rindex(")")]
+                ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+                with open(f"/proc/{entry}/statm") as f:
+                    rss_pages = int(f.read().split()[1])
+                processes[int(entry)] = (ppid, name, rss_pages * os.sysconf("SC_PAGE_SIZE"))
+            except (OSError, ValueError, IndexError):
+                continue
+        return processes
+
+    def sample(self) -> None:
+        if not os.path.isdir("/proc"):
+            import resource
+
+            self.peak_rss_mb = max(self.peak_rss_mb, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+            return
+        processes = self._processes()
+        tree = {os.getpid()}
+        # Parents are usually listed before children, but repeat until the set stops growing
+        while True:
+            grown = {pid for pid, (ppid, _, _) in processes.items() if ppid in tree} - tree
+            if not grown:
+                break
+            tree |= grown
+        rss = sum(processes[pid][2] for pid in tree if pid in processes)
+        chromium = sum(1 for pid in tree if pid in processes and "chrom" in processes[pid][1].lower())
+        self.peak_rss_mb = max(self.peak_rss_mb, rss / 2**20)
+        self.peak_chromium = max(self.peak_chromium, chromium)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.sample()
+
+    def __enter__(self) -> "ResourceSampler":
+        self.sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+def reset_caches() -> None:
+    """Empties every cache a scenario could be served from, so a run does the full work."""
+    market_data.clear_cache()
+    set_article_cache(ArticleCache(":memory:"))
+    set_result_cache(ResultCache(":memory:"))
+
+
+def build_scenarios(model_delay_s: float) -> Dict[str, Callable[[str], Awaitable[bool]]]:
+    """Scenario name -> coroutine function taking a symbol and returning whether the call succeeded."""
+
+    async def technical(symbol: str) -> bool:
+        return "error" not in await calculate_technical_indicators_async(symbol)
+
+    async def fundamental(symbol: str) -> bool:
+        statements = await get_financial_statements_async(symbol)
+        return "error" not in statements and bool(statements["metrics"])
+
+    async def news(symbol: str) -> bool:
+        articles = await scrape_news(symbol, num_url=5)
+        return any("error" not in article for article in articles)
+
+    # Root model calls every tool it has (both analyzer AgentTools and get_current_time) in one turn;
+    # the analyzers' stub models then call their real tools against the replayed data
+    def args_for(request: str) -> dict:
+        symbol = request_ticker(request)
+        return {"ticker_symbol": symbol, "ticker_symbols": [symbol], "request": f"Analyze {symbol}"}
+
+    agent = stub_agent_tree(root_agent, StubLlm(delay_s=model_delay_s, call_all_tools=True, tool_args_fn=args_for))
+
+    async def root(symbol: str) -> bool:
+        runner = InMemoryRunner(agent=agent, app_name="bench")
+        session = await runner.session_service.create_session(app_name="bench", user_id="bench")
+        message = types.Content(role="user", parts=[types.Part(text=f"Give me a technical and fundamental analysis of {symbol}")])
+        final = None
+        async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            if event.is_final_response():
+                final = event
+        return final is not None
+
+    return {
+        "calculate_technical_indicators": technical,
+        "get_financial_statements": fundamental,
+        "scrape_news": news,
+        "root_agent": root,
+    }
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+async def run_scenario(name: str, call: Callable[[str], Awaitable[bool]], symbols: List[str], runs: int, concurrency: int, warm: bool) -> dict:
+    """
+    Latency of `runs` sequential calls (cycling through `symbols`), then throughput of a burst of
+    `concurrency` x len(symbols) concurrent calls. Cold mode empties every cache before each call
+    (and before the burst); warm mode empties them once, so only the first call is cold.
+    """
+    reset_caches()
+    timings = []
+    errors = 0
+    with ResourceSampler() as sampler:
+        for i in range(runs):
+            if not warm:
+                reset_caches()
+            symbol = symbols[i % len(symbols)]
+            start = time.perf_counter()
+            try:
+                ok = await call(symbol)
+            except Exception:
+                ok = False
+            timings.append(time.perf_counter() - start)
+            errors += not ok
+
+        if not warm:
+            reset_caches()
+        burst = [symbol for symbol in symbols for _ in range(concurrency)]
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(call(symbol) for symbol in burst), return_exceptions=True)
+        burst_s = time.perf_counter() - start
+        errors += sum(outcome is not True for outcome in outcomes)
+
+    return {
+        "scenario": name,
+        "mode": "warm" if warm else "cold",
+        "runs": runs,
+        "errors": errors,
+        "p50_ms": round(_percentile(timings, 0.5) * 1000, 2),
+        "p90_ms": round(_percentile(timings, 0.9) * 1000, 2),
+        "p99_ms": round(_percentile(timings, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 2),
+        "throughput_per_s": round(len(burst) / burst_s, 2),
+        "peak_rss_mb": round(sampler.peak_rss_mb, 1),
+        "peak_chromium_processes": sampler.peak_chromium,
+    }
+
+
+async def run_suite(fixtures_dir: str, scenarios=SCENARIOS, runs: int = 10, concurrency: int = 4, model_delay_s: float = 0.0) -> List[dict]:
+    """Runs every scenario cold and warm against the fixtures, with no network access needed."""
+    symbols = sorted(os.listdir(os.path.join(fixtures_dir, "market")))
+    report = []
+    with replay(fixtures_dir):
+        calls = build_scenarios(model_delay_s)
+        try:
+            for name in scenarios:
+                for warm in (False, True):
+                    report.append(await run_scenario(name, calls[name], symbols, runs, concurrency, warm))
+        finally:
+            await shutdown_browser_pool()
+            await close_http_client()
+    return report
+
+
+def compare(report: List[dict], baseline: List[dict], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Regressions against a saved report: slower p50 beyond `tolerance`, lower throughput, or new errors."""
+    previous = {(row["scenario"], row["mode"]): row for row in baseline}
+    regressions = []
+    for row in report:
+        old = previous.get((row["scenario"], row["mode"]))
+        if old is None:
+            continue
+        label = f"{row['scenario']} ({row['mode']})"
+        if row["p50_ms"] > old["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p50 {old['p50_ms']} -> {row['p50_ms']} ms")
+        if row["throughput_per_s"] < old["throughput_per_s"] / (1 + tolerance):
+            regressions.append(f"{label}: throughput {old['throughput_per_s']} -> {row['throughput_per_s']} /s")
+        if row["errors"] > old["errors"]:
+            regressions.append(f"{label}: errors {old['errors']} -> {row['errors']}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline replay benchmarks for the stock agent tools and root agent.")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR, help="fixtures directory (market/ and html/)")
+    parser.add_argument("--record", nargs="+", metavar="SYMBOL", help="record live Yahoo data for these symbols, then exit")
+    parser.add_argument("--synthesize", nargs="*", metavar="SYMBOL", help="write synthetic fixtures (default NVDA AAPL MSFT), then run")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--model-delay", type=float, default=0.0, help="seconds the stub model waits per call")
+    parser.add_argument("--save", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="compare with a saved report and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_market_data(args.record, args.fixtures)
+        asyncio.run(record_news(args.record, args.fixtures))
+        return 0
+    if args.synthesize is not None:
+        synthesize(args.synthesize or ["NVDA", "AAPL", "MSFT"], args.fixtures)
+
+    report = asyncio.run(run_suite(args.fixtures, args.scenarios, args.runs, args.concurrency, args.model_delay))
+    for row in report:
+        print(json.dumps(row))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,59 @@
-from google.adk.agents import Agent,SequentialAgent, LlmAgent
+from google.adk.agents import Agent,SequentialAgent, LlmAgent, ParallelAgent
+from google.adk.agents.base_agent import BaseAgent
 from google.adk.tools.agent_tool import AgentTool
 from .subAgent.fundamental_analyzer.agent import fundamental_analyzer_agent
 from .subAgent.technical_analyzer.agent import technical_analyzer
 from .subAgent.news_analysis_pipeline.agent import news_analysis_pipeline
-from .prompt import ROOT_AGENT_PROMPT
+from .prompt import ROOT_AGENT_PROMPT, SYNTHESIS_PROMPT
 from .tools import get_current_time
+from .prefetch import start_prefetch_callback
+from .telemetry import configure_tracing, instrument_agent
+
+
+def clone_agent(agent: BaseAgent, prefix: str) -> BaseAgent:
+    """
+    Copies an agent (and its sub-agents) under a prefixed name.
+    An ADK agent can only have one parent, so the parallel stage needs its own copies.
+    """
+    clone = agent.model_copy(update={
+        "name": f"{prefix}{agent.name}",
+        "parent_agent": None,
+        "sub_agents": [clone_agent(sub_agent, prefix) for sub_agent in agent.sub_agents],
+    })
+    for sub_agent in clone.sub_agents:
+        sub_agent.parent_agent = clone
+    return clone
+
+
+def build_full_analysis_pipeline(parallel: bool = True) -> SequentialAgent:
+    """
+    Technical, fundamental and news analysis for one ticker, followed by a synthesis step.
+    The three branches are independent and write their own output_key into session state,
+    so by default they run concurrently in a ParallelAgent.
+    """
+    branches = [
+        clone_agent(technical_analyzer, "full_"),
+        clone_agent(fundamental_analyzer_agent, "full_"),
+        clone_agent(news_analysis_pipeline, "full_"),
+    ]
+    synthesis = LlmAgent(
+        name="full_analysis_synthesis",
+        model="gemini-2.5-flash-preview-05-20",
+        instruction=SYNTHESIS_PROMPT,
+        output_key="full_analysis_result",
+    )
+    if parallel:
+        stages = [ParallelAgent(name="parallel_analysis", sub_agents=branches), synthesis]
+    else:
+        stages = [*branches, synthesis]
+    return SequentialAgent(
+        name="full_analysis_pipeline",
+        description="Runs technical, fundamental and news analysis for one ticker at the same time, then combines them into one report.",
+        sub_agents=stages,
+    )
+
+
+full_analysis_pipeline = build_full_analysis_pipeline()
 
 root_agent = LlmAgent(
     name="Stock_Agent",
@@ -13,6 +62,7 @@ root_agent = LlmAgent(
     instruction=ROOT_AGENT_PROMPT,
     sub_agents=[
         news_analysis_pipeline,
+        full_analysis_pipeline,
         ],
     
     tools=[
@@ -20,4 +70,10 @@ root_agent = LlmAgent(
         AgentTool(agent=fundamental_analyzer_agent),  
         get_current_time
         ],
+    # Starts the watchlist warm-up (PREFETCH_WATCHLIST) inside the server's event loop
+    before_agent_callback=start_prefetch_callback,
 )
+
+# Spans for every tool and model call; exported when TRACE_EXPORTER is console or file
+configure_tracing()
+instrument_agent(root_agent)
@@ -0,0 +1,315 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import pandas as pd
+import yfinance as yf
+from .telemetry import record_cache, stage
+
+# Seconds each kind of payload stays fresh
+INFO_TTL_S = 15 * 60
+HISTORY_TTL_S = 5 * 60
+STATEMENT_TTL_S = 12 * 3600
+CALENDAR_TTL_S = 3600
+
+# Daily histories up to this period are always fetched as one 1y frame and sliced,
+# so get_historical_prices("1y") and calculate_technical_indicators (6mo) share a download
+BASE_PERIOD = "1y"
+_PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+}
+_PERIOD_ROWS = {"1d": 1, "5d": 5}
+STATEMENTS = ("financials", "balance_sheet", "cashflow")
+
+# How many times each kind of payload was actually requested from Yahoo
+FETCH_COUNTS: Counter = Counter()
+# Worker threads for blocking yfinance work started from async code (tools, prefetch)
+YFINANCE_WORKERS = int(os.getenv("YFINANCE_WORKERS", "8"))
+
+
+class _TTLCache:
+    """Thread-safe key -> value store where each entry expires after its own TTL."""
+
+    def __init__(self):
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_s: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_s, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _SingleFlight:
+    """Lets concurrent callers asking for the same key share one in-flight call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, dict] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+
+
+_cache = _TTLCache()
+_flight = _SingleFlight()
+_tickers: Dict[str, yf.Ticker] = {}
+_tickers_lock = threading.Lock()
+# Builds the object every payload is read from; benchmarks swap in recorded fixtures
+_ticker_factory: Callable[[str], Any] = yf.Ticker
+
+
+def _cached(key: Tuple, ttl_s: float, fetch: Callable[[], Any]) -> Any:
+    value = _cache.get(key)
+    if value is not None:
+        record_cache("market", hits=1)
+        return value
+
+    def load():
+        # Another caller may have filled the cache while we waited for the flight
+        value = _cache.get(key)
+        if value is None:
+            FETCH_COUNTS[key[0]] += 1
+            with stage(f"yfinance {key[0]}", **{"yfinance.symbol": key[1]}):
+                value = fetch()
+            _cache.set(key, value, ttl_s)
+        return value
+
+    record_cache("market", misses=1)
+    return _flight.do(key, load)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_download_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=YFINANCE_WORKERS, thread_name_prefix="yfinance")
+        return _executor
+
+
+async def run_blocking(fn: Callable, *args, **kwargs) -> Any:
+    """
+    Runs a blocking call on the bounded yfinance pool, so a slow Yahoo response ties up a worker
+    thread instead of the event loop every session shares. Context variables (e.g. the open trace
+    span) carry over to the worker.
+    """
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), call)
+
+
+def async_tool(func: Callable) -> Callable:
+    """
+    Async twin of a blocking tool that runs it with run_blocking. It keeps the tool's name,
+    docstring and signature, so ADK declares the same tool to the model.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+
+    return wrapper
+
+
+def get_ticker(ticker_symbol: str) -> yf.Ticker:
+    """Returns one memoized yf.Ticker per symbol."""
+    symbol = ticker_symbol.upper()
+    with _tickers_lock:
+        if symbol not in _tickers:
+            _tickers[symbol] = _ticker_factory(symbol)
+        return _tickers[symbol]
+
+
+def set_ticker_factory(factory: Optional[Callable[[str], Any]] = None) -> None:
+    """
+    Replaces how Ticker objects are built (None restores yf.Ticker) and drops every cached payload.
+    The replacement needs the attributes used here: info, history(), financials, balance_sheet,
+    cashflow and calendar.
+    """
+    global _ticker_factory
+    _ticker_factory = factory or yf.Ticker
+    clear_cache()
+
+
+def get_info(ticker_symbol: str) -> dict:
+    """Returns a copy of the ticker's `.info` payload."""
+    symbol = ticker_symbol.upper()
+    info = _cached(("info", symbol), INFO_TTL_S, lambda: get_ticker(symbol).info or {})
+    return dict(info)
+
+
+def get_history(ticker_symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+    """
+    Returns a copy of the ticker's price history.
+    Daily periods up to one year are cut from a single cached 1y download.
+    Args:
+        ticker_symbol (str): The stock ticker symbol (e.g., 'AAPL' for Apple Inc.).
+        period (str, optional): yfinance period string. Defaults to '1y'.
+        interval (str, optional): yfinance interval string. Defaults to '1d'.
+    Returns:
+        pd.DataFrame: OHLCV history indexed by date.
+    """
+    symbol = ticker_symbol.upper()
+    sliceable = interval == "1d" and (period in _PERIOD_OFFSETS or period in _PERIOD_ROWS or period == "ytd")
+    fetch_period = BASE_PERIOD if sliceable else period
+    hist = _cached(
+        ("history", symbol, fetch_period, interval),
+        HISTORY_TTL_S,
+        lambda: get_ticker(symbol).history(period=fetch_period, interval=interval),
+    )
+    if sliceable and period != fetch_period:
+        hist = _slice_period(hist, period)
+    return hist.copy()
+
+
+def get_history_batch(ticker_symbols: List[str], period: str = "1y", start: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Returns daily histories for many symbols. Symbols not cached yet are fetched together in
+    one yf.download call. yf.download frames lack the Dividends/Stock Splits columns of
+    Ticker.history, so they are cached separately from get_history.
+    Args:
+        ticker_symbols (list): Stock ticker symbols.
+        period (str, optional): yfinance period string. Defaults to '1y'.
+        start (str, optional): 'YYYY-MM-DD' of the first bar to fetch, used instead of period
+                               to download only the bars after ones already stored.
+    Returns:
+        dict: Symbol -> OHLCV history (empty DataFrame when Yahoo has no bars for it). Symbols
+              whose download failed (network error, throttling) are left out and not cached.
+    """
+    symbols = list(dict.fromkeys(s.upper() for s in ticker_symbols))
+    sliceable = start is None and (period in _PERIOD_OFFSETS or period in _PERIOD_ROWS or period == "ytd")
+    fetch_period = BASE_PERIOD if sliceable else period
+    window = {"period": fetch_period} if start is None else {"start": start}
+    cache_window = fetch_period if start is None else f"start={start}"
+    frames = {}
+    missing = []
+    for symbol in symbols:
+        hist = _cache.get(("history_batch", symbol, cache_window))
+        if hist is None:
+            missing.append(symbol)
+        else:
+            frames[symbol] = hist
+
+    record_cache("market", hits=len(frames), misses=len(missing))
+    if missing:
+        FETCH_COUNTS["history_batch"] += 1
+        # yf.download collects results in module-level globals, so concurrent calls from the pool corrupt each other
+        with _download_lock, stage("yfinance download", **{"yfinance.symbols": len(missing)}):
+            data = yf.download(missing, **window, interval="1d", group_by="ticker", auto_adjust=True, progress=False, threads=True)
+            # yf.download returns an empty frame for a failed symbol too; only its error tells them apart
+            errors = dict(yf.shared._ERRORS)
+        for symbol in missing:
+            if symbol in errors and "possibly delisted" not in errors[symbol]:
+                continue
+            if isinstance(data.columns, pd.MultiIndex) and symbol in data.columns.get_level_values(0):
+                hist = data[symbol].dropna(how="all")
+            else:
+                hist = pd.DataFrame()
+            _cache.set(("history_batch", symbol, cache_window), hist, HISTORY_TTL_S)
+            frames[symbol] = hist
+
+    result = {}
+    for symbol in symbols:
+        if symbol not in frames:
+            continue
+        hist = frames[symbol]
+        if sliceable and period != fetch_period:
+            hist = _slice_period(hist, period)
+        result[symbol] = hist.copy()
+    return result
+
+
+def _slice_period(hist: pd.DataFrame, period: str) -> pd.DataFrame:
+    if hist.empty:
+        return hist
+    if period in _PERIOD_ROWS:
+        return hist.tail(_PERIOD_ROWS[period])
+    now = pd.Timestamp.now(tz=hist.index.tz).normalize()
+    if period == "ytd":
+        start = now.replace(month=1, day=1)
+    else:
+        start = now - _PERIOD_OFFSETS[period]
+    return hist[hist.index >= start]
+
+
+def get_statement(ticker_symbol: str, statement: str) -> pd.DataFrame:
+    """
+    Returns a copy of one financial statement.
+    Args:
+        ticker_symbol (str): The stock ticker symbol (e.g., 'AAPL' for Apple Inc.).
+        statement (str): One of 'financials', 'balance_sheet' or 'cashflow'.
+    """
+    if statement not in STATEMENTS:
+        raise ValueError(f"Unknown statement {statement!r}, expected one of {STATEMENTS}")
+    symbol = ticker_symbol.upper()
+    df = _cached((statement, symbol), STATEMENT_TTL_S, lambda: getattr(get_ticker(symbol), statement))
+    return df.copy()
+
+
+def get_calendar(ticker_symbol: str):
+    """Returns the ticker's earnings calendar as yfinance provides it."""
+    symbol = ticker_symbol.upper()
+    calendar = _cached(("calendar", symbol), CALENDAR_TTL_S, lambda: get_ticker(symbol).calendar)
+    return calendar.copy() if calendar is not None else None
+
+
+def clear_cache() -> None:
+    """Drops every cached payload and memoized Ticker."""
+    _cache.clear()
+    with _tickers_lock:
+        _tickers.clear()
+    FETCH_COUNTS.clear()
+
+
+if __name__ == "__main__":
+    # Two tool calls for the same symbol should cause one history and one info download
+    get_history("AAPL", "1y")
+    get_history("AAPL", "6mo")
+    get_info("AAPL")
+    get_info("AAPL")
+    print(dict(FETCH_COUNTS))
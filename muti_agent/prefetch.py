@@ -0,0 +1,233 @@
+import asyncio
+import datetime
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from .market_data import HISTORY_TTL_S, INFO_TTL_S, STATEMENTS, get_calendar, get_history, get_info, get_statement, run_blocking
+from .tools import resolve_timezone
+from .subAgent.news_analysis_pipeline.cache import LINKS_TTL_S
+from .subAgent.news_analysis_pipeline.tools import scrape_news
+
+# Comma separated tickers to keep warm, e.g. "NVDA,AAPL,MSFT"; empty disables the scheduler
+PREFETCH_WATCHLIST = [s.strip().upper() for s in os.getenv("PREFETCH_WATCHLIST", "").split(",") if s.strip()]
+# Jobs allowed to run at once across all symbols, so warm-up never crowds out interactive queries
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "2"))
+PREFETCH_TICK_S = float(os.getenv("PREFETCH_TICK_S", "30"))
+# A failed job waits this long before it is tried again, so a bad symbol or a Yahoo outage is not hammered
+PREFETCH_RETRY_S = float(os.getenv("PREFETCH_RETRY_S", "300"))
+# News warm-up renders pages in Chromium; set to 0 to only warm market data
+PREFETCH_NEWS = os.getenv("PREFETCH_NEWS", "1") == "1"
+
+MARKET_TIMEZONE = "America/New_York"
+MARKET_OPEN = datetime.time(9, 30)
+MARKET_CLOSE = datetime.time(16, 0)
+# Caches are refilled this long before the bell so the first queries of the day hit warm data
+PRE_OPEN_WARMUP = datetime.timedelta(minutes=30)
+
+# kind -> (seconds between refreshes while the market is open, while it is closed).
+# Open-market intervals track the cache TTLs in market_data, so entries are replaced as they expire.
+# None while closed means one refresh after the close, since prices do not move until the next session.
+# Indicators need no job of their own: calculate_technical_indicators reads the history "prices" warms.
+REFRESH_INTERVALS: Dict[str, Tuple[float, Optional[float]]] = {
+    "prices": (HISTORY_TTL_S * 0.8, None),
+    "fundamentals": (INFO_TTL_S * 0.8, None),
+    "news": (LINKS_TTL_S, 3600),
+}
+
+
+def market_phase(now: Optional[datetime.datetime] = None) -> str:
+    """
+    'open' during regular US trading hours, 'pre_open' in the warm-up window before them, otherwise
+    'closed'. Weekends are closed; exchange holidays are not modeled and count as trading days.
+    """
+    now = now or datetime.datetime.now(resolve_timezone(MARKET_TIMEZONE))
+    if now.weekday() >= 5:
+        return "closed"
+    open_at = now.replace(hour=MARKET_OPEN.hour, minute=MARKET_OPEN.minute, second=0, microsecond=0)
+    close_at = now.replace(hour=MARKET_CLOSE.hour, minute=MARKET_CLOSE.minute, second=0, microsecond=0)
+    if open_at <= now < close_at:
+        return "open"
+    if open_at - PRE_OPEN_WARMUP <= now < open_at:
+        return "pre_open"
+    return "closed"
+
+
+def last_session_close(now: datetime.datetime) -> datetime.datetime:
+    """The most recent weekday close at or before `now`."""
+    close_at = now.replace(hour=MARKET_CLOSE.hour, minute=MARKET_CLOSE.minute, second=0, microsecond=0)
+    if close_at > now:
+        close_at -= datetime.timedelta(days=1)
+    while close_at.weekday() >= 5:
+        close_at -= datetime.timedelta(days=1)
+    return close_at
+
+
+def is_due(kind: str, last_refresh: Optional[datetime.datetime], now: datetime.datetime) -> bool:
+    if last_refresh is None:
+        return True
+    open_interval, closed_interval = REFRESH_INTERVALS[kind]
+    age = (now - last_refresh).total_seconds()
+    if market_phase(now) in ("open", "pre_open"):
+        return age >= open_interval
+    if closed_interval is None:
+        return last_refresh < last_session_close(now)
+    return age >= closed_interval
+
+
+class PrefetchScheduler:
+    """
+    Keeps price histories, fundamentals and article caches warm for a watchlist.
+    Every tick it starts the jobs that are due on the market-hours timetable, at most
+    `concurrency` at a time; blocking yfinance calls run in worker threads.
+    args:
+        symbols: tickers to keep warm
+        concurrency: jobs allowed to run at once
+        tick_s: seconds between timetable checks
+        news: whether to warm the article cache with scrape_news
+    """
+
+    def __init__(self, symbols: List[str] = PREFETCH_WATCHLIST, concurrency: int = PREFETCH_CONCURRENCY, tick_s: float = PREFETCH_TICK_S, news: bool = PREFETCH_NEWS):
+        self.symbols = [s.upper() for s in symbols]
+        self.kinds = [kind for kind in REFRESH_INTERVALS if news or kind != "news"]
+        self.tick_s = tick_s
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._running: set = set()
+        self._tasks: set = set()
+        self._loop_task: Optional[asyncio.Task] = None
+        # symbol -> kind -> last attempt
+        self._status: Dict[str, Dict[str, dict]] = {symbol: {} for symbol in self.symbols}
+
+    def _now(self) -> datetime.datetime:
+        return datetime.datetime.now(resolve_timezone(MARKET_TIMEZONE))
+
+    def _is_due(self, symbol: str, kind: str, now: datetime.datetime) -> bool:
+        if (kind, symbol) in self._running:
+            return False
+        entry = self._status[symbol].get(kind)
+        if entry is None:
+            return True
+        if not entry["ok"]:
+            return (now - entry["failed_at"]).total_seconds() >= PREFETCH_RETRY_S
+        return is_due(kind, entry["refreshed_at"], now)
+
+    def due_jobs(self, now: Optional[datetime.datetime] = None) -> List[Tuple[str, str]]:
+        """(kind, symbol) pairs that are due and not already running."""
+        now = now or self._now()
+        return [(kind, symbol) for kind in self.kinds for symbol in self.symbols if self._is_due(symbol, kind, now)]
+
+    async def _fetch(self, kind: str, symbol: str) -> None:
+        if kind == "prices":
+            await run_blocking(get_history, symbol, "1y")
+        elif kind == "fundamentals":
+            await run_blocking(get_info, symbol)
+            for statement in STATEMENTS:
+                await run_blocking(get_statement, symbol, statement)
+            await run_blocking(get_calendar, symbol)
+        elif kind == "news":
+            await scrape_news(symbol)
+
+    async def run_job(self, kind: str, symbol: str) -> None:
+        """Runs one refresh job under the concurrency limit and records its outcome."""
+        self._running.add((kind, symbol))
+        try:
+            async with self._semaphore:
+                start = time.perf_counter()
+                previous = self._status[symbol].get(kind)
+                try:
+                    await self._fetch(kind, symbol)
+                    entry = {"refreshed_at": self._now(), "ok": True, "elapsed_s": round(time.perf_counter() - start, 3)}
+                except Exception as e:
+                    # Keep the time of the last good refresh; the job is retried after PREFETCH_RETRY_S
+                    entry = {"refreshed_at": previous["refreshed_at"] if previous else None, "ok": False, "error": f"{type(e).__name__}: {e}", "failed_at": self._now()}
+                self._status[symbol][kind] = entry
+        finally:
+            self._running.discard((kind, symbol))
+
+    async def tick(self) -> int:
+        """Starts every due job in the background; returns how many were started."""
+        jobs = self.due_jobs()
+        for kind, symbol in jobs:
+            task = asyncio.create_task(self.run_job(kind, symbol))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return len(jobs)
+
+    async def run_forever(self) -> None:
+        while True:
+            await self.tick()
+            await asyncio.sleep(self.tick_s)
+
+    def start(self) -> asyncio.Task:
+        """Starts the scheduler on the running event loop (idempotent)."""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_running_loop().create_task(self.run_forever())
+        return self._loop_task
+
+    async def stop(self) -> None:
+        for task in [self._loop_task, *self._tasks]:
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*(t for t in [self._loop_task, *self._tasks] if t is not None), return_exceptions=True)
+        self._loop_task = None
+
+    def status(self) -> Dict[str, dict]:
+        """
+        Last refresh per symbol and kind: time (market timezone, ISO), success, duration and the last
+        error if the most recent attempt failed.
+        """
+        report = {}
+        for symbol, kinds in self._status.items():
+            report[symbol] = {
+                kind: {key: value.isoformat(timespec="seconds") if isinstance(value, datetime.datetime) else value for key, value in entry.items()}
+                for kind, entry in kinds.items()
+            }
+            report[symbol]["running"] = sorted(kind for kind, s in self._running if s == symbol)
+        return report
+
+_scheduler: Optional[PrefetchScheduler] = None
+_scheduler_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def start_prefetch() -> Optional[PrefetchScheduler]:
+    """
+    Starts the process-wide scheduler for PREFETCH_WATCHLIST on the running event loop, once per loop.
+    Returns None when no watchlist is configured.
+    """
+    global _scheduler, _scheduler_loop
+    if not PREFETCH_WATCHLIST:
+        return None
+    loop = asyncio.get_running_loop()
+    if _scheduler_loop is not loop:
+        _scheduler, _scheduler_loop = PrefetchScheduler(), loop
+    _scheduler.start()
+    return _scheduler
+
+
+def start_prefetch_callback(callback_context) -> None:
+    """before_agent_callback that starts the scheduler inside the ADK server's event loop on the first request."""
+    start_prefetch()
+    return None
+
+
+def prefetch_status() -> Dict[str, dict]:
+    """Last-refresh status per watchlist symbol, empty when the scheduler is not running."""
+    return _scheduler.status() if _scheduler is not None else {}
+
+
+async def main(symbols: List[str], cycles: int = 1) -> None:
+    """Runs the timetable `cycles` times in the foreground and prints the status after each pass."""
+    import json
+
+    scheduler = PrefetchScheduler(symbols)
+    for cycle in range(cycles):
+        if cycle:
+            await asyncio.sleep(scheduler.tick_s)
+        await scheduler.tick()
+        await asyncio.gather(*scheduler._tasks)
+        print(f"[{market_phase()}]", json.dumps(scheduler.status(), indent=2))
+
+
+if __name__ == "__main__":
+    import sys
+
+    asyncio.run(main(sys.argv[1:] or PREFETCH_WATCHLIST or ["NVDA", "AAPL"]))
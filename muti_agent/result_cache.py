@@ -0,0 +1,268 @@
+import datetime
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+from .telemetry import record_cache, stage
+
+RESULT_CACHE_PATH = os.path.expanduser(os.getenv("RESULT_CACHE_PATH", "~/.cache/stock_agent/result_cache.sqlite"))
+RESULT_CACHE_MEMORY_ENTRIES = int(os.getenv("RESULT_CACHE_MEMORY_ENTRIES", "256"))
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+
+# output_key -> (seconds a result stays valid, whether the freshness bucket is the trading day).
+# Fundamentals move with filings, technicals with the daily bar, news with the article list.
+# A TTL of 0 disables caching for that analyzer.
+RESULT_POLICIES: Dict[str, Tuple[float, bool]] = {
+    "fundamental_analysis_result": (float(os.getenv("RESULT_TTL_FUNDAMENTAL_S", str(24 * 3600))), True),
+    "technical_analysis_result": (float(os.getenv("RESULT_TTL_TECHNICAL_S", "900")), True),
+    "news_analysis_result": (float(os.getenv("RESULT_TTL_NEWS_S", "1800")), False),
+}
+
+# Upper-case words in requests that are not tickers
+_NOT_TICKERS = {
+    "I", "A", "AI", "US", "USA", "UK", "EU", "CEO", "CFO", "EPS", "PE", "PS", "ROE", "DE", "FCF", "RSI", "MACD",
+    "SMA", "EMA", "ETF", "IPO", "Q1", "Q2", "Q3", "Q4", "OK", "AND", "OR", "THE", "FOR", "NEWS", "YTD", "GDP", "FED",
+    "BUY", "SELL", "HOLD", "DOJ", "SEC", "FTC", "FDA", "DOW", "NYSE", "TLDR", "IMO", "FAQ", "ATH", "YOY", "QOQ",
+}
+_TICKER_PATTERN = re.compile(r"\$?\b([A-Z]{1,5}(?:[.-][A-Z]{1,2})?)\b")
+
+# Tool arguments naming the ticker an analyzer works on, and tools whose result covers several
+# tickers at once: an analysis that called one of those is never cached
+TICKER_ARGS = ("ticker_symbol", "ticker", "ticker_symbols")
+MULTI_TICKER_TOOLS = {"calculate_technical_indicators_batch", "screen_stocks"}
+# Invocations whose record was never collected (the agent failed) are forgotten past this many
+ANALYZED_ENTRIES = 1024
+
+# The first schema keyed results by ticker alone; its rows are dropped rather than migrated
+_SCHEMA = """
+DROP TABLE IF EXISTS results;
+CREATE TABLE IF NOT EXISTS analyses (
+    output_key TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    request TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    text TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (output_key, ticker, request, bucket)
+);
+"""
+
+
+def request_ticker(text: str) -> Optional[str]:
+    """
+    The single ticker a request is about, or None when it names none or several
+    (multi-ticker requests are not cached). Only upper-case symbols count: a request naming
+    the company ("analyze nvidia") has no ticker here and is neither looked up nor stored.
+    """
+    tickers = {match for match in _TICKER_PATTERN.findall(text or "") if match not in _NOT_TICKERS}
+    return tickers.pop() if len(tickers) == 1 else None
+
+
+def normalize_request(text: str) -> str:
+    """The request as a cache key: lower case, punctuation and repeated whitespace removed."""
+    # Dots and dashes only survive inside words, as in BRK.B
+    words = re.sub(r"[^a-z0-9.-]+", " ", (text or "").lower()).split()
+    return " ".join(word.strip(".-") for word in words if word.strip(".-"))
+
+
+def freshness_bucket(output_key: str, now: Optional[float] = None) -> str:
+    """Trading-day date for daily analyzers, otherwise the TTL-sized time window the moment falls in."""
+    ttl_s, daily = RESULT_POLICIES[output_key]
+    now = time.time() if now is None else now
+    if daily:
+        return datetime.datetime.fromtimestamp(now, MARKET_TIMEZONE).date().isoformat()
+    return str(int(now // ttl_s))
+
+
+class ResultCache:
+    """
+    Analyzer results shared across sessions, keyed by (output_key, ticker, normalized request,
+    freshness bucket).
+    Lookups go to an in-process LRU first, then to a local SQLite file that survives restarts
+    and is shared by every worker on the host.
+    args:
+        path: sqlite file, ":memory:" for a throwaway cache
+        memory_entries: size of the in-process LRU
+    """
+
+    def __init__(self, path: str = RESULT_CACHE_PATH, memory_entries: int = RESULT_CACHE_MEMORY_ENTRIES):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[Tuple[str, str, str, str], Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # Per output_key: memory_hits, sqlite_hits, misses, stores
+        self.metrics: Dict[str, Counter] = {}
+
+    def _count(self, output_key: str, event: str) -> None:
+        self.metrics.setdefault(output_key, Counter())[event] += 1
+
+    def get(self, output_key: str, ticker: str, request: str, bucket: str) -> Optional[str]:
+        ttl_s = RESULT_POLICIES[output_key][0]
+        key = (output_key, ticker, request, bucket)
+        oldest = time.time() - ttl_s
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > oldest:
+                self._memory.move_to_end(key)
+                self._count(output_key, "memory_hits")
+                return entry[1]
+            row = self._conn.execute(
+                "SELECT text, stored_at FROM analyses WHERE output_key = ? AND ticker = ? AND request = ? AND bucket = ? AND stored_at > ?",
+                (*key, oldest),
+            ).fetchone()
+            if row is None:
+                self._memory.pop(key, None)
+                self._count(output_key, "misses")
+                return None
+            self._remember(key, row[1], row[0])
+            self._count(output_key, "sqlite_hits")
+            return row[0]
+
+    def put(self, output_key: str, ticker: str, request: str, bucket: str, text: str) -> None:
+        key = (output_key, ticker, request, bucket)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?, ?)", (*key, text, now))
+            # Older buckets of the same analyzer and ticker can never be hit again
+            self._conn.execute(
+                "DELETE FROM analyses WHERE output_key = ? AND ticker = ? AND bucket != ?",
+                (output_key, ticker, bucket),
+            )
+            self._remember(key, now, text)
+            self._count(output_key, "stores")
+
+    def _remember(self, key: Tuple[str, str, str, str], stored_at: float, text: str) -> None:
+        self._memory[key] = (stored_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM analyses")
+
+    def stats(self) -> dict:
+        report = {}
+        for output_key, counts in self.metrics.items():
+            hits = counts["memory_hits"] + counts["sqlite_hits"]
+            lookups = hits + counts["misses"]
+            report[output_key] = {**counts, "hit_rate": round(hits / lookups, 3) if lookups else None}
+        return report
+
+
+_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Returns the process-wide result cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
+
+
+def set_result_cache(cache: ResultCache) -> None:
+    """Replaces the process-wide result cache, e.g. with ResultCache(":memory:") in benchmarks."""
+    global _cache
+    _cache = cache
+
+
+def _request_text(callback_context: CallbackContext) -> str:
+    content = callback_context.user_content
+    if content is None or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+# (output_key, invocation_id) -> tickers the analyzer's tools were called with, None once a
+# multi-ticker tool was called. Kept in process rather than in session state: ADK merges the
+# state deltas of the calls a model makes in one turn by keeping the last one only.
+_analyzed: "OrderedDict[Tuple[str, str], Optional[Set[str]]]" = OrderedDict()
+_analyzed_lock = threading.Lock()
+
+
+def _record_tool_call(output_key: str, invocation_id: str, tool_name: str, args: Dict[str, Any]) -> None:
+    key = (output_key, invocation_id)
+    with _analyzed_lock:
+        tickers = _analyzed.setdefault(key, set())
+        if tickers is None:
+            return
+        if tool_name in MULTI_TICKER_TOOLS:
+            _analyzed[key] = None
+            return
+        for name in TICKER_ARGS:
+            value = args.get(name)
+            tickers.update(str(v).strip().lstrip("$").upper() for v in (value if isinstance(value, list) else [value]) if v)
+        _analyzed.move_to_end(key)
+        while len(_analyzed) > ANALYZED_ENTRIES:
+            _analyzed.popitem(last=False)
+
+
+def _analyzed_tickers(output_key: str, invocation_id: str) -> Optional[Set[str]]:
+    """Tickers recorded for the analyzer in this invocation (and forgets them); None after a multi-ticker tool."""
+    with _analyzed_lock:
+        return _analyzed.pop((output_key, invocation_id), set())
+
+
+def result_cache_callbacks(output_key: str) -> Tuple[Callable, Callable, Callable]:
+    """
+    before_agent_callback / after_agent_callback pair that serves an agent's result from the
+    result cache, plus the after_tool_callback to set on every LlmAgent (the agent itself or its
+    sub-agents) whose tools take the ticker. On a hit the agent (and its sub-agents) is skipped:
+    the cached text is written to state[output_key] and returned as the agent's reply, so AgentTool
+    callers and later pipeline steps see the same thing as after a real run. Works for LlmAgent,
+    SequentialAgent and custom agents alike.
+    Results are keyed by the request's single upper-case ticker (see request_ticker) and the
+    normalized request, so requests asking for something else about the same ticker are not served
+    each other's answers. A result is only stored when the tools were called for exactly that
+    ticker, and never for batch or screen calls.
+    """
+
+    def lookup(callback_context: CallbackContext) -> Optional[types.Content]:
+        if RESULT_POLICIES[output_key][0] <= 0:
+            return None
+        request = _request_text(callback_context)
+        ticker = request_ticker(request)
+        if ticker is None:
+            return None
+        with stage("result_cache lookup", output_key=output_key, ticker=ticker):
+            text = get_result_cache().get(output_key, ticker, normalize_request(request), freshness_bucket(output_key))
+            record_cache("result", hits=int(text is not None), misses=int(text is None))
+        if text is None:
+            return None
+        callback_context.state[output_key] = text
+        return types.Content(role="model", parts=[types.Part(text=text)])
+
+    def store(callback_context: CallbackContext) -> None:
+        if RESULT_POLICIES[output_key][0] <= 0:
+            return None
+        analyzed = _analyzed_tickers(output_key, callback_context.invocation_id)
+        request = _request_text(callback_context)
+        ticker = request_ticker(request)
+        text = callback_context.state.get(output_key)
+        if ticker is None or not isinstance(text, str) or not text.strip():
+            return None
+        # A misread ticker (an upper-case word) or a follow-up about other tickers is not cached
+        if analyzed != {ticker}:
+            return None
+        get_result_cache().put(output_key, ticker, normalize_request(request), freshness_bucket(output_key), text)
+        return None
+
+    def record(tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Any) -> None:
+        if RESULT_POLICIES[output_key][0] > 0:
+            _record_tool_call(output_key, tool_context.invocation_id, tool.name, args)
+        return None
+
+    return lookup, store, record
@@ -1,10 +1,12 @@
 from google.adk.agents import Agent, LlmAgent
+from ...result_cache import result_cache_callbacks
 from .tools import (
-get_financial_statements,
-get_key_ratios,
-get_analyst_ratings
+get_financial_statements_async,
+get_key_ratios_async,
+get_analyst_ratings_async
 )
 
+_lookup_cached_result, _store_result, _record_tickers = result_cache_callbacks("fundamental_analysis_result")
 
 fundamental_analyzer_agent = LlmAgent(
     name="fundamental_analyzer",
@@ -20,6 +22,7 @@ fundamental_analyzer_agent = LlmAgent(
     1.  Review the latest financial statements (Income, Balance Sheet, Cash Flow).
     2.  Analyze key financial ratios (P/E, P/S, ROE, D/E).
     3.  Summarize analyst ratings and price targets.
+    4.  `get_financial_statements` already returns derived metrics per period (margins, growth, leverage, free cash flow) next to the key line items. Base your analysis on them instead of recomputing, and only call it with `detail=True` when a line item you need is missing.
 
     **Mandatory Output Format:**
     ```markdown
@@ -35,7 +38,11 @@ fundamental_analyzer_agent = LlmAgent(
     * **Average Price Target:** $[Value]
     ```
     """,
-    tools=[get_financial_statements, get_key_ratios, get_analyst_ratings],
-    output_key="fundamental_analysis_result"
+    tools=[get_financial_statements_async, get_key_ratios_async, get_analyst_ratings_async],
+    output_key="fundamental_analysis_result",
+    # Reuse another session's analysis of the same ticker from the same trading day
+    before_agent_callback=_lookup_cached_result,
+    after_agent_callback=_store_result,
+    after_tool_callback=_record_tickers,
 )
 
@@ -0,0 +1,296 @@
+import json
+import math
+import os
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Size caps for the JSON a fundamental tool hands the model (~4 bytes per token)
+PAYLOAD_BUDGET_BYTES = int(os.getenv("FUNDAMENTAL_BUDGET_BYTES", "4000"))
+DETAIL_BUDGET_BYTES = int(os.getenv("FUNDAMENTAL_DETAIL_BUDGET_BYTES", "40000"))
+# Periods kept when the budget forces older ones out
+MIN_PERIODS = 2
+RATIO_DECIMALS = 4
+TRUNCATION_NOTE_BYTES = 160
+
+# Payload section -> yfinance statement
+STATEMENT_SECTIONS = {"incomeStatement": "financials", "balanceSheet": "balance_sheet", "cashFlow": "cashflow"}
+# Line items the analyzer reads; everything else is only returned with detail=True
+KEY_LINE_ITEMS = {
+    "financials": [
+        "Total Revenue", "Gross Profit", "Operating Income", "EBITDA", "Net Income",
+        "Diluted EPS", "Research And Development", "Interest Expense",
+    ],
+    "balance_sheet": [
+        "Total Assets", "Total Liabilities Net Minority Interest", "Stockholders Equity", "Total Debt",
+        "Net Debt", "Cash And Cash Equivalents", "Current Assets", "Current Liabilities",
+    ],
+    "cashflow": [
+        "Operating Cash Flow", "Capital Expenditure", "Free Cash Flow",
+        "Repurchase Of Capital Stock", "Cash Dividends Paid", "Stock Based Compensation",
+    ],
+}
+
+
+def _row(df: pd.DataFrame, *names: str) -> Optional[pd.Series]:
+    """First of `names` present in the statement, as floats (NaN where missing)."""
+    for name in names:
+        if name in df.index:
+            return pd.to_numeric(df.loc[name], errors="coerce")
+    return None
+
+
+def _ratio(numerator: Optional[pd.Series], denominator: Optional[pd.Series]) -> Optional[pd.Series]:
+    if numerator is None or denominator is None:
+        return None
+    return numerator / denominator.where(denominator != 0)
+
+
+def _growth(values: Optional[pd.Series]) -> Optional[pd.Series]:
+    # Periods are newest first, so the previous period is the next column
+    if values is None:
+        return None
+    previous = values.shift(-1)
+    return (values - previous) / previous.abs().where(previous != 0)
+
+
+def _values(series: Optional[pd.Series], decimals: Optional[int] = None) -> Optional[list]:
+    """JSON-ready list (None for missing), or None when the whole row is missing."""
+    if series is None:
+        return None
+    values = []
+    for value in series.tolist():
+        if value is None or not math.isfinite(value):
+            values.append(None)
+        elif decimals is None:
+            values.append(int(round(value)) if abs(value) >= 1000 else round(value, 2))
+        else:
+            values.append(round(value, decimals))
+    return values if any(value is not None for value in values) else None
+
+
+def _periods(statements: Dict[str, pd.DataFrame]) -> List[pd.Timestamp]:
+    """Union of the statements' period columns, newest first."""
+    columns = set()
+    for df in statements.values():
+        columns.update(pd.to_datetime(df.columns, errors="coerce").dropna())
+    return sorted(columns, reverse=True)
+
+
+def _aligned(df: pd.DataFrame, periods: List[pd.Timestamp]) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=periods)
+    df = df.copy()
+    df.columns = pd.to_datetime(df.columns, errors="coerce")
+    df = df.loc[:, df.columns.notna()]
+    return df.T.groupby(level=0).first().T.reindex(columns=periods)
+
+
+def derive_metrics(income: pd.DataFrame, balance: pd.DataFrame, cashflow: pd.DataFrame) -> Dict[str, list]:
+    """
+    Per-period margins, growth, leverage and cash-flow metrics from aligned statements
+    (same period columns, newest first). Metrics missing in every period are left out.
+    Margins, growth rates and leverage ratios are fractions.
+    """
+    revenue = _row(income, "Total Revenue", "Operating Revenue")
+    net_income = _row(income, "Net Income", "Net Income Common Stockholders")
+    equity = _row(balance, "Stockholders Equity", "Common Stock Equity")
+    debt = _row(balance, "Total Debt")
+    operating_cash_flow = _row(cashflow, "Operating Cash Flow")
+    capex = _row(cashflow, "Capital Expenditure")
+    free_cash_flow = _row(cashflow, "Free Cash Flow")
+    if operating_cash_flow is not None and capex is not None:
+        # yfinance reports capital expenditure as a negative number
+        computed = operating_cash_flow + capex
+        free_cash_flow = computed if free_cash_flow is None else free_cash_flow.fillna(computed)
+
+    metrics = {
+        "revenue": _values(revenue),
+        "revenue_growth": _values(_growth(revenue), RATIO_DECIMALS),
+        "gross_margin": _values(_ratio(_row(income, "Gross Profit"), revenue), RATIO_DECIMALS),
+        "operating_margin": _values(_ratio(_row(income, "Operating Income"), revenue), RATIO_DECIMALS),
+        "net_margin": _values(_ratio(net_income, revenue), RATIO_DECIMALS),
+        "net_income": _values(net_income),
+        "net_income_growth": _values(_growth(net_income), RATIO_DECIMALS),
+        "diluted_eps": _values(_row(income, "Diluted EPS"), 2),
+        "debt_to_equity": _values(_ratio(debt, equity), RATIO_DECIMALS),
+        "debt_to_assets": _values(_ratio(debt, _row(balance, "Total Assets")), RATIO_DECIMALS),
+        "current_ratio": _values(_ratio(_row(balance, "Current Assets"), _row(balance, "Current Liabilities")), RATIO_DECIMALS),
+        "net_debt": _values(_row(balance, "Net Debt")),
+        "operating_cash_flow": _values(operating_cash_flow),
+        "free_cash_flow": _values(free_cash_flow),
+        "fcf_margin": _values(_ratio(free_cash_flow, revenue), RATIO_DECIMALS),
+        "return_on_equity": _values(_ratio(net_income, equity), RATIO_DECIMALS),
+    }
+    return {name: values for name, values in metrics.items() if values is not None}
+
+
+def compact_statement(df: pd.DataFrame, line_items: Optional[List[str]] = None) -> Dict[str, list]:
+    """Line item -> values per period (columnar), keeping `line_items` (all when None) that have any value."""
+    rows = df.index if line_items is None else [item for item in line_items if item in df.index]
+    compact = {}
+    for item in rows:
+        values = _values(pd.to_numeric(df.loc[item], errors="coerce"))
+        if values is not None:
+            compact[str(item)] = values
+    return compact
+
+
+def payload_size(payload) -> int:
+    return len(json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def fit_budget(payload: dict, budget_bytes: int = PAYLOAD_BUDGET_BYTES) -> dict:
+    """
+    Trims a shaped statements payload until its compact JSON fits `budget_bytes`: first the oldest
+    periods of the line items, then the line items themselves, then the oldest periods of the
+    derived metrics (down to MIN_PERIODS). What was dropped is noted under `truncated`.
+    """
+    if budget_bytes <= 0 or payload_size(payload) <= budget_bytes:
+        return payload
+    periods = len(payload["periods"])
+    # Leave room for the note itself
+    budget_bytes -= TRUNCATION_NOTE_BYTES
+
+    for count in range(periods - 1, MIN_PERIODS - 1, -1):
+        payload["statements"] = {
+            section: {item: values[:count] for item, values in items.items()}
+            for section, items in payload["statements"].items()
+        }
+        if payload_size(payload) <= budget_bytes:
+            payload["truncated"] = f"line items limited to the {count} most recent periods"
+            return payload
+
+    del payload["statements"]
+    count = periods
+    while payload_size(payload) > budget_bytes and count > MIN_PERIODS:
+        count -= 1
+        payload["periods"] = payload["periods"][:count]
+        payload["metrics"] = {name: values[:count] for name, values in payload["metrics"].items()}
+    payload["truncated"] = f"line items dropped, metrics limited to the {count} most recent periods"
+    return payload
+
+
+def shape_statements(statements: Dict[str, pd.DataFrame], detail: bool = False, budget_bytes: Optional[int] = None) -> dict:
+    """
+    Builds the model-facing payload from the raw yfinance statements (line items x periods):
+    derived metrics per period plus the key line items (every non-empty line item with `detail`),
+    all columnar and newest first, trimmed to the summary or detail byte budget.
+    Args:
+        statements (dict): yfinance statement name ('financials', 'balance_sheet', 'cashflow') -> DataFrame.
+        detail (bool, optional): Keep every line item instead of KEY_LINE_ITEMS.
+        budget_bytes (int, optional): Overrides PAYLOAD_BUDGET_BYTES / DETAIL_BUDGET_BYTES.
+    """
+    periods = _periods(statements)
+    if not periods:
+        return {"error": "No financial statements found for ticker"}
+    aligned = {name: _aligned(statements.get(name, pd.DataFrame()), periods) for name in STATEMENT_SECTIONS.values()}
+    payload = {
+        "periods": [period.strftime("%Y-%m-%d") for period in periods],
+        "units": "reporting currency; margins, growth and ratios are fractions",
+        "metrics": derive_metrics(aligned["financials"], aligned["balance_sheet"], aligned["cashflow"]),
+        "statements": {
+            section: compact_statement(aligned[name], None if detail else KEY_LINE_ITEMS[name])
+            for section, name in STATEMENT_SECTIONS.items()
+        },
+    }
+    if budget_bytes is None:
+        budget_bytes = DETAIL_BUDGET_BYTES if detail else PAYLOAD_BUDGET_BYTES
+    payload = fit_budget(payload, budget_bytes)
+    if "truncated" in payload and not detail:
+        payload["truncated"] += "; call again with detail=True for every line item"
+    return payload
+
+
+def drop_nulls(payload: dict) -> dict:
+    """Removes None (and NaN) values from a flat tool result."""
+    return {key: value for key, value in payload.items() if value is not None and not (isinstance(value, float) and math.isnan(value))}
+
+
+def raw_statements_payload(statements: Dict[str, pd.DataFrame]) -> dict:
+    """The previous get_financial_statements output: every line item, one record per period."""
+    def records(df: pd.DataFrame) -> list:
+        if df.empty:
+            return []
+        df = df.transpose().reset_index()
+        df["index"] = df["index"].astype(str)
+        return df.where(pd.notna(df), None).to_dict(orient="records")
+
+    return {section: records(statements.get(name, pd.DataFrame())) for section, name in STATEMENT_SECTIONS.items()}
+
+
+def synthetic_statements(seed: int = 0, periods: int = 5, filler_rows: int = 40, null_share: float = 0.25) -> Dict[str, pd.DataFrame]:
+    """
+    Statements shaped like yfinance's: the key line items plus `filler_rows` other line items per
+    statement, with a share of missing values as Yahoo returns them.
+    """
+    rng = np.random.default_rng(seed)
+    columns = [pd.Timestamp(f"{2024 - i}-12-31") for i in range(periods)]
+    revenue = rng.uniform(2e10, 2e11) * np.linspace(1.0, 0.6, periods)
+    statements = {}
+    for name, items in KEY_LINE_ITEMS.items():
+        rows = {item: revenue * rng.uniform(0.05, 1.0) for item in items}
+        rows.update({f"{name} line item {i}": revenue * rng.uniform(-0.2, 0.5) for i in range(filler_rows)})
+        frame = pd.DataFrame(rows, index=columns).T
+        frame = frame.mask(rng.random(frame.shape) < null_share)
+        statements[name] = frame
+    statements["financials"].loc["Total Revenue"] = revenue
+    statements["financials"].loc["Diluted EPS"] = rng.uniform(1, 10, periods)
+    statements["cashflow"].loc["Capital Expenditure"] = -revenue * 0.05
+    return statements
+
+
+def _model_latency(model: str, payload: dict) -> dict:
+    """One analyzer-style request with the payload as the tool result; needs GOOGLE_API_KEY."""
+    import time
+    from google import genai
+
+    client = genai.Client()
+    prompt = (
+        "You are a financial analyst. Summarize the company's financial health (strengths, weaknesses) "
+        "from these financial statements:\n" + json.dumps(payload, default=str)
+    )
+    start = time.perf_counter()
+    response = client.models.generate_content(model=model, contents=prompt)
+    usage = response.usage_metadata
+    return {
+        "latency_s": round(time.perf_counter() - start, 2),
+        "prompt_tokens": usage.prompt_token_count if usage else None,
+    }
+
+
+def benchmark(model: Optional[str] = None, seeds: int = 5) -> list:
+    """
+    Payload size, estimated tokens and build time of the raw records output against the shaped
+    summary and detail payloads. With `model` (and GOOGLE_API_KEY set) also times one model call
+    per variant.
+    """
+    import time
+
+    report = []
+    for seed in range(seeds):
+        statements = synthetic_statements(seed)
+        variants = {
+            "raw": lambda: raw_statements_payload(statements),
+            "shaped": lambda: shape_statements(statements),
+            "detail": lambda: shape_statements(statements, detail=True),
+        }
+        row = {"seed": seed}
+        for name, build in variants.items():
+            start = time.perf_counter()
+            payload = build()
+            row[f"{name}_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            size = len(json.dumps(payload, default=str))
+            row[f"{name}_kb"] = round(size / 1024, 1)
+            row[f"{name}_tokens_est"] = size // 4
+            if model and seed == 0:
+                row.update({f"{name}_{key}": value for key, value in _model_latency(model, payload).items()})
+        report.append(row)
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    for row in benchmark(model=sys.argv[1] if len(sys.argv) > 1 else None):
+        print(row)
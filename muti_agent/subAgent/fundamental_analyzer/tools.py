@@ -1,33 +1,27 @@
-import yfinance as yf
-import pandas as pd
+from ...market_data import STATEMENTS, async_tool, get_info, get_statement
+from ...telemetry import traced_tool
+from .shaping import drop_nulls, shape_statements
 
 # financial statements
-def get_financial_statements(ticker_symbol: str) -> dict:
+@traced_tool
+def get_financial_statements(ticker_symbol: str, detail: bool = False) -> dict:
     """
-    Retrieves financial statements from Yahoo Finance in a JSON-friendly format.
+    Retrieves financial statements from Yahoo Finance, condensed for analysis: derived metrics per
+    period (revenue growth, gross/operating/net margins, debt to equity, current ratio, free cash flow,
+    FCF margin, ROE) plus the key line items of the income statement, balance sheet and cash flow.
     Args:
         ticker_symbol (str): The stock ticker symbol (e.g., 'AAPL' for Apple Inc.).
+        detail (bool, optional): Return every reported line item instead of the key ones. Only use it
+                                 when a line item you need is missing. Defaults to False.
     Returns:
-        dict: A dictionary containing income statement, balance sheet, and cash flow data.
+        dict: periods (newest first), metrics and statements as arrays aligned with periods,
+              and `truncated` when older periods or line items were left out to keep the result small.
     """
-    ticker = yf.Ticker(ticker_symbol)
+    statements = {name: get_statement(ticker_symbol, name) for name in STATEMENTS}
+    return shape_statements(statements, detail=detail)
 
-    def format_statement(statement_df):
-        if statement_df.empty:
-            return []
-        df = statement_df.transpose()
-        df.reset_index(inplace=True)
-        df['index'] = df['index'].astype(str)
-        df = df.where(pd.notna(df), None)
-
-        return df.to_dict(orient='records')
-
-    return {
-        "incomeStatement": format_statement(ticker.financials),
-        "balanceSheet": format_statement(ticker.balance_sheet),
-        "cashFlow": format_statement(ticker.cashflow)
-    }
 # financial ratios
+@traced_tool
 def get_key_ratios(ticker_symbol: str) -> dict:
     """
     Retrieves key financial ratios from Yahoo Finance.
@@ -36,15 +30,16 @@ def get_key_ratios(ticker_symbol: str) -> dict:
     Returns:
         dict: A dictionary containing key financial ratios, including market cap, P/E ratio, ROE, and gross margin.
     """
-    info = yf.Ticker(ticker_symbol).info
-    return {
+    info = get_info(ticker_symbol)
+    return drop_nulls({
         "marketCap": info.get("marketCap"),
         "peRatio": info.get("trailingPE"),
         "roe": info.get("returnOnEquity"),
         "grossMargin": info.get("grossMargins")
-    }
+    })
 
 # analyst recommendations
+@traced_tool
 def get_analyst_ratings(ticker_symbol: str) -> dict:
     """
     Retrieves analyst recommendations from Yahoo Finance.
@@ -53,13 +48,18 @@ def get_analyst_ratings(ticker_symbol: str) -> dict:
     Returns:
         dict: A dictionary containing analyst recommendations.
     """
-    info = yf.Ticker(ticker_symbol).info
-    return {
+    info = get_info(ticker_symbol)
+    return drop_nulls({
         "recommendation": info.get("recommendationKey"),
         "targetMeanPrice": info.get("targetMeanPrice"),
         "targetHighPrice": info.get("targetHighPrice"),
         "targetLowPrice": info.get("targetLowPrice")
-    }
+    })
+
+# Async twins registered with the agent, so yfinance calls do not block the shared event loop
+get_financial_statements_async = async_tool(get_financial_statements)
+get_key_ratios_async = async_tool(get_key_ratios)
+get_analyst_ratings_async = async_tool(get_analyst_ratings)
 
 if __name__ == "__main__":
     print(get_analyst_ratings("AAPL"))
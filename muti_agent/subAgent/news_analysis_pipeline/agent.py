@@ -1,42 +1,29 @@
+import os
 from google.adk.agents import SequentialAgent, LlmAgent
-from .tools import scrape_news
+from .tools import scrape_news, set_news_request
+from .streaming import StreamingNewsAgent
+from ...result_cache import result_cache_callbacks
+
+_lookup_cached_result, _store_result, _record_tickers = result_cache_callbacks("news_analysis_result")
 
 # news collector agent that will be used to get news data for a given ticker
 news_collector = LlmAgent(
     name="news_collector", 
-    # You need longer input and output for this agent, tool return long context
-    model="gemini-2.5-flash-preview-05-20",
+    # Cleaning and formatting happen inside scrape_news, so this agent only picks the ticker
+    model="gemini-2.0-flash",
     instruction= """
-    You are a hyper-efficient data processing engine specializing in stock market news. Your sole purpose is to fetch, clean, and format news articles for a given stock ticker. You must operate with precision and follow the rules strictly.
+    You are a hyper-efficient data processing engine specializing in stock market news. Your sole purpose is to fetch news articles for a given stock ticker.
 
     **Core Workflow:**
     1.  Immediately identify the stock ticker symbol from the user's query (e.g., 'AAPL', 'TSLA', 'GOOGL').
     2.  Use the `scrape_news` tool to fetch news for that ticker. The number of articles to fetch will be provided by the `num_url` parameter. If not provided, use the default 10, for deeper research, set it 20.
-    3.  For each article returned by the tool, perform the following data cleaning and formatting steps.
-    4.  Your final output must *only* be the structured, cleaned news data and nothing else. Do not add any introductory or concluding remarks.
-
-    **Data Cleaning & Formatting Rules:**
-    - From the article's content, meticulously remove all non-essential text. This includes, but is not limited to: advertisements, promotional materials, newsletter sign-ups, 'related articles' links, and social media sharing buttons.
-    - The goal is to leave only the pure journalistic content of the article.
-    - Format each cleaned article precisely into the Markdown structure specified below.
-
-    **Mandatory Output Format:**
-    You must format each article using the following Markdown template. Do not deviate from this structure.
-    state how many news you processed in the end
-
-    ```markdown
-    * **Title:** [The title of the article] \n
-    * **Date:** [The date of the article] \n
-    * **Content:** \n\n
-    [The full, cleaned text content of the article. Paragraphs should be preserved.]
-    \n
-    **Title:** [The title of the next article] \n
-    rest of the article...
-    ```
+    3.  The tool already removes advertisements, newsletter sign-ups, related links and share buttons, formats the articles as Markdown and saves them for the next step. Do not repeat or rewrite the articles.
+    4.  Your final output must only be one line: the ticker and how many news you processed (and how many failed, if any).
     """,
     tools=[scrape_news],
-    output_key="news_data",
-    ) # Saves output to state['data']
+    output_key="news_collection_status",
+    after_tool_callback=_record_tickers,
+    ) # scrape_news saves the articles to state['news_data']
 
 # data_analyst agent that will be used to analyze news data for a given ticker
 news_analyzer_agent = LlmAgent(
@@ -52,7 +39,12 @@ news_analyzer_agent = LlmAgent(
 
     **Input Source:**
     Your input is a block of cleaned, Markdown-formatted news articles. 
-    This data is provided from a previous step and is provided in session state with key {news_data}
+    This data is provided from a previous step and is provided in session state with key {news_data?}
+
+    **Pre-labeled Articles:**
+    Articles whose sentiment and event were already classified with high confidence by a local classifier are listed here, in the output format below:
+    {news_prelabeled?}
+    Copy them into your report as they are (you may improve the key takeaway and drop irrelevant ones), and do not re-classify them. Only analyze the articles in the input block above in full.
 
     **Core Analytical Tasks:**
     For the entire set of news, perform the following analyses:
@@ -82,7 +74,60 @@ news_analyzer_agent = LlmAgent(
     output_key="news_analysis_result",
 )
 
-news_analysis_pipeline = SequentialAgent(
-    name="new_analysis_pipeline",
-    description="a pipline to analyze news data for certain ticker from Yahoo Finance. ", 
-    sub_agents=[news_collector, news_analyzer_agent])
\ No newline at end of file
+# picks the ticker and article count for StreamingNewsAgent, which then fetches without a model
+news_request_parser = LlmAgent(
+    name="news_request_parser",
+    model="gemini-2.0-flash",
+    instruction="""
+    You identify which stock the user wants recent news for.
+
+    1.  Find the one stock the user's latest query is about, using the conversation for follow-ups (e.g., "and its news?"). Map company names to their ticker symbol (e.g., 'nvidia' -> 'NVDA', 'Apple' -> 'AAPL').
+    2.  Call `set_news_request` once with that ticker. Only pass `num_url` when the user asks for a number of articles (use 20 for deeper research).
+    3.  Your final output must only be the ticker. If the query names no stock or several, do not call the tool; ask the user, in one sentence, for the one stock they want news about.
+    """,
+    tools=[set_news_request],
+    after_tool_callback=_record_tickers,
+)
+
+# analyzes the few articles StreamingNewsAgent hands over at a time, without the conversation history
+news_batch_analyzer = LlmAgent(
+    name="finance_news_batch_analyzer",
+    model="gemini-2.0-flash",
+    include_contents="none",
+    instruction="""
+    You are a professional and insightful financial news analyst. Analyze the following news articles, which are part of a larger set that is still being collected:
+
+    {news_batch}
+
+    For each article, classify its sentiment as **Positive**, **Negative**, or **Neutral** from an investor's perspective, and name the key event it describes (e.g., "Product Launch", "Earnings Report", "Executive Change", "Regulatory Scrutiny", "Price Target Update").
+    Skip any article that is clearly not relevant to the company's business or stock performance, and say in one line how many you skipped.
+
+    Output only the articles, in this format:
+
+    Title: Analyst Upgrades Tesla to 'Buy' with a $300 Price Target
+    Date: 2025-06-12
+    Sentiment: Positive
+    Event: Price Target Update
+    Key takeaway: Your Professional analysis of the article
+    """,
+    output_key="news_batch_analysis",
+)
+
+# NEWS_STREAMING=1 analyzes articles as they arrive instead of after the slowest page has loaded
+if os.getenv("NEWS_STREAMING", "0") == "1":
+    news_analysis_pipeline = StreamingNewsAgent(
+        name="new_analysis_pipeline",
+        description="a pipline to analyze news data for certain ticker from Yahoo Finance. ",
+        sub_agents=[news_request_parser, news_batch_analyzer],
+        before_agent_callback=_lookup_cached_result,
+        after_agent_callback=_store_result,
+        )
+else:
+    news_analysis_pipeline = SequentialAgent(
+        name="new_analysis_pipeline",
+        description="a pipline to analyze news data for certain ticker from Yahoo Finance. ", 
+        sub_agents=[news_collector, news_analyzer_agent],
+        # A cached report for the ticker skips both the scrape and the analyzer
+        before_agent_callback=_lookup_cached_result,
+        after_agent_callback=_store_result,
+        )
\ No newline at end of file
@@ -0,0 +1,271 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+
+# Pool size can be tuned per deployment without touching code
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+BROWSER_POOL_CONTEXTS = int(os.getenv("BROWSER_POOL_CONTEXTS", "4"))
+
+
+class _BrowserSlot:
+    """One Chromium process and the contexts opened in it."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.browser: Optional[Browser] = None
+        self.contexts: List[BrowserContext] = []
+
+    @property
+    def alive(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    A long-lived pool of headless Chromium browsers shared by every scrape in the process.
+    Each browser holds a fixed number of contexts; a lease hands out a fresh page inside an
+    idle context and closes the page (not the context) when the caller is done.
+    args:
+        num_browsers: number of Chromium processes to keep running
+        contexts_per_browser: number of contexts (concurrent leases) per browser
+        headless: run Chromium headless
+    """
+
+    def __init__(self, num_browsers: int = BROWSER_POOL_SIZE, contexts_per_browser: int = BROWSER_POOL_CONTEXTS, headless: bool = True):
+        self.num_browsers = max(1, num_browsers)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.headless = headless
+        self._playwright: Optional[Playwright] = None
+        self._slots: List[_BrowserSlot] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._restart_lock = asyncio.Lock()
+        self._active_leases = 0
+        self._closing = False
+        self.restarts = 0
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self) -> "BrowserPool":
+        if self.started:
+            return self
+        self._playwright = await async_playwright().start()
+        self._idle = asyncio.Queue()
+        try:
+            for i in range(self.num_browsers):
+                slot = _BrowserSlot(i)
+                self._slots.append(slot)
+                await self._launch(slot)
+        except Exception:
+            # A half-started pool would make every lease wait forever on an empty queue
+            for slot in self._slots:
+                if slot.browser is not None:
+                    await slot.browser.close()
+            await self._playwright.stop()
+            self._playwright, self._slots, self._idle = None, [], None
+            raise
+        print(f"Browser pool started: {self.num_browsers} browser(s) x {self.contexts_per_browser} context(s)")
+        return self
+
+    async def _launch(self, slot: _BrowserSlot) -> None:
+        slot.browser = await self._playwright.chromium.launch(headless=self.headless)
+        slot.contexts = [await slot.browser.new_context() for _ in range(self.contexts_per_browser)]
+        for context in slot.contexts:
+            self._idle.put_nowait((slot, context))
+
+    async def _restart(self, slot: _BrowserSlot) -> None:
+        # Several leases may notice the same crash at once; only the first one relaunches
+        async with self._restart_lock:
+            if slot.alive:
+                return
+            print(f"Browser {slot.index} is not connected, restarting it")
+            stale = set(slot.contexts)
+            # Drop idle entries that still point at the dead browser; leased ones are dropped on release
+            kept = []
+            while not self._idle.empty():
+                entry = self._idle.get_nowait()
+                if entry[1] not in stale:
+                    kept.append(entry)
+            for entry in kept:
+                self._idle.put_nowait(entry)
+            try:
+                if slot.browser is not None:
+                    await slot.browser.close()
+            except Exception:
+                pass
+            await self._launch(slot)
+            self.restarts += 1
+
+    async def health_check(self) -> dict:
+        """
+        Checks every browser in the pool and restarts the ones that crashed.
+        return:
+            a dict with the number of browsers, healthy browsers, restarts and active leases
+        """
+        if not self.started:
+            return {"started": False}
+        healthy = 0
+        for slot in self._slots:
+            if not slot.alive:
+                await self._restart(slot)
+            if slot.alive:
+                healthy += 1
+        return {
+            "started": True,
+            "browsers": len(self._slots),
+            "healthy": healthy,
+            "restarts": self.restarts,
+            "active_leases": self._active_leases,
+            "idle_contexts": self._idle.qsize(),
+        }
+
+    @asynccontextmanager
+    async def lease_page(self) -> AsyncIterator[Page]:
+        """
+        Leases a new page from an idle context, waiting if every context is busy.
+        The page is closed and the context returned to the pool on exit.
+        """
+        if self._closing:
+            raise RuntimeError("Browser pool is shutting down")
+        if not self.started:
+            await self.start()
+
+        slot, context = await self._idle.get()
+        if not slot.alive or context not in slot.contexts:
+            await self._restart(slot)
+            slot, context = await self._idle.get()
+
+        self._active_leases += 1
+        page = None
+        try:
+            page = await context.new_page()
+            yield page
+        finally:
+            self._active_leases -= 1
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            # Contexts of a browser that was restarted meanwhile are not returned
+            if slot.alive and context in slot.contexts:
+                self._idle.put_nowait((slot, context))
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """
+        Gracefully shuts the pool down: waits up to `timeout` seconds for active leases,
+        then closes every browser and stops Playwright.
+        """
+        if not self.started:
+            return
+        self._closing = True
+        deadline = time.monotonic() + timeout
+        while self._active_leases and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for slot in self._slots:
+            try:
+                if slot.browser is not None:
+                    await slot.browser.close()
+            except Exception:
+                pass
+        self._slots = []
+        await self._playwright.stop()
+        self._playwright = None
+        self._closing = False
+        print("Browser pool closed")
+
+
+_pool: Optional[BrowserPool] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+_pool_lock: Optional[asyncio.Lock] = None
+
+
+async def _close_on_loop(pool: BrowserPool, loop: asyncio.AbstractEventLoop) -> None:
+    """Closes a pool on the event loop its Playwright objects are bound to, from any loop."""
+    if not pool.started:
+        return
+    if loop is asyncio.get_running_loop():
+        await pool.close()
+    elif loop.is_running():
+        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(pool.close(), loop))
+    elif not loop.is_closed():
+        await asyncio.to_thread(loop.run_until_complete, pool.close())
+    else:
+        # Nothing can drive its Playwright objects any more; the driver and its browsers go when the pool is collected
+        print("Browser pool outlived its event loop and could not be closed")
+
+
+async def get_browser_pool() -> BrowserPool:
+    """
+    Returns the process-wide browser pool, starting it on first use.
+    Playwright objects are bound to an event loop, so a new loop (e.g. a second asyncio.run) gets a new pool
+    and the previous one is closed on its own loop.
+    """
+    global _pool, _pool_loop, _pool_lock
+    loop = asyncio.get_running_loop()
+    if _pool_loop is not loop:
+        old_pool, old_loop = _pool, _pool_loop
+        _pool, _pool_loop, _pool_lock = None, loop, asyncio.Lock()
+        if old_pool is not None:
+            await _close_on_loop(old_pool, old_loop)
+    async with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+        if not _pool.started:
+            await _pool.start()
+    return _pool
+
+
+async def shutdown_browser_pool() -> None:
+    """Closes the process-wide browser pool if one is running."""
+    global _pool
+    if _pool is not None:
+        await _close_on_loop(_pool, _pool_loop)
+    _pool = None
+
+
+async def benchmark(url: str = "https://finance.yahoo.com/quote/NVDA/news/", queries: int = 5) -> dict:
+    """
+    Compares per-query latency of a cold launch (new Playwright + Chromium per query, the old behaviour)
+    against a warm lease from a running pool.
+    """
+    async def load(page: Page):
+        await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+
+    cold = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        pool = BrowserPool(num_browsers=1, contexts_per_browser=1)
+        await pool.start()
+        async with pool.lease_page() as page:
+            await load(page)
+        await pool.close()
+        cold.append(time.perf_counter() - start)
+
+    warm = []
+    pool = await get_browser_pool()
+    for _ in range(queries):
+        start = time.perf_counter()
+        async with pool.lease_page() as page:
+            await load(page)
+        warm.append(time.perf_counter() - start)
+    await shutdown_browser_pool()
+
+    return {
+        "url": url,
+        "queries": queries,
+        "cold_avg_s": round(sum(cold) / len(cold), 3),
+        "warm_avg_s": round(sum(warm) / len(warm), 3),
+        "cold_s": [round(t, 3) for t in cold],
+        "warm_s": [round(t, 3) for t in warm],
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(asyncio.run(benchmark()), indent=2))
@@ -0,0 +1,154 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+NEWS_CACHE_PATH = os.path.expanduser(os.getenv("NEWS_CACHE_PATH", "~/.cache/stock_agent/news_cache.sqlite"))
+# Published articles rarely change, the link list on the quote page does
+ARTICLE_TTL_S = float(os.getenv("NEWS_ARTICLE_TTL_S", str(7 * 24 * 3600)))
+LINKS_TTL_S = float(os.getenv("NEWS_LINKS_TTL_S", "600"))
+CACHE_MAX_BYTES = int(os.getenv("NEWS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# ticker_links held plain url lists before headlines were collected; it is dropped, not migrated
+_SCHEMA = """
+DROP TABLE IF EXISTS ticker_links;
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_last_access ON articles (last_access);
+CREATE TABLE IF NOT EXISTS article_links (
+    ticker TEXT PRIMARY KEY,
+    links TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class ArticleCache:
+    """
+    Local SQLite store for scraped articles, keyed by the cleaned article URL, plus a short-lived
+    list of article links per ticker. Expired rows are dropped on read and the least recently used
+    articles are evicted once the store grows past `max_bytes`.
+    args:
+        path: sqlite file, ":memory:" for a throwaway cache
+        article_ttl_s: seconds an article stays valid
+        links_ttl_s: seconds a ticker's link list stays valid
+        max_bytes: size cap for stored article payloads
+    """
+
+    def __init__(self, path: str = NEWS_CACHE_PATH, article_ttl_s: float = ARTICLE_TTL_S, links_ttl_s: float = LINKS_TTL_S, max_bytes: int = CACHE_MAX_BYTES):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.article_ttl_s = article_ttl_s
+        self.links_ttl_s = links_ttl_s
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def get_articles(self, urls: List[str]) -> Dict[str, Dict]:
+        """
+        Looks up several articles at once.
+        return:
+            a dict mapping each cached, unexpired url to its article
+        """
+        if not urls:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" * len(urls))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT url, payload FROM articles WHERE url IN ({placeholders}) AND fetched_at > ?",
+                (*urls, now - self.article_ttl_s),
+            ).fetchall()
+            found = {url: json.loads(payload) for url, payload in rows}
+            if found:
+                self._conn.executemany("UPDATE articles SET last_access = ? WHERE url = ?", [(now, url) for url in found])
+        self.hits += len(found)
+        self.misses += len(urls) - len(found)
+        return found
+
+    def put_articles(self, articles: List[Dict]) -> None:
+        """Stores successfully extracted articles; entries with an error are skipped."""
+        now = time.time()
+        rows = []
+        for article in articles:
+            if "error" in article or not article.get("url"):
+                continue
+            # Scheduling metadata belongs to the fetch, not to the article
+            payload = json.dumps({k: v for k, v in article.items() if k not in ("status", "elapsed_s")}, ensure_ascii=False)
+            rows.append((article["url"], payload, len(payload.encode("utf-8")), now, now))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?)", rows)
+        self.evict()
+
+    def get_links(self, ticker: str) -> Optional[List[Dict]]:
+        """Returns the cached article links (url and headline) for a ticker, or None when missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT links FROM article_links WHERE ticker = ? AND fetched_at > ?",
+                (ticker.upper(), time.time() - self.links_ttl_s),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_links(self, ticker: str, links: List[Dict]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO article_links VALUES (?, ?, ?)",
+                (ticker.upper(), json.dumps(links), time.time()),
+            )
+
+    def evict(self) -> int:
+        """
+        Drops expired rows, then least recently used articles until the store fits `max_bytes`.
+        return:
+            number of articles removed
+        """
+        now = time.time()
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM articles WHERE fetched_at <= ?", (now - self.article_ttl_s,)).rowcount
+            self._conn.execute("DELETE FROM article_links WHERE fetched_at <= ?", (now - self.links_ttl_s,))
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM articles").fetchone()[0]
+            if total > self.max_bytes:
+                victims = []
+                for url, size in self._conn.execute("SELECT url, size FROM articles ORDER BY last_access ASC"):
+                    if total <= self.max_bytes:
+                        break
+                    victims.append((url,))
+                    total -= size
+                self._conn.executemany("DELETE FROM articles WHERE url = ?", victims)
+                removed += len(victims)
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM articles").fetchone()
+        return {"articles": count, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[ArticleCache] = None
+
+
+def get_article_cache() -> ArticleCache:
+    """Returns the process-wide article cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = ArticleCache()
+    return _cache
+
+
+def set_article_cache(cache: ArticleCache) -> None:
+    """Replaces the process-wide article cache, e.g. with ArticleCache(":memory:") in benchmarks."""
+    global _cache
+    _cache = cache
@@ -0,0 +1,213 @@
+import re
+from typing import Dict, List, Tuple
+
+# Investor-perspective lexicon, in the spirit of Loughran-McDonald but limited to headline vocabulary
+POSITIVE_WORDS = {
+    "beat", "beats", "tops", "exceeds", "surge", "surges", "soar", "soars", "jump", "jumps", "rally", "rallies",
+    "gain", "gains", "rise", "rises", "climb", "climbs", "record", "upgrade", "upgrades", "upgraded", "raise",
+    "raises", "raised", "boost", "boosts", "strong", "stronger", "growth", "grows", "outperform", "bullish",
+    "profit", "profitable", "wins", "win", "approval", "approves", "approved", "buyback", "expands", "expansion",
+    "higher", "lifts", "expand", "optimistic", "accelerates", "breakthrough", "rebound", "rebounds",
+}
+NEGATIVE_WORDS = {
+    "miss", "misses", "missed", "plunge", "plunges", "fall", "falls", "drop", "drops", "slump", "slumps",
+    "sink", "sinks", "tumble", "tumbles", "slide", "slides", "decline", "declines", "downgrade", "downgrades",
+    "downgraded", "cut", "cuts", "lawsuit", "sues", "probe", "investigation", "recall", "weak", "weaker",
+    "loss", "losses", "bearish", "layoffs", "warns", "warning", "fines", "fined", "ban", "bans", "restrictions",
+    "curbs", "delay", "delays", "halt", "halts", "fraud", "selloff", "lower", "concerns", "fears", "crash",
+    "underperform", "suspends", "lowers", "lowered", "slows", "slowdown",
+}
+NEGATORS = {"not", "no", "never", "without", "fails", "failed"}
+
+# Event rules, first match in this order wins; names follow finance_news_analyzer_agent's examples
+EVENT_RULES: List[Tuple[str, re.Pattern]] = [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in (
+    ("Price Target Update", r"\bprice target\b|\bPT\b|\btarget (raised|cut|lowered|to \$)"),
+    ("Analyst Rating Change", r"\b(upgrade[sd]?|downgrade[sd]?|initiates? coverage|reiterates?|outperform|underperform|overweight|underweight)\b"),
+    ("Earnings Report", r"\b(earnings|quarterly (results|report)|Q[1-4] (results|revenue|profit)|EPS|revenue (beat|miss)|guidance|(beats?|miss(es)?|tops) .{0,40}(estimates|expectations|forecasts)|fiscal (first|second|third|fourth)[- ]quarter)\b"),
+    ("Merger & Acquisition", r"\b(acquire[sd]?|acquisition|merger|buyout|takeover|deal to buy)\b"),
+    ("Regulatory Scrutiny", r"\b(SEC|FTC|DOJ|antitrust|probe|investigation|regulators?|export (curbs|controls|restrictions)|sanctions?|fined|fines)\b"),
+    ("Legal Action", r"\b(lawsuit|sues|sued|settlement|court|class action|verdict)\b"),
+    ("Executive Change", r"\b(steps down|step down|resigns?|resignation|ousts?|ousted|appoints?|appointed|names .{0,30}(CEO|CFO|COO|chief|head)|(CEO|CFO|COO|chief executive) (exits?|departs?|to (retire|leave|step down)))\b"),
+    ("Product Launch", r"\b(launch(es|ed)?|unveils?|introduces?|debuts?|rolls out|new (chip|model|product|iphone|gpu))\b"),
+    ("Capital Return", r"\b(dividend|buyback|share repurchase|stock split)\b"),
+    ("Partnership", r"\b(partner(s|ship)?|collaborat(e|es|ion)|teams up|alliance|agreement with)\b"),
+    ("Market Movement", r"\b(stock|shares)\b.{0,40}\b(jump|fall|soar|drop|rise|slide|surge|plunge|tumble|sink|rall(y|ie))s?\b"),
+)]
+
+# Below these the article goes to the model instead of being labeled locally
+MIN_SENTIMENT_CONFIDENCE = 0.6
+MIN_EVENT_CONFIDENCE = 0.6
+# One lexicon word or one rule match alone stays below the thresholds; a rule match plus a
+# lexicon word elsewhere in the text corroborate each other up to this
+SINGLE_CUE_CONFIDENCE = 0.5
+CORROBORATED_CONFIDENCE = 0.7
+# Long features and analysis pieces need the model's reading, not a headline rule
+LONG_FORM_CHARS = 6000
+LEDE_CHARS = 400
+
+
+def _lede(article: Dict) -> str:
+    content = article.get("content") or ""
+    return content[:LEDE_CHARS]
+
+
+def _lexicon_hits(text: str) -> List[Tuple[int, int]]:
+    """(start offset, +1 or -1) of every lexicon word, with negation applied."""
+    words = list(re.finditer(r"[a-z]+", text.lower()))
+    hits = []
+    for i, match in enumerate(words):
+        word = match.group()
+        hit = 1 if word in POSITIVE_WORDS else -1 if word in NEGATIVE_WORDS else 0
+        if hit and any(w.group() in NEGATORS for w in words[max(0, i - 3):i]):
+            hit = -hit
+        if hit:
+            hits.append((match.start(), hit))
+    return hits
+
+
+def _rule_matches(text: str) -> List[Tuple[str, List[Tuple[int, int]]]]:
+    """Every matching event rule, in rule order, with the spans it matched."""
+    matches = []
+    for name, pattern in EVENT_RULES:
+        spans = [m.span() for m in pattern.finditer(text)]
+        if spans:
+            matches.append((name, spans))
+    return matches
+
+
+def _sentiment(hits: List[Tuple[int, int]]) -> Tuple[str, float]:
+    positive = sum(1 for _, hit in hits if hit > 0)
+    negative = len(hits) - positive
+    total = positive + negative
+    if total == 0:
+        # No evidence either way; neutral is likely but not certain enough to skip the model
+        return "Neutral", 0.4
+    margin = abs(positive - negative)
+    if margin == 0:
+        return "Neutral", 0.5
+    # Agreement between hits, scaled up by how many hits there are; one word alone is not enough
+    confidence = (margin / total) * min(1.0, 0.25 + 0.25 * margin)
+    return ("Positive" if positive > negative else "Negative"), round(confidence, 3)
+
+
+def _event(matches: List[Tuple[str, List[Tuple[int, int]]]]) -> Tuple[str, float]:
+    if not matches:
+        return "Other", 0.0
+    name, spans = matches[0]
+    # Two matches of the same rule are a clear signal, one is not; several rules mean a mixed story
+    confidence = 0.9 if len(spans) > 1 else SINGLE_CUE_CONFIDENCE
+    return name, round(confidence if len(matches) == 1 else confidence / len(matches) + 0.2, 3)
+
+
+def classify_sentiment(text: str) -> Tuple[str, float]:
+    """
+    Lexicon sentiment of a headline plus lede.
+    return:
+        (label, confidence) with label Positive, Negative or Neutral
+    """
+    return _sentiment(_lexicon_hits(text))
+
+
+def classify_event(text: str) -> Tuple[str, float]:
+    """
+    Rule-based event type of a headline plus lede.
+    return:
+        (event, confidence); "Other" with zero confidence when no rule matches
+    """
+    return _event(_rule_matches(text))
+
+
+def _label(text: str) -> Tuple[str, float, str, float]:
+    """Sentiment and event of `text`, each raised when a separate cue of the other backs it."""
+    hits = _lexicon_hits(text)
+    matches = _rule_matches(text)
+    sentiment, sentiment_confidence = _sentiment(hits)
+    event, event_confidence = _event(matches)
+    if sentiment != "Neutral" and len(matches) == 1:
+        # The lexicon word has to sit outside the rule's match, so one token never counts twice
+        polarity = 1 if sentiment == "Positive" else -1
+        spans = matches[0][1]
+        if any(hit == polarity and not any(start <= offset < end for start, end in spans) for offset, hit in hits):
+            sentiment_confidence = max(sentiment_confidence, CORROBORATED_CONFIDENCE)
+            event_confidence = max(event_confidence, CORROBORATED_CONFIDENCE)
+    return sentiment, sentiment_confidence, event, event_confidence
+
+
+def classify_article(article: Dict) -> Dict:
+    """
+    Labels one article locally.
+    return:
+        a dict with sentiment, sentiment_confidence, event, event_confidence and needs_model
+    """
+    title = article.get("title") or ""
+    sentiment, sentiment_confidence, event, event_confidence = _label(title)
+    if (sentiment_confidence < MIN_SENTIMENT_CONFIDENCE or event_confidence < MIN_EVENT_CONFIDENCE) and _lede(article):
+        # The headline alone is ambiguous, let the lede weigh in
+        sentiment, sentiment_confidence, event, event_confidence = _label(f"{title}. {_lede(article)}")
+    needs_model = (
+        sentiment_confidence < MIN_SENTIMENT_CONFIDENCE
+        or event_confidence < MIN_EVENT_CONFIDENCE
+        or len(article.get("content") or "") > LONG_FORM_CHARS
+    )
+    return {
+        "sentiment": sentiment,
+        "sentiment_confidence": sentiment_confidence,
+        "event": event,
+        "event_confidence": event_confidence,
+        "needs_model": needs_model,
+    }
+
+
+def format_prelabeled_markdown(articles: List[Dict]) -> str:
+    """Renders locally labeled articles in finance_news_analyzer_agent's output layout."""
+    blocks = []
+    for article in articles:
+        labels = article["labels"]
+        takeaway = re.split(r"(?<=[.!?])\s", (article.get("content") or "").strip(), maxsplit=1)[0]
+        blocks.append(
+            f"Title: {article.get('title', '')}\n"
+            f"Date: {article.get('date', '')}\n"
+            f"Sentiment: {labels['sentiment']}\n"
+            f"Event: {labels['event']}\n"
+            f"Key takeaway: {takeaway}\n"
+        )
+    return "\n".join(blocks)
+
+
+def evaluate(fixture_path: str) -> dict:
+    """
+    Measures throughput and agreement with a labeled fixture set: a JSON list of
+    {"title", "content" (optional), "sentiment", "event"} items.
+    """
+    import json
+    import time
+
+    with open(fixture_path, encoding="utf-8") as f:
+        items = json.load(f)
+
+    start = time.perf_counter()
+    predictions = [classify_article(item) for item in items]
+    elapsed = time.perf_counter() - start
+
+    local = [(item, p) for item, p in zip(items, predictions) if not p["needs_model"]]
+    return {
+        "items": len(items),
+        "articles_per_s": round(len(items) / elapsed) if elapsed else None,
+        "sentiment_agreement": round(sum(p["sentiment"] == item["sentiment"] for item, p in zip(items, predictions)) / len(items), 3),
+        "event_agreement": round(sum(p["event"] == item["event"] for item, p in zip(items, predictions)) / len(items), 3),
+        "labeled_locally": len(local),
+        "local_sentiment_agreement": round(sum(p["sentiment"] == item["sentiment"] for item, p in local) / len(local), 3) if local else None,
+        "local_event_agreement": round(sum(p["event"] == item["event"] for item, p in local) / len(local), 3) if local else None,
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import os
+    import sys
+
+    # labeled_headlines.json was written alongside the rules; heldout_headlines.json was labeled
+    # before the rules were tuned and is the figure to trust
+    data_dir = os.path.join(os.path.dirname(__file__), "data")
+    paths = sys.argv[1:] or [os.path.join(data_dir, name) for name in ("labeled_headlines.json", "heldout_headlines.json")]
+    print(json.dumps({os.path.basename(path): evaluate(path) for path in paths}, indent=2))
@@ -0,0 +1,173 @@
+import math
+import re
+from typing import Dict, List
+
+# Yahoo article widgets that never carry article text; removed from the DOM before text extraction
+BOILERPLATE_SELECTORS = [
+    "script", "style", "noscript", "iframe", "svg", "button", "figure", "aside",
+    "div.caas-da", "div.gemini-ad", "div[class^='ad-']", "div[id^='ad-']", "[data-testid='inarticle-ad']",
+    "div.caas-readmore", "div.readmore", "div.caas-share-buttons", "div[class*='share']",
+    "div.caas-xray", "div.caas-iframe", "div.caas-jump-link-wrapper", "div.caas-body-collapse-button",
+    "div[class*='newsletter']", "div[class*='related']", "div.view-cmts-cta", "div[class*='recommend']",
+]
+
+# Whole lines that are promotion, navigation or sharing rather than reporting
+BOILERPLATE_LINE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"^(story continues|continue reading|read more|view comments|view more|see more)\b",
+    r"^(sign up|subscribe|get the latest|click here|download the app|join \d)",
+    r"^(advertisement|sponsored|ad feedback|recommended stories|related( articles| stories)?:?)$",
+    r"^(share|tweet|email|copy link|print|facebook|twitter|linkedin|reddit)( this| on \w+)?$",
+    r"^most read from\b",
+    r"^(image|photo|video)( source| credit)?:",
+    r"^(sign up|subscribe|register)\b.{0,60}\bnewsletters?\b",
+    r"\bnewsletters?\b.{0,30}\b(sign[- ]?up|subscribe|delivered to your inbox|in your inbox)\b",
+    r"^(see also|also read|more from|don't miss|trending now)\b",
+    r"^this article (was )?originally (appeared|published) on\b",
+)]
+# Short lines without sentence punctuation that are page chrome, not reporting: ticker chips,
+# bylines, read times, source labels. Subheads and figures ("Revenue: $30.0 billion") do not match.
+SHORT_LINE_PATTERNS = [re.compile(r"^\$?[A-Z]{1,5}([.-][A-Z]{1,2})?( [+-]?\d+(\.\d+)?%)*$")] + [re.compile(p, re.IGNORECASE) for p in (
+    r"^\d+ min(ute)?s? read$",
+    r"^(by|written by|reporting by|edited by) [\w .,'-]+$",
+    r"^(updated|published) .{0,30}\d",
+    r"^(add to watchlist|quote lookup|follow|unfollow|comments?|listen|play|\d+ comments?)$",
+    r"^(reuters|bloomberg|associated press|ap|yahoo finance|the motley fool|motley fool|zacks|benzinga|investopedia|barchart|insidermonkey|gurufocus)$",
+)]
+# Only lines shorter than this can match SHORT_LINE_PATTERNS
+MIN_SENTENCE_CHARS = 40
+# Paragraphs sharing this much of their word shingles are considered the same paragraph
+NEAR_DUPLICATE_JACCARD = 0.6
+
+
+# Block-level tags that hold one paragraph each in a Yahoo article body
+PARAGRAPH_TAGS = ["p", "h2", "h3", "h4", "li", "blockquote"]
+
+
+def strip_boilerplate(body) -> None:
+    """Removes known widget nodes from a BeautifulSoup element in place."""
+    for node in body.select(", ".join(BOILERPLATE_SELECTORS)):
+        node.decompose()
+
+
+def block_text(body) -> str:
+    """
+    Text of a BeautifulSoup element with one paragraph per line. Inline tags such as links stay
+    inside their sentence, unlike get_text("\n") which breaks the line at every tag.
+    """
+    paragraphs = body.find_all(PARAGRAPH_TAGS)
+    if not paragraphs:
+        return body.get_text("\n", strip=True)
+    lines = (re.sub(r"\s+", " ", p.get_text()).strip() for p in paragraphs if not p.find(PARAGRAPH_TAGS))
+    return "\n".join(line for line in lines if line)
+
+
+def _is_boilerplate_line(line: str) -> bool:
+    if any(pattern.search(line) for pattern in BOILERPLATE_LINE_PATTERNS):
+        return True
+    # Short fragments with no sentence punctuation, but only the known kinds of chrome: a short
+    # line on its own may be a subhead or a figure worth keeping
+    if len(line) >= MIN_SENTENCE_CHARS or re.search(r"[.!?:;\"”)]$", line):
+        return False
+    return any(pattern.search(line) for pattern in SHORT_LINE_PATTERNS)
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def clean_text(text: str) -> str:
+    """
+    Removes boilerplate lines and near-duplicate paragraphs from extracted article text.
+    Idempotent, so already cleaned (e.g. cached) articles can pass through again.
+    args:
+        text: article text with one paragraph per line
+    return:
+        the cleaned text, paragraphs separated by blank lines
+    """
+    kept: List[str] = []
+    seen: List[set] = []
+    for raw in text.splitlines():
+        line = re.sub(r"\s+", " ", raw).strip()
+        if not line or _is_boilerplate_line(line):
+            continue
+        shingles = _shingles(line)
+        if any(len(shingles & other) / len(shingles | other) >= NEAR_DUPLICATE_JACCARD for other in seen):
+            continue
+        seen.append(shingles)
+        kept.append(line)
+    return "\n\n".join(kept)
+
+
+def clean_article(article: Dict) -> Dict:
+    """Returns a copy of an article with its content cleaned; error entries are returned as is."""
+    if "error" in article or not article.get("content"):
+        return article
+    return {**article, "content": clean_text(article["content"])}
+
+
+def format_articles_markdown(articles: List[Dict]) -> str:
+    """
+    Renders articles in the Markdown layout news_collector used to produce with an LLM.
+    Articles that failed to load are left out and counted at the end.
+    """
+    blocks = []
+    failed = 0
+    for article in articles:
+        if "error" in article:
+            failed += 1
+            continue
+        blocks.append(
+            f"* **Title:** {article.get('title', '')} \n"
+            f"* **Date:** {article.get('date', '')} \n"
+            f"* **Content:** \n\n"
+            f"{article.get('content', '')}\n"
+        )
+    summary = f"Processed {len(blocks)} news articles."
+    if failed:
+        summary += f" {failed} article(s) could not be loaded."
+    return "\n".join(blocks + [summary])
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini/GPT token estimate (~4 characters per token), good enough to compare before/after."""
+    return math.ceil(len(text) / 4)
+
+
+def token_report(fixtures_dir: str) -> dict:
+    """
+    Extracts each saved article page (*.html in `fixtures_dir`) twice, raw and with DOM and text
+    cleaning, and compares the estimated token counts.
+    """
+    import glob
+    import os
+    from bs4 import BeautifulSoup
+
+    before = after = 0
+    pages = sorted(glob.glob(os.path.join(fixtures_dir, "*.html")))
+    for path in pages:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        soup = BeautifulSoup(html, "html.parser")
+        body = soup.select_one("div.caas-body") or soup.select_one("article")
+        if body is None:
+            continue
+        before += estimate_tokens(block_text(body))
+        strip_boilerplate(body)
+        after += estimate_tokens(clean_text(block_text(body)))
+    return {
+        "fixtures": len(pages),
+        "tokens_before": before,
+        "tokens_after": after,
+        "reduction": round(1 - after / before, 3) if before else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    fixtures = sys.argv[1] if len(sys.argv) > 1 else "fixtures/articles"
+    print(json.dumps(token_report(fixtures), indent=2))
@@ -0,0 +1,149 @@
+import hashlib
+import re
+from typing import Dict, List
+import numpy as np
+
+# Titles whose 64-bit SimHashes differ in at most this many bits are the same story
+TITLE_MAX_HAMMING = 3
+# Estimated Jaccard similarity of body shingles above which two articles are the same wire story
+BODY_MIN_JACCARD = 0.7
+SHINGLE_WORDS = 5
+NUM_PERMUTATIONS = 64
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20250613)
+# 32-bit coefficients and shingle hashes keep a * x + b below 2**64, so uint64 never wraps
+_PERM_A = _rng.integers(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+# Words that differ between reprints of the same headline without changing the story
+_TITLE_STOPWORDS = {"a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "is", "are", "as", "at", "by", "with"}
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9$%]+", text.lower())
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of a title's words (stopwords ignored)."""
+    votes = [0] * 64
+    for word in _words(text):
+        if word in _TITLE_STOPWORDS:
+            continue
+        h = _hash64(word)
+        for bit in range(64):
+            votes[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if votes[bit] > 0)
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature over word shingles of an article body."""
+    words = _words(text)
+    if len(words) < SHINGLE_WORDS:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    x = np.array([_hash64(s) >> 32 for s in shingles], dtype=np.uint64)
+    hashed = (_PERM_A[:, None] * x[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return hashed.min(axis=1)
+
+
+def dedupe_links(links: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Drops links whose title is a near duplicate of an earlier one, before any page is rendered.
+    args:
+        links: dicts with url and title, in page order
+    return:
+        the links that introduce a new story, in the same order
+    """
+    kept = []
+    fingerprints = []
+    for link in links:
+        title = link.get("title") or ""
+        if not _words(title):
+            kept.append(link)
+            continue
+        fingerprint = simhash(title)
+        if any(bin(fingerprint ^ other).count("1") <= TITLE_MAX_HAMMING for other in fingerprints):
+            continue
+        fingerprints.append(fingerprint)
+        kept.append(link)
+    return kept
+
+
+def merge_near_duplicates(articles: List[Dict]) -> List[Dict]:
+    """
+    Clusters fetched articles whose bodies (or titles) are near duplicates, e.g. the same Reuters
+    story under several URLs. Each cluster is reduced to its longest article, which lists the
+    others under "duplicates". Articles with an error are passed through untouched.
+    """
+    candidates = [i for i, article in enumerate(articles) if "error" not in article and article.get("content")]
+    signatures = {i: minhash(articles[i]["content"]) for i in candidates}
+    titles = {i: simhash(articles[i]["title"]) for i in candidates if _words(articles[i].get("title") or "")}
+
+    # Union-find over the pairs; a scrape holds a few dozen articles, so pairwise comparison is cheap
+    parent = {i: i for i in candidates}
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for n, i in enumerate(candidates):
+        for j in candidates[n + 1:]:
+            same_body = np.mean(signatures[i] == signatures[j]) >= BODY_MIN_JACCARD
+            same_title = i in titles and j in titles and bin(titles[i] ^ titles[j]).count("1") <= TITLE_MAX_HAMMING
+            if same_body or same_title:
+                parent[find(j)] = find(i)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in candidates:
+        clusters.setdefault(find(i), []).append(i)
+
+    keep = {}
+    for members in clusters.values():
+        best = max(members, key=lambda i: len(articles[i]["content"]))
+        keep[best] = [articles[i] for i in members if i != best]
+
+    merged = []
+    for i, article in enumerate(articles):
+        if i not in signatures:
+            merged.append(article)
+        elif i in keep:
+            if keep[i]:
+                article = {**article, "duplicates": [{"url": d.get("url"), "title": d.get("title")} for d in keep[i]]}
+            merged.append(article)
+    return merged
+
+
+class NearDuplicateFilter:
+    """
+    Incremental form of merge_near_duplicates for articles that arrive one at a time: an article
+    that is a near duplicate of one already accepted is rejected. The first copy to arrive wins,
+    since the earlier one has usually been shown already.
+    """
+
+    def __init__(self):
+        self._signatures: List[np.ndarray] = []
+        self._titles: List[int] = []
+
+    def accept(self, article: Dict) -> bool:
+        """Records the article and returns True unless it repeats an accepted one. Articles with an error are always accepted."""
+        if "error" in article or not article.get("content"):
+            return True
+        signature = minhash(article["content"])
+        title = simhash(article["title"]) if _words(article.get("title") or "") else None
+        for seen in self._signatures:
+            if np.mean(signature == seen) >= BODY_MIN_JACCARD:
+                return False
+        if title is not None and any(bin(title ^ seen).count("1") <= TITLE_MAX_HAMMING for seen in self._titles):
+            return False
+        self._signatures.append(signature)
+        if title is not None:
+            self._titles.append(title)
+        return True
@@ -0,0 +1,191 @@
+import asyncio
+from typing import Dict, Optional
+import httpx
+from bs4 import BeautifulSoup
+from .cleaner import block_text, clean_text, strip_boilerplate
+from ...telemetry import record_error
+
+# A browser-like UA; Yahoo serves a stripped page to unknown clients
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+# Anything shorter is most likely a teaser or a paywall stub, let the browser handle it
+MIN_BODY_CHARS = 200
+CONSENT_MARKERS = ("consent.yahoo.com", "guce.yahoo.com", 'name="agree"', "consent-form")
+
+# How many articles each tier resolved since start-up
+TIER_STATS = {"static": 0, "browser": 0, "failed": 0}
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    # httpx pools connections per event loop, same as the browser pool
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            headers=HTTP_HEADERS,
+            follow_redirects=True,
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    """Closes the shared HTTP client if one is open on the running loop."""
+    global _client
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+
+
+def is_consent_wall(html: str, final_url: str = "") -> bool:
+    """Detects the Yahoo/GUCE consent interstitial that only a real browser can click through."""
+    return any(marker in final_url or marker in html[:20000] for marker in CONSENT_MARKERS)
+
+
+def parse_article_html(html: str) -> Optional[Dict[str, str]]:
+    """
+    Parses a Yahoo Finance article statically with the same selectors as the browser tier,
+    dropping widget nodes and boilerplate lines on the way.
+    args:
+        html: raw article page html
+    return:
+        a dict with title, date, content, or None when the page cannot be parsed without a browser
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.select_one("h1.cover-title")
+    time_tag = soup.select_one("time.byline-attr-meta-time")
+    body = soup.select_one("div.caas-body")
+    if title is None or time_tag is None or body is None:
+        return None
+
+    strip_boilerplate(body)
+    content = clean_text(block_text(body))
+    if len(content) < MIN_BODY_CHARS:
+        return None
+    return {
+        "title": title.get_text(strip=True),
+        "date": time_tag.get_text(strip=True),
+        "content": content,
+    }
+
+
+async def fetch_article_static(url: str) -> Optional[Dict[str, str]]:
+    """
+    Fast path: fetches an article over pooled keep-alive HTTP and parses it without a browser.
+    args:
+        url: yahoo finance article url
+    return:
+        a dict with title, date, content, url, or None when the browser tier is needed
+    """
+    try:
+        response = await _get_http_client().get(url)
+    except httpx.HTTPError as e:
+        record_error(e)
+        return None
+    if response.status_code != 200:
+        return None
+    html = response.text
+    if is_consent_wall(html, str(response.url)):
+        return None
+    # BeautifulSoup is CPU bound, keep it off the event loop
+    article = await asyncio.to_thread(parse_article_html, html)
+    if article is None:
+        return None
+    article["url"] = url
+    return article
+
+
+def tier_hit_rates() -> dict:
+    """
+    return:
+        the share of articles resolved by each tier, plus the raw counts
+    """
+    total = sum(TIER_STATS.values())
+    rates = {tier: round(count / total, 3) if total else 0.0 for tier, count in TIER_STATS.items()}
+    return {"total": total, "counts": dict(TIER_STATS), "rates": rates}
+
+
+async def benchmark(fixtures_dir: str) -> dict:
+    """
+    Compares the static parser against Playwright on saved article pages (*.html in `fixtures_dir`).
+    Reports articles per second for both tiers, Python heap peak for the static tier and
+    the peak RSS of the Chromium children for the browser tier.
+    """
+    import glob
+    import os
+    import resource
+    import time
+    import tracemalloc
+    from playwright.async_api import async_playwright
+
+    paths = sorted(glob.glob(os.path.join(fixtures_dir, "*.html")))
+    pages = [open(path, encoding="utf-8").read() for path in paths]
+    if not pages:
+        return {"error": f"No .html fixtures found in {fixtures_dir}"}
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    static_ok = sum(parse_article_html(html) is not None for html in pages)
+    static_s = time.perf_counter() - start
+    _, static_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    browser_ok = 0
+    start = time.perf_counter()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        for html in pages:
+            await page.set_content(html, wait_until="domcontentloaded")
+            try:
+                await page.locator("h1.cover-title").inner_text(timeout=2000)
+                await page.locator("time.byline-attr-meta-time").inner_text(timeout=2000)
+                await page.locator("div.caas-body").inner_text(timeout=2000)
+                browser_ok += 1
+            except Exception:
+                pass
+        await browser.close()
+    browser_s = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1 if os.uname().sysname == "Darwin" else 1024
+
+    return {
+        "fixtures": len(pages),
+        "static": {"parsed": static_ok, "articles_per_s": round(len(pages) / static_s, 1), "peak_heap_mb": round(static_peak / 2**20, 1)},
+        "browser": {"parsed": browser_ok, "articles_per_s": round(len(pages) / browser_s, 1), "peak_rss_mb": round(children_rss * scale / 2**20, 1)},
+    }
+
+
+async def save_fixtures(urls, fixtures_dir: str) -> None:
+    """Downloads article pages into `fixtures_dir` for the offline benchmark."""
+    import hashlib
+    import os
+
+    os.makedirs(fixtures_dir, exist_ok=True)
+    client = _get_http_client()
+    for url in urls:
+        response = await client.get(url)
+        name = hashlib.sha1(url.encode()).hexdigest()[:12] + ".html"
+        with open(os.path.join(fixtures_dir, name), "w", encoding="utf-8") as f:
+            f.write(response.text)
+    await close_http_client()
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    # python -m ...extractor <fixtures_dir> [url ...]  (urls are saved first)
+    fixtures = sys.argv[1] if len(sys.argv) > 1 else "fixtures/articles"
+    if len(sys.argv) > 2:
+        asyncio.run(save_fixtures(sys.argv[2:], fixtures))
+    print(json.dumps(asyncio.run(benchmark(fixtures)), indent=2))
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+FETCH_CONCURRENCY = int(os.getenv("NEWS_FETCH_CONCURRENCY", "4"))
+HOST_RATE_PER_S = float(os.getenv("NEWS_HOST_RATE_PER_S", "2"))
+HOST_BURST = int(os.getenv("NEWS_HOST_BURST", "4"))
+SCRAPE_DEADLINE_S = float(os.getenv("NEWS_SCRAPE_DEADLINE_S", "45"))
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens are added per second up to `capacity`,
+    each request takes one token and waits until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        # The lock keeps waiters in FIFO order so a burst drains at exactly `rate`
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class FetchScheduler:
+    """
+    Runs fetches with a bounded number of workers, a token bucket per host and one deadline
+    for the whole batch. Results come back in input order (run) or as they finish (stream); URLs that
+    did not finish before the deadline are reported with status "deadline_exceeded" instead of holding
+    the batch up.
+    args:
+        concurrency: maximum number of fetches in flight
+        host_rate: tokens per second granted to each host
+        host_burst: bucket capacity per host
+    """
+
+    def __init__(self, concurrency: int = FETCH_CONCURRENCY, host_rate: float = HOST_RATE_PER_S, host_burst: int = HOST_BURST):
+        self.concurrency = max(1, concurrency)
+        self.host_rate = host_rate
+        self.host_burst = max(1, host_burst)
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.host_rate, self.host_burst)
+        return self._buckets[host]
+
+    async def _stream(self, urls: List[str], fetch: Callable[[str], Awaitable[Dict]], deadline_s: Optional[float]) -> AsyncIterator[Tuple[int, Dict]]:
+        """Yields (position in urls, result) as each fetch finishes, then the unfinished ones at the deadline."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        batch_start = time.monotonic()
+        started: Dict[str, float] = {}
+
+        async def worker(url: str) -> Dict:
+            async with semaphore:
+                await self._bucket(url).acquire()
+                started[url] = time.monotonic()
+                try:
+                    result = await fetch(url)
+                except Exception as exc:
+                    result = {"error": f"Error extracting content: {type(exc).__name__}: {exc}"}
+                result.setdefault("url", url)
+                result["status"] = "error" if "error" in result else "ok"
+                result["elapsed_s"] = round(time.monotonic() - started.get(url, batch_start), 3)
+                return result
+
+        tasks = {asyncio.create_task(worker(url)): i for i, url in enumerate(urls)}
+        deadline = None if deadline_s is None else loop.time() + deadline_s
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    yield tasks[task], task.result()
+        finally:
+            # Also runs when the consumer stops early, so no fetch outlives the stream
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if pending:
+            print(f"Scrape deadline of {deadline_s}s reached, {len(pending)} of {len(urls)} articles unfinished")
+        now = time.monotonic()
+        for task in sorted(pending, key=tasks.get):
+            url = urls[tasks[task]]
+            yield tasks[task], {
+                "url": url,
+                "status": "deadline_exceeded" if url in started else "not_started",
+                "error": f"Not finished within the {deadline_s}s scrape deadline",
+                "elapsed_s": round(now - started[url], 3) if url in started else 0.0,
+            }
+
+    async def stream(self, urls: List[str], fetch: Callable[[str], Awaitable[Dict]], deadline_s: Optional[float] = SCRAPE_DEADLINE_S) -> AsyncIterator[Dict]:
+        """
+        Like run, but yields each result as soon as its fetch finishes (completion order), so callers
+        can start on the fastest pages. At the deadline the unfinished urls are cancelled and yielded
+        with status "deadline_exceeded" or "not_started".
+        """
+        async for _, result in self._stream(urls, fetch, deadline_s):
+            yield result
+
+    async def run(self, urls: List[str], fetch: Callable[[str], Awaitable[Dict]], deadline_s: Optional[float] = SCRAPE_DEADLINE_S) -> List[Dict]:
+        """
+        Fetches every url with `fetch` and annotates each result with url, status and elapsed_s.
+        args:
+            urls: urls to fetch
+            fetch: coroutine function returning a dict for one url
+            deadline_s: seconds allowed for the whole batch, None for no deadline
+        return:
+            a list of result dicts in the same order as urls
+        """
+        results: Dict[int, Dict] = {}
+        async for position, result in self._stream(urls, fetch, deadline_s):
+            results[position] = result
+        return [results[i] for i in range(len(urls))]
@@ -0,0 +1,184 @@
+import os
+import time
+from typing import Optional
+from urllib.parse import urlparse
+from playwright.async_api import Page, Route
+
+# "lean" blocks everything text extraction does not need, "full" loads pages like a normal browser
+SCRAPE_MODE = os.getenv("NEWS_SCRAPE_MODE", "lean")
+
+# Scripts, xhr and fetch stay allowed: the consent dialog and "Continue Reading" need them
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet", "manifest", "texttrack", "eventsource", "websocket", "other"}
+BLOCKED_HOST_SUFFIXES = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "googleadservices.com",
+    "amazon-adsystem.com",
+    "scorecardresearch.com",
+    "taboola.com",
+    "outbrain.com",
+    "criteo.com",
+    "moatads.com",
+    "adsrvr.org",
+    "ads.yahoo.com",
+    "analytics.yahoo.com",
+    "geo.yahoo.com",
+    "gemini.yahoo.com",
+    "pbs.yahoo.com",
+)
+
+# Traffic of every page the scraper opened since start-up
+TRAFFIC = {"pages": 0, "requests": 0, "blocked_requests": 0, "bytes": 0, "page_s": 0.0}
+
+
+def is_lean() -> bool:
+    return SCRAPE_MODE == "lean"
+
+
+def is_blocked(resource_type: str, url: str) -> bool:
+    """True when a request is not needed to read the article text."""
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(url).hostname or ""
+    return any(host == suffix or host.endswith("." + suffix) for suffix in BLOCKED_HOST_SUFFIXES)
+
+
+class PageStats:
+    """Requests, blocked requests, bytes received and wall time for one page lease, also added to TRAFFIC."""
+
+    def __init__(self):
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+        self._start = time.perf_counter()
+        self.elapsed_s: Optional[float] = None
+
+    def stop(self) -> None:
+        self.elapsed_s = round(time.perf_counter() - self._start, 3)
+        TRAFFIC["pages"] += 1
+        TRAFFIC["page_s"] += self.elapsed_s
+
+    def add_bytes(self, count: int) -> None:
+        self.bytes += count
+        TRAFFIC["bytes"] += count
+
+    def to_dict(self) -> dict:
+        return {"requests": self.requests, "blocked_requests": self.blocked, "bytes": self.bytes, "page_s": self.elapsed_s}
+
+
+async def prepare_page(page: Page, lean: Optional[bool] = None) -> PageStats:
+    """
+    Starts counting traffic on a page and, in lean mode, aborts every blocked request.
+    args:
+        page: a freshly leased page
+        lean: override NEWS_SCRAPE_MODE for this page
+    return:
+        the PageStats that fill up while the page is used
+    """
+    stats = PageStats()
+
+    async def on_finished(request):
+        try:
+            sizes = await request.sizes()
+            stats.add_bytes(sizes["responseBodySize"] + sizes["responseHeadersSize"])
+        except Exception:
+            pass
+
+    def on_request(_request):
+        stats.requests += 1
+        TRAFFIC["requests"] += 1
+
+    page.on("request", on_request)
+    page.on("requestfinished", on_finished)
+
+    if is_lean() if lean is None else lean:
+        async def route(route: Route):
+            request = route.request
+            if is_blocked(request.resource_type, request.url):
+                stats.blocked += 1
+                TRAFFIC["blocked_requests"] += 1
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await page.route("**/*", route)
+    return stats
+
+
+def traffic_summary() -> dict:
+    """
+    return:
+        totals plus average bytes and seconds per page opened by the scraper
+    """
+    pages = TRAFFIC["pages"]
+    return {
+        "mode": SCRAPE_MODE,
+        **TRAFFIC,
+        "page_s": round(TRAFFIC["page_s"], 3),
+        "avg_kb_per_page": round(TRAFFIC["bytes"] / pages / 1024, 1) if pages else 0.0,
+        "avg_s_per_page": round(TRAFFIC["page_s"] / pages, 3) if pages else 0.0,
+    }
+
+
+async def benchmark(fixtures_dir: str, port: int = 8765) -> dict:
+    """
+    Serves saved article pages (*.html in `fixtures_dir`) from a local HTTP server and loads each one
+    in full and in lean mode, reporting the average bytes transferred and time per page.
+    """
+    import glob
+    import functools
+    import threading
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+    from playwright.async_api import async_playwright
+
+    names = sorted(os.path.basename(path) for path in glob.glob(os.path.join(fixtures_dir, "*.html")))
+    if not names:
+        return {"error": f"No .html fixtures found in {fixtures_dir}"}
+
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=fixtures_dir)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    report = {"fixtures": len(names)}
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            for mode in ("full", "lean"):
+                totals = {"bytes": 0, "page_s": 0.0, "blocked_requests": 0}
+                for name in names:
+                    context = await browser.new_context()
+                    page = await context.new_page()
+                    stats = await prepare_page(page, lean=mode == "lean")
+                    try:
+                        if mode == "lean":
+                            await page.goto(f"http://127.0.0.1:{port}/{name}", wait_until="domcontentloaded", timeout=30000)
+                            await page.wait_for_selector("div.caas-body, article", timeout=15000)
+                        else:
+                            await page.goto(f"http://127.0.0.1:{port}/{name}", wait_until="load", timeout=60000)
+                    except Exception:
+                        pass
+                    stats.stop()
+                    await context.close()
+                    totals["bytes"] += stats.bytes
+                    totals["page_s"] += stats.elapsed_s
+                    totals["blocked_requests"] += stats.blocked
+                report[mode] = {
+                    "avg_kb_per_page": round(totals["bytes"] / len(names) / 1024, 1),
+                    "avg_s_per_page": round(totals["page_s"] / len(names), 3),
+                    "blocked_requests": totals["blocked_requests"],
+                }
+            await browser.close()
+    finally:
+        server.shutdown()
+    return report
+
+
+if __name__ == "__main__":
+    import asyncio
+    import json
+    import sys
+
+    fixtures = sys.argv[1] if len(sys.argv) > 1 else "fixtures/articles"
+    print(json.dumps(asyncio.run(benchmark(fixtures)), indent=2))
@@ -0,0 +1,89 @@
+import os
+from typing import AsyncGenerator, Dict, List
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from .classifier import format_prelabeled_markdown
+from .cleaner import format_articles_markdown
+from .fetcher import SCRAPE_DEADLINE_S
+from .tools import stream_news
+
+# Articles the model analyzes per call while the rest are still loading
+NEWS_STREAM_BATCH = int(os.getenv("NEWS_STREAM_BATCH", "2"))
+# Articles fetched when the request does not ask for a number
+NEWS_STREAM_NUM_URL = int(os.getenv("NEWS_STREAM_NUM_URL", "10"))
+
+
+class StreamingNewsAgent(BaseAgent):
+    """
+    News pipeline that analyzes articles while the others are still being fetched. Its first
+    sub-agent reads the ticker and article count from the conversation into state['news_request']
+    (set_news_request), like news_collector does for the sequential pipeline. Articles then come
+    from stream_news in completion order: locally labeled ones are reported right away, the rest
+    go to the batch analyzer (the second sub-agent) `batch_size` at a time. After every step the
+    report so far is written to state['news_analysis_partial'] and shown to the user, and the
+    finished report ends up in state['news_analysis_result'] like with the sequential pipeline.
+    """
+
+    num_url: int = NEWS_STREAM_NUM_URL
+    batch_size: int = NEWS_STREAM_BATCH
+    deadline_s: float = SCRAPE_DEADLINE_S
+
+    def _event(self, ctx: InvocationContext, text: str = "", state_delta: Dict = None) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]) if text else None,
+            actions=EventActions(state_delta=state_delta or {}),
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        parser, analyzer = self.sub_agents
+        # Drop the previous turn's request, so a turn without a ticker does not reuse it
+        yield self._event(ctx, state_delta={"news_request": None})
+        async for event in parser.run_async(ctx):
+            yield event
+        request = ctx.session.state.get("news_request")
+        if not request:
+            # The parser has asked the user which stock they mean
+            return
+        ticker = request["ticker"]
+        num_url = request.get("num_url") or self.num_url
+
+        report: List[str] = []
+        batch: List[Dict] = []
+        analyzed = failed = 0
+
+        async def analyze(articles: List[Dict]) -> AsyncGenerator[Event, None]:
+            yield self._event(ctx, state_delta={"news_batch": format_articles_markdown(articles)})
+            async for event in analyzer.run_async(ctx):
+                yield event
+            report.append(ctx.session.state.get(analyzer.output_key) or "")
+            yield self._event(ctx, state_delta={"news_analysis_partial": "\n".join(report)})
+
+        async for article in stream_news(ticker, num_url=num_url, deadline_s=self.deadline_s):
+            if "error" in article:
+                failed += 1
+                continue
+            analyzed += 1
+            if not article["labels"]["needs_model"]:
+                block = format_prelabeled_markdown([article])
+                report.append(block)
+                yield self._event(ctx, block, {"news_analysis_partial": "\n".join(report)})
+                continue
+            batch.append(article)
+            if len(batch) >= self.batch_size:
+                async for event in analyze(batch):
+                    yield event
+                batch = []
+        if batch:
+            async for event in analyze(batch):
+                yield event
+
+        summary = f"Analyzed {analyzed} news articles for {ticker}."
+        if failed:
+            summary += f" {failed} article(s) could not be loaded."
+        result = "\n".join(report + [summary])
+        yield self._event(ctx, summary, {"news_analysis_partial": result, "news_analysis_result": result})
@@ -1,27 +1,74 @@
 import asyncio
-from typing import Dict, List
-from playwright.async_api import async_playwright, Browser, TimeoutError as PlaywrightTimeoutError
+import os
+from typing import AsyncIterator, Dict, List, Optional
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from google.adk.tools import ToolContext
+from .browser_pool import BrowserPool, get_browser_pool, shutdown_browser_pool
+from .fetcher import FetchScheduler, SCRAPE_DEADLINE_S
+from .cache import get_article_cache
+from .extractor import TIER_STATS, close_http_client, fetch_article_static, tier_hit_rates
+from .lean import is_lean, prepare_page, traffic_summary
+from .cleaner import BOILERPLATE_SELECTORS, clean_article, clean_text, format_articles_markdown
+from .dedup import NearDuplicateFilter, dedupe_links, merge_near_duplicates
+from .classifier import classify_article, format_prelabeled_markdown
+from ...telemetry import record_cache, record_error, stage, traced_tool
 
-async def get_yahoo_article_content(browser: Browser, url: str) -> Dict[str, str]:
+# Origin of the quote and article pages; the benchmark suite points it at a local fixture server
+YAHOO_FINANCE_URL = os.getenv("YAHOO_FINANCE_URL", "https://finance.yahoo.com").rstrip("/")
+
+# Shared by every scrape so the per-host rate limit holds across concurrent sessions
+_scheduler = FetchScheduler()
+
+async def get_yahoo_article_content(url: str, pool: Optional[BrowserPool] = None) -> Dict[str, str]:
     """
     Extracts the main article content from a given Yahoo Finance URL.
+    A plain HTTP fetch is tried first; the browser is only used when the static parse fails
+    or Yahoo answers with a consent wall.
     args:
-        browser: playwright browser
         url: yahoo finance article url
+        pool: browser pool to lease the page from, defaults to the shared process-wide pool
     return:
-        a dict with title, date, content, url, or error
+        a dict with title, date, content, url, tier, or error
     """
-    page = await browser.new_page()
+    with stage("http article", url=url):
+        article = await fetch_article_static(url)
+    if article is not None:
+        TIER_STATS["static"] += 1
+        article["tier"] = "static"
+        return article
+
+    if pool is None:
+        pool = await get_browser_pool()
+    with stage("browser article", url=url):
+        async with pool.lease_page() as page:
+            stats = await prepare_page(page)
+            article = await _extract_article(page, url, lean=is_lean())
+            stats.stop()
+    if "error" in article:
+        TIER_STATS["failed"] += 1
+    else:
+        TIER_STATS["browser"] += 1
+        article["tier"] = "browser"
+    return article
+
+async def _extract_article(page, url: str, lean: bool = False) -> Dict[str, str]:
+    consent_iframe = 'iframe[title="Consent Management Z Dialog"]'
     try:
-        await page.goto(url, wait_until="load", timeout=60000)
+        if lean:
+            # Wait for what we actually read (or the consent dialog) instead of every subresource
+            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            await page.wait_for_selector(f"div.caas-body, article, {consent_iframe}", timeout=15000)
+        else:
+            await page.goto(url, wait_until="load", timeout=60000)
         # await page.goto(url, wait_until="domcontentloaded", timeout=60000)
 
         # Handle consent dialog (this logic is good)
-        try:
-            consent_frame_locator = page.frame_locator('iframe[title="Consent Management Z Dialog"]')
-            await consent_frame_locator.locator('button:has-text("Accept all")').click(timeout=7000)
-        except Exception:
-            pass # Ignore if not found
+        if not lean or await page.locator(consent_iframe).count():
+            try:
+                consent_frame_locator = page.frame_locator(consent_iframe)
+                await consent_frame_locator.locator('button:has-text("Accept all")').click(timeout=7000)
+            except Exception:
+                pass # Ignore if not found
 
         # Wait for the main content area to ensure the page is ready
         await page.wait_for_selector("main", timeout=15000)
@@ -31,7 +78,10 @@ async def get_yahoo_article_content(browser: Browser, url: str) -> Dict[str, str
             continue_btn = page.locator("button:has-text('Continue Reading')")
             if await continue_btn.is_visible(timeout=5000):
                 await continue_btn.click()
-                await page.wait_for_load_state('networkidle', timeout=20000)
+                if lean:
+                    await continue_btn.wait_for(state="hidden", timeout=10000)
+                else:
+                    await page.wait_for_load_state('networkidle', timeout=20000)
         except Exception:
             pass
 
@@ -53,6 +103,13 @@ async def get_yahoo_article_content(browser: Browser, url: str) -> Dict[str, str
             article_locator = page.locator('article').first
             await article_locator.wait_for(timeout=5000)
 
+        # Drop ads, share bars and related-story widgets inside the article before reading its text
+        await page.evaluate(
+            """(selectors) => document.querySelectorAll('div.caas-body, article')
+                .forEach(root => root.querySelectorAll(selectors).forEach(node => node.remove()))""",
+            ", ".join(BOILERPLATE_SELECTORS),
+        )
+
         # Now we extract the text using our specific locators.
         title_text = await title_locator.inner_text()
         time_text = await time_locator.inner_text()
@@ -61,77 +118,224 @@ async def get_yahoo_article_content(browser: Browser, url: str) -> Dict[str, str
         return {
             "title": title_text.strip(),
             "date": time_text.strip(),
-            "content": full_text.strip()
+            "content": clean_text(full_text)
         }
     except Exception as e:
+        record_error(e)
         return {
             "url": url,
             "error": f"Error extracting content: {type(e).__name__}: {e}"
         }
-    finally:
-        await page.close()
 
-async def scrape_news(ticker: str, num_url: int = 5) -> List[Dict[str, str]]:
+async def collect_article_links(ticker: str, pool: Optional[BrowserPool] = None) -> List[Dict[str, str]]:
     """
-    fetch news from yahoo finance
+    Collects the unique article links listed on a ticker's Yahoo Finance news page.
     args:
         ticker: stock ticker
-        num_url: number of news to fetch
+        pool: browser pool to lease the page from, defaults to the shared process-wide pool
     return:
-        a list of news, each news is a dict with title, date, content, url, or error
+        a list of dicts with the cleaned article url and its headline, in page order
     """
-    print(f"Starting to scrape Yahoo Finance news for {ticker}")
-    news_page_url = f"https://finance.yahoo.com/quote/{ticker}/news/"
+    news_page_url = f"{YAHOO_FINANCE_URL}/quote/{ticker}/news/"
     
     unique_article_urls = []
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True) 
-        page = await browser.new_page()
-        
+    if pool is None:
+        pool = await get_browser_pool()
+    async with pool.lease_page() as page:
+        stats = await prepare_page(page)
         try:
             await page.goto(news_page_url, wait_until="domcontentloaded", timeout=30000)
             await page.wait_for_selector('li.stream-item', timeout=20000)
             
             links_locators = await page.query_selector_all('li.stream-item a[href]')
             
-            seen_urls = set()
+            seen_urls = {}
             for link_loc in links_locators:
                 href = await link_loc.get_attribute('href')
                 if href:
                     if href.startswith('/'):
-                        href = f"https://finance.yahoo.com{href}"
+                        href = f"{YAHOO_FINANCE_URL}{href}"
                     
                     if "/news/" in href and ".html" in href:
                         clean_url = href.split('?')[0]
+                        # The headline is the anchor's title or its first line of text; the thumbnail anchor has none
+                        title = await link_loc.get_attribute('title') or (await link_loc.inner_text()).strip().split("\n")[0]
                         if clean_url not in seen_urls:
-                           seen_urls.add(clean_url)
-                           unique_article_urls.append(clean_url)
+                           seen_urls[clean_url] = {"url": clean_url, "title": title}
+                           unique_article_urls.append(seen_urls[clean_url])
+                        elif not seen_urls[clean_url]["title"]:
+                           seen_urls[clean_url]["title"] = title
         except Exception as e:
+            record_error(e)
             print(f"Error while scraping article links: {e}")
-        finally:
-            await page.close()
+        stats.stop()
+    return unique_article_urls
 
-        if not unique_article_urls:
-            print("Could not find any unique article URLs.")
-            await browser.close()
-            return []
+async def _select_urls(ticker: str, num_url: int) -> List[str]:
+    """The first `num_url` distinct article urls for the ticker, from the link cache or the news page."""
+    print(f"Starting to scrape Yahoo Finance news for {ticker}")
+    cache = get_article_cache()
 
-        print(f"Found {len(unique_article_urls)} unique article links. Fetching content for the first {num_url}...")
-        
-        urls_to_fetch = unique_article_urls[:num_url]
-        tasks = [get_yahoo_article_content(browser, url) for url in urls_to_fetch]
-        articles = await asyncio.gather(*tasks)
-        
-        await browser.close()
+    links = cache.get_links(ticker)
+    record_cache("links", hits=int(links is not None), misses=int(links is None))
+    if links is None:
+        with stage("browser news_page", ticker=ticker):
+            links = await collect_article_links(ticker)
+        if links:
+            cache.put_links(ticker, links)
+
+    if not links:
+        print("Could not find any unique article URLs.")
+        return []
+
+    # Reprints of the same headline are dropped here, before any page is rendered
+    distinct_links = dedupe_links(links)
+    print(f"Found {len(links)} unique article links ({len(links) - len(distinct_links)} repeated headlines skipped). Fetching content for the first {num_url}...")
+    return [link["url"] for link in distinct_links[:num_url]]
+
+@traced_tool
+async def scrape_news(ticker: str, num_url: int = 5, deadline_s: float = SCRAPE_DEADLINE_S, tool_context: Optional[ToolContext] = None):
+    """
+    fetch news from yahoo finance, with ads, sign-ups, share buttons and repeated paragraphs already removed
+    args:
+        ticker: stock ticker
+        num_url: number of news to fetch
+        deadline_s: seconds allowed for fetching all articles, unfinished ones are returned with an error
+    return:
+        a list of news, each news is a dict with title, date, content, url, status, elapsed_s, or error.
+        Near-duplicate stories are merged into one article that lists the others under duplicates.
+        Each article carries local sentiment/event labels with confidences under labels.
+        When called by an agent, the articles that still need the model are written to state['news_data']
+        as Markdown, the confidently labeled ones to state['news_prelabeled'], and only a short summary
+        (count and titles) is returned.
+    """
+    cache = get_article_cache()
+    urls_to_fetch = await _select_urls(ticker, num_url)
+    if not urls_to_fetch:
+        if tool_context is not None:
+            # Overwrite what an earlier ticker left in the session, or the analyzer would report it for this one
+            tool_context.state["news_data"] = f"No news articles were found for {ticker}."
+            tool_context.state["news_prelabeled"] = ""
+            return {"ticker": ticker, "articles": 0, "failed": 0, "saved_to_state": ["news_data", "news_prelabeled"]}
+        return []
+
+    cached = cache.get_articles(urls_to_fetch)
+    missing = [url for url in urls_to_fetch if url not in cached]
+    record_cache("articles", hits=len(cached), misses=len(missing))
+    print(f"{len(cached)} article(s) served from cache, fetching {len(missing)}")
+
+    fetched = {}
+    if missing:
+        # The pool is only started when an article actually needs the browser tier
+        results = await _scheduler.run(
+            missing,
+            get_yahoo_article_content,
+            deadline_s=deadline_s,
+        )
+        cache.put_articles(results)
+        fetched = {article["url"]: article for article in results}
+
+    articles = []
+    for url in urls_to_fetch:
+        if url in cached:
+            # Cleaning is idempotent, this only matters for entries stored before it existed
+            articles.append({**clean_article(cached[url]), "status": "cached", "elapsed_s": 0.0})
+        else:
+            articles.append(fetched[url])
+
+    # Same wire story under different urls and headlines: keep the longest copy
+    fetched_count = len(articles)
+    articles = merge_near_duplicates(articles)
+    duplicates_removed = fetched_count - len(articles)
+
+    # Local sentiment/event pre-labels; only ambiguous or long-form articles still need the model
+    articles = [article if "error" in article else {**article, "labels": classify_article(article)} for article in articles]
     
     print("--------  Finished scraping Yahoo Finance news --------")
+    if tool_context is not None:
+        # Called by news_collector: hand the articles to the analyzer through session state
+        # instead of making the model read them and write them out again
+        prelabeled = [article for article in articles if "error" not in article and not article["labels"]["needs_model"]]
+        for_model = [article for article in articles if "error" in article or article["labels"]["needs_model"]]
+        tool_context.state["news_data"] = format_articles_markdown(for_model)
+        tool_context.state["news_prelabeled"] = format_prelabeled_markdown(prelabeled)
+        return {
+            "ticker": ticker,
+            "articles": sum("error" not in article for article in articles),
+            "failed": sum("error" in article for article in articles),
+            "duplicates_removed": duplicates_removed,
+            "labeled_locally": len(prelabeled),
+            "titles": [article["title"] for article in articles if "error" not in article],
+            "saved_to_state": ["news_data", "news_prelabeled"],
+        }
     return articles
 
+@traced_tool
+def set_news_request(ticker: str, num_url: Optional[int] = None, tool_context: Optional[ToolContext] = None) -> dict:
+    """
+    Records which stock the user wants news for, and how many articles to fetch, for the streaming news pipeline.
+    args:
+        ticker: stock ticker symbol, e.g. 'NVDA' for Nvidia
+        num_url: number of news to fetch; leave it out for the default, 20 for deeper research
+    return:
+        the recorded request, also saved to state['news_request']
+    """
+    request = {"ticker": ticker.strip().lstrip("$").upper(), "num_url": num_url}
+    if tool_context is not None:
+        tool_context.state["news_request"] = request
+    return request
+
+async def stream_news(ticker: str, num_url: int = 5, deadline_s: float = SCRAPE_DEADLINE_S) -> AsyncIterator[Dict]:
+    """
+    Same articles as scrape_news, but yielded one by one as they become available: cached ones
+    first, then fetched ones in the order their pages finish, so analysis can start on the fastest.
+    Near duplicates of an article already yielded are skipped instead of merged, and failed or
+    unfinished fetches are yielded with an error like in scrape_news.
+    args:
+        ticker: stock ticker
+        num_url: number of news to fetch
+        deadline_s: seconds allowed for fetching all articles
+    """
+    cache = get_article_cache()
+    urls_to_fetch = await _select_urls(ticker, num_url)
+    if not urls_to_fetch:
+        return
+
+    cached = cache.get_articles(urls_to_fetch)
+    missing = [url for url in urls_to_fetch if url not in cached]
+    record_cache("articles", hits=len(cached), misses=len(missing))
+    print(f"{len(cached)} article(s) served from cache, streaming {len(missing)}")
+
+    seen = NearDuplicateFilter()
+
+    def label(article: Dict) -> Optional[Dict]:
+        if not seen.accept(article):
+            return None
+        return article if "error" in article else {**article, "labels": classify_article(article)}
+
+    for url in urls_to_fetch:
+        if url in cached:
+            article = label({**clean_article(cached[url]), "status": "cached", "elapsed_s": 0.0})
+            if article is not None:
+                yield article
+
+    if missing:
+        async for article in _scheduler.stream(missing, get_yahoo_article_content, deadline_s=deadline_s):
+            cache.put_articles([article])
+            article = label(article)
+            if article is not None:
+                yield article
+    print("--------  Finished streaming Yahoo Finance news --------")
+
 async def main():
     import json
 
     results = await scrape_news(ticker="NVDA", num_url=3)
     print(json.dumps(results, indent=2, ensure_ascii=False))
+    print(tier_hit_rates())
+    print(traffic_summary())
+    await shutdown_browser_pool()
+    await close_http_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
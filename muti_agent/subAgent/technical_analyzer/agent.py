@@ -1,9 +1,14 @@
 from google.adk.agents import Agent, LlmAgent
+from ...result_cache import result_cache_callbacks
 from .tools import (
-    get_historical_prices,
-    calculate_technical_indicators
+    get_historical_prices_async,
+    calculate_technical_indicators_async,
+    calculate_technical_indicators_batch_async,
+    screen_stocks_async,
 )
 
+_lookup_cached_result, _store_result, _record_tickers = result_cache_callbacks("technical_analysis_result")
+
 technical_analyzer = LlmAgent(
     name="technical_analyzer",
     model="gemini-2.0-flash",
@@ -16,6 +21,9 @@ technical_analyzer = LlmAgent(
     **Core Tasks:**
     1.  Analyze historical price and volume data to identify the primary trend (Uptrend, Downtrend, Sideways).
     2.  Interpret key technical indicators (e.g., SMA, RSI, MACD).
+    3.  For periods longer than one year, call `get_historical_prices` with `resample="weekly"` (or `"monthly"`) or a `max_points` limit instead of pulling every daily bar.
+    4.  When the user asks about several tickers at once (e.g., a watchlist), use `calculate_technical_indicators_batch` with all of them in one call and give one summary per ticker.
+    5.  When the user asks which stocks meet technical criteria (e.g., "which names are oversold with a bullish MACD cross"), use `screen_stocks` with one condition per criterion (e.g., `["rsi < 30", "macd_bullish_cross"]`) and list the matches instead of analyzing tickers one by one.
 
     **Mandatory Output Format:**
     ```markdown
@@ -31,6 +39,10 @@ technical_analyzer = LlmAgent(
     - **Moving Averages:** [e.g., Price is above the 50-day SMA, indicating a positive short-term trend.]
     ```
     """,
-    tools=[get_historical_prices, calculate_technical_indicators],
-    output_key="technical_analysis_result"
+    tools=[get_historical_prices_async, calculate_technical_indicators_async, calculate_technical_indicators_batch_async, screen_stocks_async],
+    output_key="technical_analysis_result",
+    # Reuse another session's analysis of the same ticker and daily bar
+    before_agent_callback=_lookup_cached_result,
+    after_agent_callback=_store_result,
+    after_tool_callback=_record_tickers,
 )
@@ -0,0 +1,112 @@
+from typing import Dict, Union
+import numpy as np
+import pandas as pd
+
+# Column-wise versions of the `ta` indicators used by calculate_technical_indicators.
+# Every function takes a wide DataFrame (one column per ticker) and returns one of the same shape,
+# computing all tickers in a single pandas/NumPy pass. Formulas mirror ta 0.11 with fillna=False.
+
+
+def align_by_position(closes: Dict[str, Union[pd.Series, np.ndarray]], dropna: bool = True) -> pd.DataFrame:
+    """
+    Wide frame of each ticker's non-NaN closes, aligned on their last bar instead of by date.
+    Tickers on different calendars (other exchanges, halts, recent listings) would otherwise get
+    NaN gaps from the union of their dates, which empty the rolling windows and count as flat days
+    in RSI. Shorter histories are padded with leading NaN, like a ticker listed later.
+    Use `dated` to put a ticker's dates back on a result column. With dropna=False NaN values are
+    kept in place, for a column that has to stay row for row with closes aligned the same way.
+    Plain arrays are taken as already in date order.
+    """
+    columns = {}
+    for symbol, series in closes.items():
+        if isinstance(series, pd.Series) and not series.index.is_monotonic_increasing:
+            series = series.sort_index()
+        values = np.asarray(series, dtype=np.float64)
+        columns[symbol] = values[~np.isnan(values)] if dropna else values
+    length = max((len(values) for values in columns.values()), default=0)
+    # One preallocated block: thousands of columns (screens) would make a dict of arrays slow
+    aligned = np.full((length, len(columns)), np.nan)
+    for i, values in enumerate(columns.values()):
+        aligned[length - len(values):, i] = values
+    return pd.DataFrame(aligned, columns=list(columns))
+
+
+def dated(values: pd.Series, dates: pd.Index) -> pd.Series:
+    """The last len(dates) values of an align_by_position column, indexed by the ticker's own dates."""
+    return pd.Series(values.to_numpy()[len(values) - len(dates):], index=dates, name=values.name)
+
+
+def sma(close: pd.DataFrame, window: int = 20) -> pd.DataFrame:
+    return close.rolling(window=window, min_periods=window).mean()
+
+
+def rsi(close: pd.DataFrame, window: int = 14) -> pd.DataFrame:
+    """Wilder RSI, same as ta.momentum.RSIIndicator(close, window).rsi()."""
+    diff = close.diff(1)
+    # Rows before a ticker's first close (shorter histories in a wide frame) stay NaN so its
+    # averages start where a single-ticker computation would
+    listed = close.notna()
+    up = diff.where(diff > 0, 0.0).where(listed)
+    down = -diff.where(diff < 0, 0.0).where(listed)
+    avg_up = up.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    avg_down = down.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    rs = avg_up / avg_down
+    values = np.where(avg_down == 0, 100, 100 - (100 / (1 + rs)))
+    return pd.DataFrame(values, index=close.index, columns=close.columns)
+
+
+def ema(values: pd.DataFrame, span: int) -> pd.DataFrame:
+    return values.ewm(span=span, min_periods=span, adjust=False).mean()
+
+
+def macd(close: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9):
+    """
+    Same as ta.trend.MACD(close).macd() / .macd_signal().
+    Returns:
+        tuple: (macd, signal) wide DataFrames.
+    """
+    line = ema(close, fast) - ema(close, slow)
+    return line, ema(line, signal)
+
+
+def benchmark(sizes=(10, 100, 500), bars: int = 126) -> list:
+    """
+    Times the per-ticker `ta` loop against the column-wise pass on synthetic random-walk closes.
+    Data download is left out so only the indicator work is compared.
+    """
+    import time
+    import ta
+
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range(end="2025-06-13", periods=bars)
+    report = []
+    for n in sizes:
+        close = pd.DataFrame(
+            100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(bars, n)), axis=0)),
+            index=index,
+            columns=[f"T{i}" for i in range(n)],
+        )
+
+        start = time.perf_counter()
+        for symbol in close.columns:
+            series = close[symbol]
+            series.rolling(window=20).mean()
+            ta.momentum.RSIIndicator(close=series, window=14).rsi()
+            m = ta.trend.MACD(close=series)
+            m.macd()
+            m.macd_signal()
+        loop_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sma(close)
+        rsi(close)
+        macd(close)
+        batch_s = time.perf_counter() - start
+
+        report.append({"tickers": n, "per_ticker_ta_s": round(loop_s, 4), "vectorized_s": round(batch_s, 4), "speedup": round(loop_s / batch_s, 1)})
+    return report
+
+
+if __name__ == "__main__":
+    for row in benchmark():
+        print(row)
@@ -0,0 +1,129 @@
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# Resample rules accepted by get_historical_prices
+RESAMPLE_RULES = {"weekly": "W-FRI", "monthly": "ME"}
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+# float32 keeps ~7 significant digits; printing more would only cost tokens
+PRICE_DECIMALS = 4
+
+
+def resample_ohlc(hist: pd.DataFrame, frequency: str) -> pd.DataFrame:
+    """
+    Resamples daily bars to weekly or monthly OHLCV bars.
+    Args:
+        hist (pd.DataFrame): Daily history indexed by date.
+        frequency (str): 'weekly' or 'monthly'.
+    """
+    if frequency not in RESAMPLE_RULES:
+        raise ValueError(f"Unknown resample frequency {frequency!r}, expected one of {list(RESAMPLE_RULES)}")
+    agg = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    agg = {column: how for column, how in agg.items() if column in hist.columns}
+    return hist.resample(RESAMPLE_RULES[frequency]).agg(agg).dropna(subset=["Close"])
+
+
+def lttb_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling over evenly spaced points.
+    Returns:
+        np.ndarray: Sorted indices of the `threshold` points that best keep the visual shape of y.
+    """
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        raise ValueError("LTTB keeps the first and last point, threshold must be at least 3")
+    x = np.arange(n, dtype=np.float64)
+    bucket = (n - 2) / (threshold - 2)
+    picked = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(np.floor(i * bucket)) + 1
+        end = int(np.floor((i + 1) * bucket)) + 1
+        next_end = min(int(np.floor((i + 2) * bucket)) + 1, n)
+        # Average of the next bucket (the last bucket looks at the final point)
+        avg_x = x[end:next_end].mean() if end < next_end else x[-1]
+        avg_y = y[end:next_end].mean() if end < next_end else y[-1]
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        picked.append(a)
+    picked.append(n - 1)
+    return np.array(picked)
+
+
+def to_columnar(hist: pd.DataFrame, date_format: str = "iso") -> dict:
+    """
+    Converts a history DataFrame to parallel arrays instead of one dict per row.
+    Args:
+        hist (pd.DataFrame): History indexed by date.
+        date_format (str, optional): 'iso' for 'YYYY-MM-DD' strings or 'epoch' for Unix seconds.
+    Returns:
+        dict: {'dates': [...], 'open': [...], ..., 'volume': [...]}.
+    """
+    if date_format == "epoch":
+        index = hist.index.tz_convert("UTC") if hist.index.tz is not None else hist.index
+        dates = (index.asi8 // 10**9).tolist()
+    else:
+        dates = hist.index.strftime('%Y-%m-%d').tolist()
+    data = {"dates": dates}
+    for column in PRICE_COLUMNS:
+        if column in hist.columns:
+            values = hist[column].to_numpy(dtype=np.float32)
+            data[column.lower()] = np.round(values.astype(np.float64), PRICE_DECIMALS).tolist()
+    if "Volume" in hist.columns:
+        data["volume"] = hist["Volume"].fillna(0).to_numpy(dtype=np.int64).tolist()
+    return data
+
+
+def shape_history(hist: pd.DataFrame, resample: Optional[str] = None, max_points: Optional[int] = None) -> pd.DataFrame:
+    """Applies optional OHLC resampling, then LTTB on Close when more than `max_points` rows remain."""
+    if resample:
+        hist = resample_ohlc(hist, resample)
+    if max_points and len(hist) > max_points:
+        hist = hist.iloc[lttb_indices(hist["Close"].to_numpy(dtype=np.float64), max(max_points, 3))]
+    return hist
+
+
+def benchmark(periods=(("1y", 252), ("5y", 1260), ("max", 10000))) -> list:
+    """
+    Compares the old per-row records output with columnar output (plain, weekly, 200-point LTTB)
+    on synthetic daily histories of realistic lengths: JSON size and serialization time.
+    """
+    import json
+    import time
+
+    rng = np.random.default_rng(0)
+    report = []
+    for period, bars in periods:
+        index = pd.bdate_range(end="2025-06-13", periods=bars, tz="America/New_York")
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+        hist = pd.DataFrame({
+            "Open": close * (1 + rng.normal(0, 0.005, bars)),
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": rng.integers(1e6, 1e8, bars),
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        }, index=index.rename("Date"))
+
+        row = {"period": period, "bars": bars}
+        variants = {
+            "records": lambda: hist.reset_index().to_dict(orient="records"),
+            "columnar": lambda: to_columnar(hist),
+            "weekly": lambda: to_columnar(shape_history(hist, resample="weekly")),
+            "lttb_200": lambda: to_columnar(shape_history(hist, max_points=200)),
+        }
+        for name, build in variants.items():
+            start = time.perf_counter()
+            payload = json.dumps(build(), default=str)
+            row[f"{name}_kb"] = round(len(payload) / 1024, 1)
+            row[f"{name}_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        report.append(row)
+    return report
+
+
+if __name__ == "__main__":
+    for row in benchmark():
+        print(row)
@@ -0,0 +1,469 @@
+import datetime
+import json
+import operator
+import os
+import re
+import shutil
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from ...market_data import get_history_batch
+from ...result_cache import MARKET_TIMEZONE
+from .indicators import align_by_position
+
+# Local price store: one directory per symbol holding raw little-endian arrays (date as days since
+# 1970, close, volume) that a daily sync appends to and screens read back memory-mapped
+PRICE_STORE_PATH = os.path.expanduser(os.getenv("PRICE_STORE_PATH", "~/.cache/stock_agent/prices"))
+# Comma separated symbols screened when the caller names none, e.g. the S&P 500; empty means every stored symbol
+SCREEN_UNIVERSE = [s.strip().upper() for s in os.getenv("SCREEN_UNIVERSE", "").split(",") if s.strip()]
+# Bars per symbol a screen reads, ~6 months like calculate_technical_indicators
+SCREEN_LOOKBACK = int(os.getenv("SCREEN_LOOKBACK", "126"))
+# Symbols per yf.download call when the store is synced
+SYNC_CHUNK = int(os.getenv("PRICE_STORE_SYNC_CHUNK", "200"))
+# A MACD cross counts when it happened within this many bars
+CROSS_BARS = 3
+# Relative change of an already stored close above which Yahoo has re-adjusted the history
+# (split or dividend) and the symbol is rewritten from a fresh download
+REBASE_TOLERANCE = 1e-4
+
+_COLUMNS = {"date": np.int32, "close": np.float64, "volume": np.float64}
+_OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq, "!=": operator.ne}
+_CONDITION = re.compile(r"^\s*([a-z_0-9]+)\s*(<=|>=|==|!=|<|>)\s*([a-z_0-9.+-]+)\s*$")
+
+# Per-symbol values a condition or sort_by can refer to; returns and changes are in percent
+FIELDS = (
+    "close", "sma20", "sma50", "rsi", "macd", "macd_signal", "macd_hist",
+    "return_5d", "return_20d", "volume", "avg_volume_20", "volume_ratio",
+)
+SIGNALS = ("macd_bullish_cross", "macd_bearish_cross")
+
+
+class PriceStore:
+    """
+    Columnar daily closes and volumes for many symbols, kept on disk so a screen over thousands
+    of symbols needs no download. Arrays are appended to one session at a time, and a symbol is
+    rewritten whole when Yahoo re-adjusts its history.
+    args:
+        path: store directory
+    """
+
+    def __init__(self, path: str = PRICE_STORE_PATH):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._version = 0
+        self._panel: Optional[Tuple[Tuple, pd.DataFrame, pd.DataFrame, pd.Series]] = None
+        self._synced_path = os.path.join(path, "synced.json")
+        try:
+            with open(self._synced_path, encoding="utf-8") as f:
+                self._synced: Dict[str, str] = json.load(f)
+        except (OSError, ValueError):
+            self._synced = {}
+
+    def _file(self, symbol: str, column: str) -> str:
+        return os.path.join(self.path, symbol, f"{column}.{np.dtype(_COLUMNS[column]).str[1:]}")
+
+    def symbols(self) -> List[str]:
+        # Dot directories are rewrites in progress
+        return sorted(name for name in os.listdir(self.path) if not name.startswith(".") and os.path.isdir(os.path.join(self.path, name)))
+
+    def read(self, symbol: str, lookback: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """The symbol's last `lookback` bars (all when None) as column -> array; empty arrays for unknown symbols."""
+        arrays = {}
+        for column, dtype in _COLUMNS.items():
+            path = self._file(symbol, column)
+            size = os.path.getsize(path) // np.dtype(dtype).itemsize if os.path.exists(path) else 0
+            arrays[column] = np.memmap(path, dtype=dtype, mode="r", shape=(size,)) if size else np.empty(0, dtype)
+        # date is written last, so a bar counts once its date is on disk
+        rows = min(len(values) for values in arrays.values())
+        start = 0 if lookback is None else max(0, rows - lookback)
+        return {column: np.array(values[start:rows]) for column, values in arrays.items()}
+
+    def last_date(self, symbol: str) -> Optional[datetime.date]:
+        dates = self.read(symbol, lookback=1)["date"]
+        return _from_days(int(dates[-1])) if len(dates) else None
+
+    def append(self, symbol: str, hist: pd.DataFrame, until: Optional[datetime.date] = None) -> int:
+        """
+        Appends the bars of an OHLCV history that are newer than the stored ones (and not after
+        `until`, to keep a session that is still trading out). Returns the number of bars added.
+        """
+        with self._lock:
+            last = self.last_date(symbol)
+            columns = _columns(hist, after=last, until=until)
+            if not len(columns["date"]):
+                return 0
+            self._truncate(symbol)
+            self._write(symbol, columns, "ab")
+            self._version += 1
+            return len(columns["date"])
+
+    def replace(self, symbol: str, hist: pd.DataFrame, until: Optional[datetime.date] = None) -> int:
+        """
+        Rewrites the symbol from a fresh OHLCV history, for when Yahoo re-adjusted the stored bars
+        after a split or dividend. The new columns are written aside and swapped in, so a crash
+        leaves either the old bars or none (and the next sync downloads the symbol anew).
+        Returns the number of bars stored.
+        """
+        columns = _columns(hist, until=until)
+        with self._lock:
+            target = os.path.join(self.path, symbol)
+            staging, old = os.path.join(self.path, f".{symbol}.new"), os.path.join(self.path, f".{symbol}.old")
+            shutil.rmtree(staging, ignore_errors=True)
+            self._write(f".{symbol}.new", columns, "wb")
+            if os.path.exists(target):
+                os.replace(target, old)
+            os.replace(staging, target)
+            shutil.rmtree(old, ignore_errors=True)
+            self._version += 1
+            return len(columns["date"])
+
+    def _write(self, symbol: str, columns: Dict[str, np.ndarray], mode: str) -> None:
+        os.makedirs(os.path.join(self.path, symbol), exist_ok=True)
+        # date last: read() counts a bar once its date is on disk
+        for column in ("close", "volume", "date"):
+            with open(self._file(symbol, column), mode) as f:
+                f.write(columns[column].astype(_COLUMNS[column]).tobytes())
+
+    def _truncate(self, symbol: str) -> None:
+        """Cuts the columns back to the bars read() sees, dropping what a write that died halfway left."""
+        paths = {column: self._file(symbol, column) for column in _COLUMNS}
+        sizes = {column: os.path.getsize(path) // np.dtype(_COLUMNS[column]).itemsize if os.path.exists(path) else 0 for column, path in paths.items()}
+        rows = min(sizes.values())
+        for column, size in sizes.items():
+            if size > rows:
+                os.truncate(paths[column], rows * np.dtype(_COLUMNS[column]).itemsize)
+
+    def is_synced(self, symbol: str, session: datetime.date) -> bool:
+        return self._synced.get(symbol, "") >= session.isoformat()
+
+    def mark_synced(self, symbols: List[str], session: datetime.date) -> None:
+        with self._lock:
+            self._synced.update({symbol: session.isoformat() for symbol in symbols})
+            with open(self._synced_path, "w", encoding="utf-8") as f:
+                json.dump(self._synced, f)
+
+    def panel(self, symbols: List[str], lookback: int = SCREEN_LOOKBACK) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series]:
+        """
+        Wide close and volume frames (one column per symbol) of each symbol's own last `lookback`
+        bars, aligned on the last bar with indicators.align_by_position, plus each symbol's last
+        date (NaT when it has none). Kept in memory until the next append.
+        """
+        key = (tuple(symbols), lookback, self._version)
+        if self._panel is not None and self._panel[0] == key:
+            return self._panel[1:]
+        columns = {symbol: self.read(symbol, lookback) for symbol in symbols}
+        # Bars are stored in date order and closes are never NaN, so both frames keep the same rows per symbol
+        close = align_by_position({symbol: c["close"] for symbol, c in columns.items()})
+        volume = align_by_position({symbol: c["volume"] for symbol, c in columns.items()}, dropna=False)
+        last_days = [np.datetime64(int(c["date"][-1]), "D") if len(c["date"]) else np.datetime64("NaT") for c in columns.values()]
+        last = pd.Series(pd.to_datetime(np.array(last_days, dtype="datetime64[D]")), index=symbols)
+        self._panel = (key, close, volume, last)
+        return close, volume, last
+
+
+def _days(day: datetime.date) -> int:
+    return (day - datetime.date(1970, 1, 1)).days
+
+
+def _from_days(days: int) -> datetime.date:
+    return datetime.date(1970, 1, 1) + datetime.timedelta(days=days)
+
+
+def _columns(hist: pd.DataFrame, after: Optional[datetime.date] = None, until: Optional[datetime.date] = None) -> Dict[str, np.ndarray]:
+    """The store's columns of the bars of `hist` with a close, after `after` and not after `until`."""
+    if hist.empty:
+        return {column: np.empty(0, dtype) for column, dtype in _COLUMNS.items()}
+    dates = _to_days(hist.index)
+    close = hist["Close"].to_numpy(dtype=np.float64)
+    volume = hist["Volume"].to_numpy(dtype=np.float64) if "Volume" in hist.columns else np.full(len(close), np.nan)
+    keep = ~np.isnan(close)
+    if after is not None:
+        keep &= dates > _days(after)
+    if until is not None:
+        keep &= dates <= _days(until)
+    return {"date": dates[keep], "close": close[keep], "volume": volume[keep]}
+
+
+def _rebased(store: PriceStore, symbol: str, hist: pd.DataFrame) -> bool:
+    """Whether `hist` prices the last stored bar differently, i.e. Yahoo re-adjusted the history."""
+    stored = store.read(symbol, lookback=1)
+    if hist.empty or not len(stored["date"]):
+        return False
+    overlap = _to_days(hist.index) == stored["date"][-1]
+    if not overlap.any():
+        return False
+    fresh = hist["Close"].to_numpy(dtype=np.float64)[overlap][-1]
+    return bool(abs(fresh / stored["close"][-1] - 1) > REBASE_TOLERANCE)
+
+
+def _to_days(index: pd.Index) -> np.ndarray:
+    # Bars are dated in exchange time; dropping the timezone keeps the session date
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize().values.astype("datetime64[D]").astype(np.int64)
+
+
+_store: Optional[PriceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_price_store() -> PriceStore:
+    """Returns the process-wide price store, creating it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PriceStore()
+        return _store
+
+
+def set_price_store(store: PriceStore) -> None:
+    """Replaces the process-wide price store, e.g. with one in a temporary directory for benchmarks."""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+def sync(symbols: List[str], store: Optional[PriceStore] = None, now: Optional[datetime.datetime] = None) -> dict:
+    """
+    Brings symbols up to the last completed session: symbols not synced since then are downloaded
+    (SYNC_CHUNK per yf.download) and their new bars appended. Symbols new to the store get a year
+    of history, stored ones the bars from their last stored date on. That one overlapping bar
+    shows whether Yahoo re-adjusted the history (split, dividend); such symbols are rewritten from
+    a fresh year, since appending would mix price bases. Symbols Yahoo returns nothing for
+    (delisted or unknown) count as synced too and are only retried at the next session; symbols
+    whose download failed are retried by the next sync.
+    Returns counts of what was done.
+    """
+    # prefetch imports the technical tools, which import this module
+    from ...prefetch import last_session_close
+
+    store = store or get_price_store()
+    session = last_session_close(now or datetime.datetime.now(MARKET_TIMEZONE)).date()
+    stale = [symbol for symbol in dict.fromkeys(s.upper() for s in symbols) if not store.is_synced(symbol, session)]
+    # Download windows: a full year for new symbols, otherwise from the last stored bar
+    windows: Dict[Optional[str], List[str]] = {}
+    current = []
+    for symbol in stale:
+        last = store.last_date(symbol)
+        if last is not None and last >= session:
+            current.append(symbol)
+            continue
+        windows.setdefault(None if last is None else last.isoformat(), []).append(symbol)
+
+    if current:
+        store.mark_synced(current, session)
+    appended = rebased = failed = 0
+    for start, group in windows.items():
+        for offset in range(0, len(group), SYNC_CHUNK):
+            chunk = group[offset:offset + SYNC_CHUNK]
+            # Failed downloads are missing from histories, and stay unsynced
+            histories = get_history_batch(chunk, period="1y", start=start)
+            rebase = [symbol for symbol, hist in histories.items() if start is not None and _rebased(store, symbol, hist)]
+            appended += sum(store.append(symbol, hist, until=session) for symbol, hist in histories.items() if symbol not in rebase)
+            done = [symbol for symbol in histories if symbol not in rebase]
+            if rebase:
+                for symbol, hist in get_history_batch(rebase, period="1y").items():
+                    if not hist.empty:
+                        store.replace(symbol, hist, until=session)
+                        done.append(symbol)
+                        rebased += 1
+            store.mark_synced(done, session)
+            failed += len(chunk) - len(done)
+    return {"session": session.isoformat(), "synced": len(stale) - failed, "failed": failed, "bars_appended": appended, "rebased": rebased}
+
+
+def _ewm(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """
+    EWM with adjust=False down the rows of a (sessions x symbols) array, all symbols per step.
+    Same values as pandas' ewm for each column; NaN rows of a symbol are skipped.
+    """
+    out = np.full(values.shape, np.nan)
+    state = np.full(values.shape[1], np.nan)
+    count = np.zeros(values.shape[1], dtype=np.int64)
+    for t, row in enumerate(values):
+        seen = ~np.isnan(row)
+        state = np.where(seen, np.where(np.isnan(state), row, (1 - alpha) * state + alpha * row), state)
+        count += seen
+        out[t] = np.where(count >= min_periods, state, np.nan)
+    return out
+
+
+def compute_fields(close: pd.DataFrame, volume: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per symbol with every FIELDS and SIGNALS value at its last bar, from frames aligned by
+    position as PriceStore.panel builds them. Formulas are those of indicators.py, but each step runs
+    on all symbols at once: pandas' rolling and ewm on a wide frame loop over the columns.
+    """
+    prices = close.to_numpy()
+    volumes = volume.to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Wilder RSI as in indicators.rsi: no gain or loss counted before a symbol's first close
+        diff = np.diff(prices, axis=0, prepend=np.nan)
+        listed = ~np.isnan(prices)
+        up = np.where(listed, np.where(diff > 0, diff, 0.0), np.nan)
+        down = np.where(listed, np.where(diff < 0, -diff, 0.0), np.nan)
+        avg_up = _ewm(up, 1 / 14, 14)[-1]
+        avg_down = _ewm(down, 1 / 14, 14)[-1]
+        rsi = np.where(avg_down == 0, 100, 100 - 100 / (1 + avg_up / avg_down))
+        rsi[np.isnan(avg_up)] = np.nan
+
+        macd_line = _ewm(prices, 2 / 13, 12) - _ewm(prices, 2 / 27, 26)
+        signal_line = _ewm(macd_line, 2 / 10, 9)
+        hist = macd_line - signal_line
+        now, before = hist[1:][-CROSS_BARS:], hist[:-1][-CROSS_BARS:]
+
+        last = prices[-1]
+        avg_volume = volumes[-20:].mean(axis=0) if len(volumes) >= 20 else np.full(len(last), np.nan)
+        past = lambda bars: prices[-bars - 1] if len(prices) > bars else np.full(len(last), np.nan)
+        return pd.DataFrame({
+            "close": last,
+            "sma20": prices[-20:].mean(axis=0) if len(prices) >= 20 else np.nan,
+            "sma50": prices[-50:].mean(axis=0) if len(prices) >= 50 else np.nan,
+            "rsi": rsi,
+            "macd": macd_line[-1],
+            "macd_signal": signal_line[-1],
+            "macd_hist": hist[-1],
+            "return_5d": (last / past(5) - 1) * 100,
+            "return_20d": (last / past(20) - 1) * 100,
+            "volume": volumes[-1],
+            "avg_volume_20": avg_volume,
+            "volume_ratio": volumes[-1] / avg_volume,
+            "macd_bullish_cross": ((now > 0) & (before < 0)).any(axis=0),
+            "macd_bearish_cross": ((now < 0) & (before > 0)).any(axis=0),
+        }, index=close.columns)
+
+
+def parse_condition(condition: str):
+    """
+    Turns "rsi < 30", "close > sma50" or a signal name like "macd_bullish_cross" into a function
+    of the fields frame returning a boolean mask. Raises ValueError for anything else.
+    """
+    text = condition.strip().lower()
+    if text in SIGNALS:
+        return lambda fields: fields[text].to_numpy(dtype=bool)
+    match = _CONDITION.match(text)
+    if match is None:
+        raise ValueError(f"Cannot parse condition {condition!r}, expected e.g. 'rsi < 30', 'close > sma50' or one of {list(SIGNALS)}")
+    left, op, right = match.groups()
+    if left not in FIELDS:
+        raise ValueError(f"Unknown field {left!r} in {condition!r}, expected one of {list(FIELDS)}")
+    if right in FIELDS:
+        return lambda fields: _OPERATORS[op](fields[left].to_numpy(), fields[right].to_numpy())
+    try:
+        value = float(right)
+    except ValueError:
+        raise ValueError(f"Unknown field {right!r} in {condition!r}, expected a number or one of {list(FIELDS)}") from None
+    return lambda fields: _OPERATORS[op](fields[left].to_numpy(), value)
+
+
+def screen(
+    conditions: List[str],
+    symbols: Optional[List[str]] = None,
+    sort_by: Optional[str] = None,
+    limit: int = 20,
+    store: Optional[PriceStore] = None,
+) -> dict:
+    """
+    Symbols of the store (or of `symbols`) matching every condition at the latest session.
+    `sort_by` is a field name, prefixed with '-' for descending order. Raises ValueError for
+    unknown conditions or fields.
+    """
+    store = store or get_price_store()
+    predicates = [parse_condition(condition) for condition in conditions]
+    descending = bool(sort_by) and sort_by.startswith("-")
+    sort_field = sort_by.lstrip("-").lower() if sort_by else None
+    if sort_field is not None and sort_field not in FIELDS:
+        raise ValueError(f"Unknown sort field {sort_field!r}, expected one of {list(FIELDS)}")
+
+    universe = [s.upper() for s in symbols] if symbols else store.symbols()
+    close, volume, last = store.panel(universe)
+    if close.empty or last.isna().all():
+        return {"universe": len(universe), "matched": 0, "results": []}
+    as_of = last.max()
+    fields = compute_fields(close, volume)
+    # Symbols that did not trade the latest session (halted, delisted) have stale values
+    stale = (last != as_of).to_numpy()
+    fields.loc[stale, list(FIELDS)] = np.nan
+    fields.loc[stale, list(SIGNALS)] = False
+    mask = np.ones(len(fields), dtype=bool)
+    for predicate in predicates:
+        mask &= predicate(fields)
+    matched = fields[mask]
+    if sort_field is not None:
+        matched = matched.sort_values(sort_field, ascending=not descending)
+    shown = matched.head(limit)
+    return {
+        "as_of": as_of.date().isoformat(),
+        "universe": len(universe),
+        "traded_last_session": int(fields["close"].notna().sum()),
+        "matched": len(matched),
+        "results": [
+            {"symbol": symbol, **{field: round(float(row[field]), 2) for field in FIELDS if not pd.isna(row[field])},
+             **{signal: True for signal in SIGNALS if row[signal]}}
+            for symbol, row in shown.iterrows()
+        ],
+    }
+
+
+def synthetic_store(path: str, symbols: int = 5000, bars: int = 260, seed: int = 0) -> PriceStore:
+    """A store of `symbols` random-walk histories of `bars` business days each."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2025-06-13", periods=bars)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(bars, symbols)), axis=0))
+    volumes = rng.integers(100_000, 5_000_000, size=(bars, symbols)).astype(np.float64)
+    store = PriceStore(path)
+    for i in range(symbols):
+        store.append(f"S{i:04d}", pd.DataFrame({"Close": closes[:, i], "Volume": volumes[:, i]}, index=index))
+    return store
+
+
+def benchmark(symbols: int = 5000, bars: int = 260, loop_sample: int = 200) -> dict:
+    """
+    Builds a synthetic store, then times a daily append to every symbol, a cold screen (arrays read
+    from disk), a warm screen (panel in memory) and, for comparison, the per-symbol `ta` loop
+    calculate_technical_indicators runs, measured on `loop_sample` symbols and scaled up.
+    """
+    import tempfile
+    import time
+    import ta
+
+    conditions = ["rsi < 30", "macd_bullish_cross"]
+    report = {"symbols": symbols, "bars": bars, "conditions": conditions}
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        store = synthetic_store(path, symbols, bars)
+        report["build_store_s"] = round(time.perf_counter() - start, 2)
+
+        next_day = pd.bdate_range(start="2025-06-16", periods=1)
+        start = time.perf_counter()
+        for i, symbol in enumerate(store.symbols()):
+            store.append(symbol, pd.DataFrame({"Close": [100.0 + i % 7], "Volume": [1e6]}, index=next_day))
+        report["daily_append_s"] = round(time.perf_counter() - start, 2)
+
+        store = PriceStore(path)
+        start = time.perf_counter()
+        result = screen(conditions, store=store)
+        report["cold_screen_s"] = round(time.perf_counter() - start, 3)
+        start = time.perf_counter()
+        screen(conditions, store=store)
+        report["warm_screen_s"] = round(time.perf_counter() - start, 3)
+        report["matched"] = result["matched"]
+
+        close, _, _ = store.panel(store.symbols())
+        start = time.perf_counter()
+        for symbol in close.columns[:loop_sample]:
+            series = close[symbol]
+            series.rolling(window=20).mean()
+            ta.momentum.RSIIndicator(close=series, window=14).rsi()
+            m = ta.trend.MACD(close=series)
+            m.macd()
+            m.macd_signal()
+        report["per_symbol_ta_s_estimate"] = round((time.perf_counter() - start) * symbols / loop_sample, 2)
+    return report
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -1,20 +1,50 @@
-import yfinance as yf
-from typing import List,Optional
+from typing import Dict, List,Optional
 import ta
+from ...market_data import async_tool, get_history, get_history_batch
+from ...telemetry import traced_tool
+from . import indicators as vec
+from .payload import shape_history, to_columnar
+from .screener import SCREEN_UNIVERSE, get_price_store, screen, sync
+
+# Helper function to format the series correctly
+def format_indicator_series(series, name):
+    series = series.dropna().tail(5)
+    series.index = series.index.strftime('%Y-%m-%d') # Convert Timestamp index to string
+    return series.to_dict()
 
 # stock price history (1 year)
-def get_historical_prices(ticker_symbol: str, period: str = "1y") -> dict:
+@traced_tool
+def get_historical_prices(
+    ticker_symbol: str,
+    period: str = "1y",
+    output: str = "columnar",
+    resample: Optional[str] = None,
+    max_points: Optional[int] = None,
+) -> dict:
     """
     Retrieves historical stock price data for a given ticker symbol.
     Args:
         ticker_symbol (str): The stock ticker symbol (e.g., 'AAPL' for Apple Inc.).
         period (str, optional): The period for which to retrieve data (e.g., '1y' for 1 year). Defaults to '1y'.
+        output (str, optional): 'columnar' for parallel arrays (dates, open, high, low, close, volume),
+                                'records' for one dict per trading day. Defaults to 'columnar'.
+        resample (str, optional): 'weekly' or 'monthly' to aggregate daily bars into OHLC bars.
+        max_points (int, optional): Downsample to at most this many points, keeping the chart shape.
     Returns:
         dict: A dictionary containing historical price data.
     """
-    hist = yf.Ticker(ticker_symbol).history(period=period)
-    return hist.reset_index().to_dict(orient="records")
+    hist = get_history(ticker_symbol, period=period)
+    if hist.empty:
+        return {"error": "No historical data found for ticker"}
+    try:
+        hist = shape_history(hist, resample=resample, max_points=max_points)
+    except ValueError as e:
+        return {"error": str(e)}
+    if output == "records":
+        return hist.reset_index().to_dict(orient="records")
+    return to_columnar(hist)
 
+@traced_tool
 def calculate_technical_indicators(ticker_symbol: str, indicators: Optional[List[str]] = None) -> dict:
     """
     Calculates technical indicators for a given ticker symbol.
@@ -29,19 +59,12 @@ def calculate_technical_indicators(ticker_symbol: str, indicators: Optional[List
     if indicators is None:
         indicators = ['SMA', 'RSI', 'MACD']
 
-    df = yf.Ticker(ticker_symbol).history(period="6mo")
+    df = get_history(ticker_symbol, period="6mo")
 
     result = {}
     if df.empty:
         return {"error": "No historical data found for ticker"}
 
-    # Helper function to format the series correctly
-    def format_indicator_series(series, name):
-        series = series.dropna().tail(5)
-        series.index = series.index.strftime('%Y-%m-%d') # Convert Timestamp index to string
-        return series.to_dict()
-
-
     if 'SMA' in indicators:
         df['SMA20'] = df['Close'].rolling(window=20).mean()
         result['SMA20'] = format_indicator_series(df['SMA20'], 'SMA20')
@@ -59,7 +82,100 @@ def calculate_technical_indicators(ticker_symbol: str, indicators: Optional[List
 
     return result
 
+@traced_tool
+def calculate_technical_indicators_batch(ticker_symbols: List[str], indicators: Optional[List[str]] = None) -> Dict[str, dict]:
+    """
+    Calculates technical indicators for many ticker symbols at once, e.g. a whole watchlist.
+    Prices are downloaded in one request and every indicator is computed for all tickers in one pass.
+    Args:
+        ticker_symbols (list): The stock ticker symbols (e.g., ['AAPL', 'MSFT', 'NVDA']).
+        indicators (list, optional): A list of indicators to calculate.
+                                     Defaults to ['SMA', 'RSI', 'MACD'].
+    Returns:
+        dict: Ticker symbol -> the same dictionary calculate_technical_indicators returns for it.
+    """
+    if indicators is None:
+        indicators = ['SMA', 'RSI', 'MACD']
+
+    histories = get_history_batch(ticker_symbols, period="6mo")
+    result = {symbol: {"error": "No historical data found for ticker"} for symbol, hist in histories.items() if hist.empty}
+    result.update({
+        symbol: {"error": "Historical data could not be downloaded, try again later"}
+        for symbol in dict.fromkeys(s.upper() for s in ticker_symbols) if symbol not in histories
+    })
+    closes = {symbol: hist['Close'].sort_index().dropna() for symbol, hist in histories.items() if not hist.empty}
+    if not closes:
+        return result
+    # Each ticker keeps its own trading days, so the values match calculate_technical_indicators
+    close = vec.align_by_position(closes)
+
+    computed = {}
+    if 'SMA' in indicators:
+        computed['SMA20'] = vec.sma(close, 20)
+    if 'RSI' in indicators:
+        computed['RSI'] = vec.rsi(close, 14)
+    if 'MACD' in indicators:
+        computed['macd'], computed['signal'] = vec.macd(close)
+
+    for symbol in close.columns:
+        dates = closes[symbol].index
+        entry = {}
+        if 'SMA20' in computed:
+            entry['SMA20'] = format_indicator_series(vec.dated(computed['SMA20'][symbol], dates), 'SMA20')
+        if 'RSI' in computed:
+            entry['RSI'] = format_indicator_series(vec.dated(computed['RSI'][symbol], dates), 'RSI')
+        if 'macd' in computed:
+            entry['MACD'] = {
+                'macd': format_indicator_series(vec.dated(computed['macd'][symbol], dates), 'MACD'),
+                'signal': format_indicator_series(vec.dated(computed['signal'][symbol], dates), 'MACD_Signal')
+            }
+        result[symbol] = entry
+    return result
+
+@traced_tool
+def screen_stocks(
+    conditions: List[str],
+    ticker_symbols: Optional[List[str]] = None,
+    sort_by: Optional[str] = None,
+    limit: int = 20,
+) -> dict:
+    """
+    Finds the stocks whose latest daily bar matches every condition, e.g. oversold names with a
+    bullish MACD cross, across thousands of symbols from a local price store.
+    Args:
+        conditions (list): Conditions that must all hold, each either '<field> <op> <number or field>'
+                           (e.g. 'rsi < 30', 'close > sma50', 'volume_ratio >= 2') or a signal name
+                           ('macd_bullish_cross', 'macd_bearish_cross': a cross within the last 3 bars).
+                           Fields: close, sma20, sma50, rsi, macd, macd_signal, macd_hist, return_5d,
+                           return_20d (percent), volume, avg_volume_20, volume_ratio.
+        ticker_symbols (list, optional): The symbols to screen. Defaults to the configured universe,
+                                         or every symbol in the price store when none is configured.
+        sort_by (str, optional): Field to order the matches by, prefixed with '-' for descending (e.g. '-return_20d').
+        limit (int, optional): Maximum number of matches to return. Defaults to 20.
+    Returns:
+        dict: as_of date, universe size, number matched and the matches with their field values.
+    """
+    universe = ticker_symbols or SCREEN_UNIVERSE or get_price_store().symbols()
+    if not universe:
+        return {"error": "The price store is empty, pass the ticker_symbols to screen"}
+    try:
+        # Stored symbols are brought up to date as well, so the screen is never silently stale
+        synced = sync(universe)
+        result = screen(conditions, symbols=universe, sort_by=sort_by, limit=limit)
+    except ValueError as e:
+        return {"error": str(e)}
+    if synced["failed"]:
+        result["not_updated"] = synced["failed"]
+    return result
+
+# Async twins registered with the agent, so yfinance calls do not block the shared event loop
+get_historical_prices_async = async_tool(get_historical_prices)
+calculate_technical_indicators_async = async_tool(calculate_technical_indicators)
+calculate_technical_indicators_batch_async = async_tool(calculate_technical_indicators_batch)
+screen_stocks_async = async_tool(screen_stocks)
+
 if __name__ == "__main__":
     # test result 
     print(calculate_technical_indicators("AAPL"))
-    print(get_historical_prices("AAPL"))
\ No newline at end of file
+    print(get_historical_prices("AAPL"))
+    print(calculate_technical_indicators_batch(["AAPL", "MSFT", "NVDA"]))
\ No newline at end of file
@@ -0,0 +1,385 @@
+import argparse
+import contextlib
+import functools
+import inspect
+import json
+import os
+import threading
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.trace import Status, StatusCode
+
+# "none" leaves tracing off, "console" prints every span, "file" appends JSON lines to TRACE_FILE
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.path.expanduser(os.getenv("TRACE_FILE", "~/.cache/stock_agent/traces.jsonl"))
+# Finished spans kept in memory for trace_summary()
+TRACE_MEMORY_SPANS = int(os.getenv("TRACE_MEMORY_SPANS", "20000"))
+# ADK puts whole LLM requests/responses and tool payloads on its spans; longer values are stored as their size
+MAX_ATTRIBUTE_CHARS = 256
+
+_tracer = trace.get_tracer("stock_agent")
+# Cache hits/misses and other counts of the innermost open stage, set as span attributes when it ends
+_stage_counts: ContextVar[Optional[Counter]] = ContextVar("stage_counts", default=None)
+_recent: Optional["RecentSpans"] = None
+_configured = False
+_configure_lock = threading.Lock()
+_instrumented = set()
+
+
+def span_record(span: ReadableSpan) -> dict:
+    """Flattens a finished span into the JSON-serializable dict the file exporter and the summary use."""
+    attributes = {}
+    for key, value in (span.attributes or {}).items():
+        if isinstance(value, str) and len(value) > MAX_ATTRIBUTE_CHARS:
+            attributes[f"{key}.bytes"] = len(value.encode("utf-8"))
+        else:
+            attributes[key] = list(value) if isinstance(value, tuple) else value
+    parent = span.parent
+    return {
+        "trace_id": format(span.context.trace_id, "032x"),
+        "span_id": format(span.context.span_id, "016x"),
+        "parent_id": format(parent.span_id, "016x") if parent is not None else None,
+        "name": span.name,
+        "start_s": span.start_time / 1e9,
+        "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+        "status": span.status.status_code.name,
+        "attributes": attributes,
+    }
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends one JSON object per finished span to a local file."""
+
+    def __init__(self, path: str = TRACE_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(json.dumps(span_record(span), default=str) + "\n" for span in spans)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class RecentSpans(SpanProcessor):
+    """Keeps the last `max_spans` finished spans in memory so a process can report on itself."""
+
+    def __init__(self, max_spans: int = TRACE_MEMORY_SPANS):
+        self._spans: deque = deque(maxlen=max_spans)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        self._spans.append(span_record(span))
+
+    def records(self) -> List[dict]:
+        return list(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+def configure_tracing(exporter: str = TRACE_EXPORTER, path: str = TRACE_FILE) -> Optional[RecentSpans]:
+    """
+    Installs the span exporter picked by TRACE_EXPORTER (once per process). ADK's own agent_run,
+    call_llm and execute_tool spans go through the same provider, so they end up next to ours.
+    A provider that is already installed (e.g. `adk web --trace_to_cloud`) is reused.
+    return:
+        the in-memory span buffer behind trace_summary(), or None when tracing is off
+    """
+    global _recent, _configured
+    with _configure_lock:
+        if _configured or exporter == "none":
+            return _recent
+        if exporter not in ("console", "file"):
+            raise ValueError(f"Unknown TRACE_EXPORTER {exporter!r}, expected none, console or file")
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            provider = TracerProvider(resource=Resource.create({"service.name": "stock_agent"}))
+            trace.set_tracer_provider(provider)
+        if exporter == "console":
+            provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+        else:
+            provider.add_span_processor(BatchSpanProcessor(JsonLinesSpanExporter(path)))
+        _recent = RecentSpans()
+        provider.add_span_processor(_recent)
+        _configured = True
+        return _recent
+
+
+def count(key: str, amount: int = 1) -> None:
+    """Adds to a counter of the innermost open stage (no-op outside one or with tracing off)."""
+    counts = _stage_counts.get()
+    if counts is not None:
+        counts[key] += amount
+
+
+def record_cache(kind: str, hits: int = 0, misses: int = 0) -> None:
+    """Counts cache lookups of one kind ("market", "articles", "result", ...) on the current stage."""
+    if hits:
+        count(f"cache.{kind}.hits", hits)
+    if misses:
+        count(f"cache.{kind}.misses", misses)
+
+
+def record_error(error: BaseException) -> None:
+    """Marks the current span failed with the error's class, for errors that are caught and returned."""
+    span = trace.get_current_span()
+    span.set_attribute("error.type", type(error).__name__)
+    span.set_status(Status(StatusCode.ERROR, str(error)[:200]))
+
+
+@contextlib.contextmanager
+def stage(name: str, **attributes: Any) -> Iterator[trace.Span]:
+    """
+    Opens a span for one stage of a request (a tool, a page load, a yfinance call...).
+    Exceptions are recorded with their class; counts added with count()/record_cache() while the
+    stage is open become attributes of its span.
+    """
+    with _tracer.start_as_current_span(name, attributes=attributes) as span:
+        if not span.is_recording():
+            yield span
+            return
+        counts = Counter()
+        token = _stage_counts.set(counts)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_attribute("error.type", type(e).__name__)
+            raise
+        finally:
+            _stage_counts.reset(token)
+            for key, value in counts.items():
+                span.set_attribute(key, value)
+
+
+def payload_bytes(value: Any) -> int:
+    """Size of a value as the model would see it (JSON, strings as-is)."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(json.dumps(value, default=str, ensure_ascii=False).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(str(value).encode("utf-8"))
+
+
+def _annotate_call(span: trace.Span, kwargs: dict) -> None:
+    if span.is_recording():
+        span.set_attribute("tool.args_bytes", payload_bytes({k: v for k, v in kwargs.items() if k != "tool_context"}))
+
+
+def _annotate_result(span: trace.Span, result: Any) -> None:
+    if not span.is_recording():
+        return
+    size = payload_bytes(result)
+    span.set_attribute("tool.result_bytes", size)
+    # Rough token estimate for what the result adds to the model's context
+    span.set_attribute("tool.result_tokens_est", size // 4)
+    # Tools report failures in the result instead of raising
+    if isinstance(result, dict) and "error" in result:
+        span.set_attribute("error.type", "ToolError")
+        span.set_status(Status(StatusCode.ERROR, str(result["error"])[:200]))
+
+
+def traced_tool(func: Callable) -> Callable:
+    """
+    Wraps a tool function in a "tool <name>" stage. functools.wraps keeps the name, docstring and
+    signature ADK builds the function declaration from, and async tools stay coroutine functions.
+    """
+    if getattr(func, "__traced__", False):
+        return func
+    name = f"tool {func.__name__}"
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with stage(name) as span:
+                _annotate_call(span, kwargs)
+                result = await func(*args, **kwargs)
+                _annotate_result(span, result)
+                return result
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name) as span:
+                _annotate_call(span, kwargs)
+                result = func(*args, **kwargs)
+                _annotate_result(span, result)
+                return result
+
+    wrapper.__traced__ = True
+    return wrapper
+
+
+def _record_llm_usage(callback_context, llm_response) -> None:
+    """after_model_callback: puts the agent, token counts and response size on ADK's call_llm span."""
+    span = trace.get_current_span()
+    if not span.is_recording() or llm_response.partial:
+        return None
+    span.set_attribute("llm.agent", callback_context.agent_name)
+    usage = llm_response.usage_metadata
+    if usage is not None:
+        span.set_attribute("llm.prompt_tokens", usage.prompt_token_count or 0)
+        span.set_attribute("llm.output_tokens", usage.candidates_token_count or 0)
+        span.set_attribute("llm.total_tokens", usage.total_token_count or 0)
+        # Context-cache hits on the model side
+        span.set_attribute("llm.cached_tokens", usage.cached_content_token_count or 0)
+    if llm_response.content is not None:
+        span.set_attribute("llm.response_bytes", payload_bytes(llm_response.content.model_dump(exclude_none=True)))
+    if llm_response.error_code:
+        span.set_attribute("error.type", str(llm_response.error_code))
+    return None
+
+
+def instrument_agent(agent) -> None:
+    """
+    Traces every tool and model call of an agent tree: function tools (also those of agents
+    wrapped in an AgentTool) get traced_tool, LlmAgents get a model callback recording token
+    usage. Existing callbacks are kept. Safe to call more than once.
+    """
+    # market_data imports this module too; keep ADK out of its import path
+    from google.adk.agents import LlmAgent
+    from google.adk.tools import FunctionTool
+    from google.adk.tools.agent_tool import AgentTool
+
+    if id(agent) in _instrumented:
+        return
+    _instrumented.add(id(agent))
+    if isinstance(agent, LlmAgent):
+        tools = []
+        for tool in agent.tools:
+            if isinstance(tool, AgentTool):
+                instrument_agent(tool.agent)
+            elif isinstance(tool, FunctionTool):
+                tool.func = traced_tool(tool.func)
+            elif callable(tool) and inspect.isfunction(tool):
+                tool = traced_tool(tool)
+            tools.append(tool)
+        agent.tools = tools
+        callbacks = agent.canonical_after_model_callbacks
+        if _record_llm_usage not in callbacks:
+            agent.after_model_callback = [*callbacks, _record_llm_usage]
+    for sub_agent in agent.sub_agents:
+        instrument_agent(sub_agent)
+
+
+def _stage_name(record: dict) -> str:
+    attributes = record["attributes"]
+    if record["name"] == "call_llm" and "llm.agent" in attributes:
+        return f"llm {attributes['llm.agent']}"
+    return record["name"]
+
+
+def summarize(records: Iterable[dict], top: int = 5) -> List[dict]:
+    """
+    Groups spans by request (trace) and ranks each request's stages by self time: a span's
+    duration minus its children's, so a tool that waits on yfinance is not blamed for the download.
+    Concurrent children can add up to more than their parent; self time is floored at zero.
+    return:
+        one dict per request, oldest first, with its root stage, total time, token and cache totals
+        and the `top` hottest stages
+    """
+    traces: Dict[str, List[dict]] = defaultdict(list)
+    for record in records:
+        traces[record["trace_id"]].append(record)
+
+    report = []
+    for trace_id, spans in traces.items():
+        ids = {span["span_id"] for span in spans}
+        child_ms: Counter = Counter()
+        for span in spans:
+            if span["parent_id"] in ids:
+                child_ms[span["parent_id"]] += span["duration_ms"]
+        roots = [span for span in spans if span["parent_id"] not in ids]
+        root = max(roots, key=lambda span: span["duration_ms"])
+
+        stages: Dict[str, dict] = {}
+        totals: Counter = Counter()
+        errors: Counter = Counter()
+        for span in spans:
+            entry = stages.setdefault(_stage_name(span), {"calls": 0, "total_ms": 0.0, "self_ms": 0.0})
+            entry["calls"] += 1
+            entry["total_ms"] += span["duration_ms"]
+            entry["self_ms"] += max(0.0, span["duration_ms"] - child_ms[span["span_id"]])
+            for key, value in span["attributes"].items():
+                if key.startswith(("llm.", "cache.")) and key.endswith(("tokens", "hits", "misses")):
+                    totals[key] += value
+            if "error.type" in span["attributes"]:
+                errors[span["attributes"]["error.type"]] += 1
+
+        hottest = sorted(stages.items(), key=lambda item: item[1]["self_ms"], reverse=True)[:top]
+        report.append({
+            "trace_id": trace_id,
+            "request": root["name"],
+            "start_s": min(span["start_s"] for span in spans),
+            "total_ms": root["duration_ms"],
+            "spans": len(spans),
+            "totals": dict(totals),
+            "errors": dict(errors),
+            "hottest": [
+                {"stage": name, **{key: round(value, 3) if isinstance(value, float) else value for key, value in entry.items()},
+                 "share": round(entry["self_ms"] / root["duration_ms"], 3) if root["duration_ms"] else 0.0}
+                for name, entry in hottest
+            ],
+        })
+    report.sort(key=lambda entry: entry["start_s"])
+    return report
+
+
+def format_summary(report: List[dict]) -> str:
+    lines = []
+    for entry in report:
+        lines.append(f"{entry['request']}  {entry['total_ms']:.1f} ms  ({entry['spans']} spans, trace {entry['trace_id'][:12]})")
+        if entry["totals"]:
+            lines.append("  " + "  ".join(f"{key}={value}" for key, value in sorted(entry["totals"].items())))
+        if entry["errors"]:
+            lines.append("  errors: " + ", ".join(f"{key} x{value}" for key, value in entry["errors"].items()))
+        for stage_entry in entry["hottest"]:
+            lines.append(
+                f"  {stage_entry['self_ms']:>10.1f} ms self {stage_entry['share']:>6.1%}  "
+                f"{stage_entry['calls']:>3}x  {stage_entry['stage']}"
+            )
+    return "\n".join(lines)
+
+
+def trace_summary(top: int = 5, last: Optional[int] = None) -> List[dict]:
+    """Summary of the requests traced by this process (see summarize), optionally only the `last` ones."""
+    if _recent is None:
+        return []
+    report = summarize(_recent.records(), top)
+    return report[-last:] if last else report
+
+
+def read_trace_file(path: str = TRACE_FILE) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Ranks the hottest stages of each traced request.")
+    parser.add_argument("path", nargs="?", default=TRACE_FILE, help="JSON lines written with TRACE_EXPORTER=file")
+    parser.add_argument("--top", type=int, default=5, help="stages listed per request")
+    parser.add_argument("--last", type=int, default=10, help="most recent requests shown (0 for all)")
+    args = parser.parse_args(argv)
+    report = summarize(read_trace_file(args.path), args.top)
+    print(format_summary(report[-args.last:] if args.last else report))
+
+
+if __name__ == "__main__":
+    main()
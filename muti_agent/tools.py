@@ -3,13 +3,22 @@ import asyncio # Import asyncio for running async functions
 from typing import List, Dict,Optional
 import requests
 from bs4 import BeautifulSoup
-import yfinance as yf
 import pandas as pd
 import ta
 import datetime
 from zoneinfo import ZoneInfo
 import json
+from .market_data import get_calendar
+from .telemetry import traced_tool
 
+def resolve_timezone(timezone: str = "America/New_York") -> ZoneInfo:
+    """Returns the ZoneInfo for an IANA timezone name, falling back to Eastern Time for unknown names."""
+    try:
+        return ZoneInfo(timezone)
+    except Exception:
+        return ZoneInfo("America/New_York")
+
+@traced_tool
 def get_current_time(timezone: str = "America/New_York") -> str:
     """
     Gets the current time in a specified timezone and returns it as a formatted string.
@@ -23,11 +32,8 @@ def get_current_time(timezone: str = "America/New_York") -> str:
         str: The current time formatted as 'Day, Mon Day, Year, HH:MM AM/PM'.
              For example: 'Tue, Jun 10, 2025, 04:52 PM'.
     """
-    try:
-        # Get the ZoneInfo object for the specified timezone
-        tz = ZoneInfo(timezone)
-    except Exception:
-        tz = ZoneInfo("America/New_York")
+    # Get the ZoneInfo object for the specified timezone
+    tz = resolve_timezone(timezone)
 
     now_with_tz = datetime.datetime.now(tz)
 
@@ -37,6 +43,7 @@ def get_current_time(timezone: str = "America/New_York") -> str:
     return formatted_time
 
 # earnings calendar
+@traced_tool
 def get_earnings_calendar(ticker_symbol: str) -> dict:
     """
     Retrieves earnings calendar data from Yahoo Finance.
@@ -45,7 +52,7 @@ def get_earnings_calendar(ticker_symbol: str) -> dict:
     Returns:
         dict: A dictionary containing earnings calendar data.
     """
-    calendar_df = yf.Ticker(ticker_symbol).calendar
+    calendar_df = get_calendar(ticker_symbol)
     if calendar_df.empty:
         return {}
 
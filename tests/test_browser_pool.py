@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import pytest
+from muti_agent.subAgent.news_analysis_pipeline import browser_pool
+
+
+class FakePool:
+    def __init__(self):
+        self.started = False
+        self.closed_on = None
+
+    async def start(self):
+        self.started = True
+        return self
+
+    async def close(self, timeout: float = 10.0):
+        if self.started:
+            self.started = False
+            self.closed_on = asyncio.get_running_loop()
+
+
+@pytest.fixture(autouse=True)
+def fake_pool(monkeypatch):
+    monkeypatch.setattr(browser_pool, "BrowserPool", FakePool)
+    for name in ("_pool", "_pool_loop", "_pool_lock"):
+        monkeypatch.setattr(browser_pool, name, None)
+
+
+def test_pool_on_an_idle_loop_is_closed_on_that_loop():
+    loop = asyncio.new_event_loop()
+    try:
+        first = loop.run_until_complete(browser_pool.get_browser_pool())
+        second = asyncio.run(browser_pool.get_browser_pool())
+
+        assert second is not first
+        assert not first.started
+        assert first.closed_on is loop
+    finally:
+        loop.close()
+
+
+def test_pool_on_another_running_loop_is_closed_on_that_loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        first = asyncio.run_coroutine_threadsafe(browser_pool.get_browser_pool(), loop).result(5)
+        second = asyncio.run(browser_pool.get_browser_pool())
+
+        assert second is not first
+        assert not first.started
+        assert first.closed_on is loop
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+
+def test_shutdown_closes_the_pool():
+    async def run():
+        pool = await browser_pool.get_browser_pool()
+        await browser_pool.shutdown_browser_pool()
+        return pool
+
+    pool = asyncio.run(run())
+    assert not pool.started
+    assert browser_pool._pool is None
+
+
+def test_shutdown_from_another_loop_closes_the_pool_on_its_own_loop():
+    loop = asyncio.new_event_loop()
+    try:
+        pool = loop.run_until_complete(browser_pool.get_browser_pool())
+        asyncio.run(browser_pool.shutdown_browser_pool())
+
+        assert not pool.started
+        assert pool.closed_on is loop
+    finally:
+        loop.close()
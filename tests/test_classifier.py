@@ -0,0 +1,36 @@
+import os
+from muti_agent.subAgent.news_analysis_pipeline.classifier import classify_article, evaluate
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "muti_agent", "subAgent", "news_analysis_pipeline", "data")
+
+
+def test_single_token_goes_to_the_model():
+    for title in (
+        "Nvidia CEO Jensen Huang says AI demand remains strong",
+        "Apple fine-tunes Siri with new AI model",
+        "Microsoft CEO Satya Nadella talks AI agents at Build",
+        "Analyst upgrades AMD",
+    ):
+        assert classify_article({"title": title})["needs_model"], title
+
+
+def test_fine_is_not_a_fine():
+    labels = classify_article({"title": "Qualcomm is doing just fine despite smartphone slump, analysts say"})
+    assert labels["event"] != "Regulatory Scrutiny"
+
+
+def test_corroborated_cues_are_labeled_locally():
+    labels = classify_article({"title": "Boeing CEO steps down as losses mount"})
+    assert not labels["needs_model"]
+    assert (labels["sentiment"], labels["event"]) == ("Negative", "Executive Change")
+    labels = classify_article({"title": "EU regulators fine Apple over music streaming"})
+    assert labels["needs_model"]
+    labels = classify_article({"title": "EU fines Meta $840 million over Marketplace practices, raising concerns"})
+    assert (labels["sentiment"], labels["event"]) == ("Negative", "Regulatory Scrutiny")
+
+
+def test_heldout_agreement_of_local_labels():
+    # Headlines labeled before the rules were tuned; only what skips the model has to be right
+    report = evaluate(os.path.join(DATA_DIR, "heldout_headlines.json"))
+    assert report["local_sentiment_agreement"] is None or report["local_sentiment_agreement"] >= 0.9
+    assert report["local_event_agreement"] is None or report["local_event_agreement"] >= 0.6
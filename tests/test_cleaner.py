@@ -0,0 +1,33 @@
+from muti_agent.subAgent.news_analysis_pipeline.cleaner import clean_text
+
+ARTICLE = """Nvidia reported another record quarter on Wednesday, beating estimates.
+Revenue: $30.0 billion
+Data center sales up 427%
+Why it matters
+Risks
+Analysts said the company's investor newsletter has become required reading.
+Sign up for our daily newsletter
+Get the newsletter delivered to your inbox
+NVDA +2.31%
+5 min read
+By Jane Doe
+Reuters
+Story continues
+Share"""
+
+
+def test_keeps_subheads_and_figures():
+    cleaned = clean_text(ARTICLE).split("\n\n")
+    assert cleaned == [
+        "Nvidia reported another record quarter on Wednesday, beating estimates.",
+        "Revenue: $30.0 billion",
+        "Data center sales up 427%",
+        "Why it matters",
+        "Risks",
+        "Analysts said the company's investor newsletter has become required reading.",
+    ]
+
+
+def test_is_idempotent():
+    once = clean_text(ARTICLE)
+    assert clean_text(once.replace("\n\n", "\n")) == once
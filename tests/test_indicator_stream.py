@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import ta
+from muti_agent.subAgent.technical_analyzer import streaming
+from muti_agent.subAgent.technical_analyzer.streaming import IndicatorEngine, check_against_ta
+
+TOLERANCE = 1e-8
+
+
+def _history(bars: int = 140) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    index = pd.bdate_range(end="2025-06-13", periods=bars)
+    return pd.DataFrame({"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))}, index=index)
+
+
+def _bars(hist: pd.DataFrame):
+    return list(zip(hist.index.strftime('%Y-%m-%d'), hist['Close'].astype(float)))
+
+
+def _max_difference(snapshot: dict, close: pd.Series) -> float:
+    macd = ta.trend.MACD(close=close)
+    expected = {
+        'SMA20': close.rolling(window=20).mean(),
+        'RSI': ta.momentum.RSIIndicator(close=close, window=14).rsi(),
+        'macd': macd.macd(),
+        'signal': macd.macd_signal(),
+    }
+    got = {'SMA20': snapshot['SMA20'], 'RSI': snapshot['RSI'], 'macd': snapshot['MACD']['macd'], 'signal': snapshot['MACD']['signal']}
+    worst = 0.0
+    for name, series in expected.items():
+        series = series.dropna().tail(streaming.KEEP)
+        series.index = series.index.strftime('%Y-%m-%d')
+        assert list(got[name]) == list(series.index), name
+        worst = max(worst, max(abs(got[name][date] - value) for date, value in series.items()))
+    return worst
+
+
+def test_check_against_ta():
+    assert check_against_ta(tolerance=TOLERANCE) <= TOLERANCE
+
+
+def test_seed_matches_ta():
+    hist = _history()
+    engine = IndicatorEngine()
+    engine.seed("TEST", _bars(hist))
+    assert _max_difference(engine.snapshot("TEST"), hist['Close']) <= TOLERANCE
+
+
+def test_update_and_revised_last_bar_match_ta():
+    hist = _history()
+    bars = _bars(hist)
+    engine = IndicatorEngine()
+    engine.seed("TEST", bars[:120])
+    for date, close in bars[120:]:
+        # An intraday value first, then the final close for the same date replaces it
+        engine.update("TEST", date, close * 1.05)
+        engine.update("TEST", date, close)
+    assert _max_difference(engine.snapshot("TEST"), hist['Close']) <= TOLERANCE
+
+
+def test_refresh_after_gap_reseeds(monkeypatch):
+    hist = _history()
+    windows = {"5d": hist.tail(5), "6mo": hist}
+    monkeypatch.setattr(streaming, "get_history", lambda symbol, period="1y": windows[period].copy())
+    engine = IndicatorEngine()
+    # 20 sessions behind: the 5-day window does not reach back to the last seeded bar
+    engine.seed("TEST", _bars(hist.iloc[:120]))
+    snapshot = engine.refresh(["TEST"])["TEST"]
+    assert _max_difference(snapshot, hist['Close']) <= TOLERANCE
+
+
+def test_refresh_within_window_updates(monkeypatch):
+    hist = _history()
+    windows = {"5d": hist.tail(5), "6mo": hist}
+    monkeypatch.setattr(streaming, "get_history", lambda symbol, period="1y": windows[period].copy())
+    engine = IndicatorEngine()
+    engine.seed("TEST", _bars(hist.iloc[:137]))
+    reseeded = []
+    monkeypatch.setattr(engine, "seed_from_history", lambda symbol, period="6mo": reseeded.append(symbol))
+    snapshot = engine.refresh(["TEST"])["TEST"]
+    assert reseeded == []
+    assert _max_difference(snapshot, hist['Close']) <= TOLERANCE
@@ -0,0 +1,29 @@
+import pandas as pd
+import yfinance as yf
+from muti_agent import market_data
+
+
+def test_failed_symbols_are_left_out_and_not_cached(monkeypatch):
+    index = pd.bdate_range(end="2025-06-13", periods=3)
+    good = pd.DataFrame({"Close": [1.0, 2.0, 3.0], "Volume": 1e6}, index=index)
+    calls = []
+
+    def fake_download(symbols, **kwargs):
+        calls.append(sorted(symbols))
+        yf.shared._ERRORS = {
+            "GONE": "YFPricesMissingError('$GONE: possibly delisted; no price data found')",
+            "FAIL": "ConnectionError('Read timed out')",
+        }
+        return pd.concat({"AAA": good}, axis=1)
+
+    monkeypatch.setattr(market_data.yf, "download", fake_download)
+    market_data.clear_cache()
+    try:
+        histories = market_data.get_history_batch(["AAA", "GONE", "FAIL"], start="2025-06-11")
+        assert sorted(histories) == ["AAA", "GONE"]
+        assert histories["GONE"].empty
+        # Only the failed symbol is asked for again
+        market_data.get_history_batch(["AAA", "GONE", "FAIL"], start="2025-06-11")
+        assert calls == [["AAA", "FAIL", "GONE"], ["FAIL"]]
+    finally:
+        market_data.clear_cache()
@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from benchmarks.stubs import StubLlm, stub_agent_tree
+from muti_agent.agent import clone_agent
+from muti_agent.subAgent.news_analysis_pipeline import streaming
+from muti_agent.subAgent.news_analysis_pipeline.agent import news_batch_analyzer, news_request_parser
+from muti_agent.subAgent.news_analysis_pipeline.streaming import StreamingNewsAgent
+
+
+def _agent(model: StubLlm) -> StreamingNewsAgent:
+    agent = StreamingNewsAgent(
+        name="streaming_news_pipeline",
+        sub_agents=[clone_agent(news_request_parser, "test_"), clone_agent(news_batch_analyzer, "test_")],
+        num_url=7,
+    )
+    return stub_agent_tree(agent, model)
+
+
+def _ask(agent: StreamingNewsAgent, prompt: str) -> dict:
+    async def run():
+        runner = InMemoryRunner(agent=agent, app_name="test")
+        session = await runner.session_service.create_session(app_name="test", user_id="test")
+        message = types.Content(role="user", parts=[types.Part(text=prompt)])
+        async for _ in runner.run_async(user_id="test", session_id=session.id, new_message=message):
+            pass
+        session = await runner.session_service.get_session(app_name="test", user_id="test", session_id=session.id)
+        return session.state
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def streamed(monkeypatch):
+    calls = []
+
+    async def fake_stream_news(ticker, num_url=5, deadline_s=None):
+        calls.append((ticker, num_url))
+        yield {"title": "Story", "content": "Text", "url": "https://example.com/a", "labels": {"needs_model": True}}
+
+    monkeypatch.setattr(streaming, "stream_news", fake_stream_news)
+    return calls
+
+
+def test_company_name_is_resolved_by_the_model(streamed):
+    # No ticker-shaped word in the request: the parser maps the company name
+    state = _ask(_agent(StubLlm(delay_s=0, tool_args={"ticker": "$nvda"})), "what happened to nvidia recently?")
+    assert streamed == [("NVDA", 7)]
+    assert "news_analysis_result" in state
+
+
+def test_requested_article_count_is_used(streamed):
+    _ask(_agent(StubLlm(delay_s=0, tool_args={"ticker": "AAPL", "num_url": 20})), "deep dive into Apple news")
+    assert streamed == [("AAPL", 20)]
+
+
+def test_nothing_is_fetched_without_a_ticker(streamed):
+    # The parser asks which stock is meant instead of calling the tool (the stub calls any tool it has)
+    agent = _agent(StubLlm(delay_s=0, text="Which stock do you mean?"))
+    agent.sub_agents[0].tools = []
+    state = _ask(agent, "how are markets doing?")
+    assert streamed == []
+    assert "news_analysis_result" not in state
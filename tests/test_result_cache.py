@@ -0,0 +1,126 @@
+import asyncio
+from typing import List
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from benchmarks.stubs import StubLlm
+from muti_agent.result_cache import ResultCache, get_result_cache, normalize_request, request_ticker, result_cache_callbacks, set_result_cache
+
+OUTPUT_KEY = "technical_analysis_result"
+
+
+def _agent(tools, analyzed: dict) -> LlmAgent:
+    lookup, store, record = result_cache_callbacks(OUTPUT_KEY)
+    return LlmAgent(
+        name="technical_analyzer",
+        model=StubLlm(delay_s=0, tool_args=analyzed, call_all_tools=True),
+        instruction="Analyze the ticker.",
+        tools=tools if isinstance(tools, list) else [tools],
+        output_key=OUTPUT_KEY,
+        before_agent_callback=lookup,
+        after_agent_callback=store,
+        after_tool_callback=record,
+    )
+
+
+def _ask(agent: LlmAgent, prompt: str) -> None:
+    async def run():
+        # A fresh runner and session per request, like two different users
+        runner = InMemoryRunner(agent=agent, app_name="test")
+        session = await runner.session_service.create_session(app_name="test", user_id="test")
+        message = types.Content(role="user", parts=[types.Part(text=prompt)])
+        async for _ in runner.run_async(user_id="test", session_id=session.id, new_message=message):
+            pass
+
+    asyncio.run(run())
+
+
+@pytest.fixture(autouse=True)
+def result_cache():
+    set_result_cache(ResultCache(":memory:"))
+    return get_result_cache()
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def get_prices(calls):
+    def get_historical_prices(ticker_symbol: str) -> dict:
+        """Returns prices."""
+        calls.append(ticker_symbol)
+        return {"close": [1.0]}
+
+    return get_historical_prices
+
+
+def test_same_request_is_served_from_cache(get_prices, calls):
+    agent = _agent(get_prices, {"ticker_symbol": "NVDA"})
+    _ask(agent, "Analyze NVDA")
+    _ask(agent, "analyze  NVDA.")
+    assert calls == ["NVDA"]
+
+
+def test_other_request_about_same_ticker_is_not_served(get_prices, calls):
+    agent = _agent(get_prices, {"ticker_symbol": "NVDA"})
+    _ask(agent, "Analyze NVDA")
+    _ask(agent, "Show NVDA weekly bars over the last 2 years")
+    assert calls == ["NVDA", "NVDA"]
+
+
+def test_misread_ticker_is_not_stored(get_prices, calls, result_cache):
+    # "GOOD" looks like a ticker, but the agent analyzed NVDA
+    agent = _agent(get_prices, {"ticker_symbol": "NVDA"})
+    assert request_ticker("Is nvidia GOOD now") == "GOOD"
+    _ask(agent, "Is nvidia GOOD now")
+    assert result_cache.metrics[OUTPUT_KEY]["stores"] == 0
+
+
+def test_common_words_are_not_tickers():
+    assert request_ticker("Is NVDA a BUY?") == "NVDA"
+    assert request_ticker("TLDR of the DOJ case against GOOGL") == "GOOGL"
+
+
+def test_batch_and_screen_results_are_not_stored(calls, result_cache):
+    def calculate_technical_indicators_batch(ticker_symbols: List[str]) -> dict:
+        """Returns indicators."""
+        calls.append(ticker_symbols)
+        return {}
+
+    def screen_stocks(conditions: List[str], ticker_symbols: List[str]) -> dict:
+        """Returns matches."""
+        calls.append(conditions)
+        return {}
+
+    for tool in (calculate_technical_indicators_batch, screen_stocks):
+        agent = _agent(tool, {"ticker_symbols": ["NVDA"], "conditions": ["rsi < 30"]})
+        _ask(agent, "Analyze NVDA")
+    assert result_cache.metrics[OUTPUT_KEY]["stores"] == 0
+
+
+def test_normalize_request():
+    assert normalize_request("  Analyze $NVDA,  please! ") == "analyze nvda please"
+    assert normalize_request("Analyze BRK.B.") == "analyze brk.b"
+
+
+def test_two_tickers_in_one_turn_are_not_stored(get_prices, result_cache):
+    # Both calls come back in one merged event, whose state delta would only keep the last call's
+    def get_news(ticker: str) -> dict:
+        """Returns news."""
+        return {}
+
+    agent = _agent([get_prices, get_news], {"ticker_symbol": "NVDA", "ticker": "AMD"})
+    _ask(agent, "Analyze NVDA")
+    assert result_cache.metrics[OUTPUT_KEY]["stores"] == 0
+
+
+def test_company_names_are_not_cached(get_prices, calls, result_cache):
+    # request_ticker only knows upper-case symbols
+    agent = _agent(get_prices, {"ticker_symbol": "NVDA"})
+    _ask(agent, "analyze nvidia")
+    _ask(agent, "analyze nvidia")
+    assert calls == ["NVDA", "NVDA"]
+    assert OUTPUT_KEY not in result_cache.metrics
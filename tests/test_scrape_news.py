@@ -0,0 +1,46 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from muti_agent.subAgent.news_analysis_pipeline import tools
+from muti_agent.subAgent.news_analysis_pipeline.cache import ArticleCache, get_article_cache, set_article_cache
+
+STALE = {"news_data": "* **Title:** Old story about the previous ticker", "news_prelabeled": "Title: Old pre-labeled story"}
+
+
+@pytest.fixture
+def article_cache():
+    set_article_cache(ArticleCache(":memory:"))
+    return get_article_cache()
+
+
+def test_no_links_overwrites_previous_ticker_state(article_cache):
+    article_cache.put_links("NVDA", [])
+    context = SimpleNamespace(state=dict(STALE))
+
+    summary = asyncio.run(tools.scrape_news("NVDA", tool_context=context))
+
+    assert summary["articles"] == 0
+    assert "NVDA" in context.state["news_data"]
+    assert "previous ticker" not in context.state["news_data"]
+    assert context.state["news_prelabeled"] == ""
+
+
+def test_every_fetch_failing_overwrites_previous_ticker_state(article_cache, monkeypatch):
+    article_cache.put_links("NVDA", [{"url": "https://finance.yahoo.com/news/a.html", "title": "A"}])
+
+    async def failing_fetch(url, pool=None):
+        return {"error": "Error extracting content: timeout"}
+
+    monkeypatch.setattr(tools, "get_yahoo_article_content", failing_fetch)
+    context = SimpleNamespace(state=dict(STALE))
+
+    summary = asyncio.run(tools.scrape_news("NVDA", tool_context=context))
+
+    assert summary["failed"] == 1
+    assert "previous ticker" not in context.state["news_data"]
+    assert context.state["news_prelabeled"] == ""
+
+
+def test_no_links_without_agent_returns_empty_list(article_cache):
+    article_cache.put_links("NVDA", [])
+    assert asyncio.run(tools.scrape_news("NVDA")) == []
@@ -0,0 +1,131 @@
+import datetime
+import numpy as np
+import pandas as pd
+import ta
+from muti_agent.result_cache import MARKET_TIMEZONE
+from muti_agent.subAgent.technical_analyzer import screener
+
+AFTER_CLOSE = datetime.datetime(2025, 6, 13, 18, 0, tzinfo=MARKET_TIMEZONE)
+
+
+def _bars(start: str, end: str) -> pd.DataFrame:
+    index = pd.bdate_range(start=start, end=end, tz="America/New_York")
+    return pd.DataFrame({"Close": range(100, 100 + len(index)), "Volume": 1e6}, index=index, dtype=float)
+
+
+def test_sync_downloads_only_new_bars_and_remembers_empty_symbols(tmp_path, monkeypatch):
+    store = screener.PriceStore(str(tmp_path))
+    year = _bars("2024-06-13", "2025-06-13")
+    store.append("AAA", year, until=datetime.date(2025, 6, 10))
+    calls = []
+
+    def fake_batch(symbols, period="1y", start=None):
+        calls.append((sorted(symbols), start))
+        since = year[year.index >= pd.Timestamp(start, tz="America/New_York")] if start else year
+        histories = {"AAA": since, "NEW": year}
+        return {symbol: histories.get(symbol, pd.DataFrame()) for symbol in symbols}
+
+    monkeypatch.setattr(screener, "get_history_batch", fake_batch)
+    result = screener.sync(["AAA", "NEW", "GONE"], store=store, now=AFTER_CLOSE)
+
+    # Stored symbols overlap their last bar, to notice a re-adjusted history
+    assert sorted(calls) == [(["AAA"], "2025-06-10"), (["GONE", "NEW"], None)]
+    assert result["synced"] == 3
+    assert store.last_date("AAA") == datetime.date(2025, 6, 13)
+    assert store.last_date("NEW") == datetime.date(2025, 6, 13)
+
+    # Everything, including the symbol Yahoo had nothing for, is synced until the next session
+    calls.clear()
+    assert screener.sync(["AAA", "NEW", "GONE"], store=store, now=AFTER_CLOSE)["synced"] == 0
+    assert calls == []
+
+
+def test_halted_symbol_is_screened_on_its_own_bars(tmp_path):
+    store = screener.PriceStore(str(tmp_path))
+    days = pd.bdate_range(end="2025-06-13", periods=126, tz="America/New_York")
+    rng = np.random.default_rng(5)
+    closes = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days)))), index=days)
+    halted = closes.drop(days[-8])
+    store.append("FULL", pd.DataFrame({"Close": closes, "Volume": 1e6}))
+    store.append("HALT", pd.DataFrame({"Close": halted, "Volume": 1e6}))
+
+    result = screener.screen(["close > 0"], store=store, sort_by="close")
+    fields = {row["symbol"]: row for row in result["results"]}
+
+    assert result["as_of"] == "2025-06-13"
+    assert fields["HALT"]["sma20"] == round(halted.tail(20).mean(), 2)
+    assert fields["HALT"]["rsi"] == round(ta.momentum.RSIIndicator(close=halted.tail(screener.SCREEN_LOOKBACK), window=14).rsi().iloc[-1], 2)
+    assert fields["HALT"]["return_5d"] == round((halted.iloc[-1] / halted.iloc[-6] - 1) * 100, 2)
+
+
+def test_symbol_without_latest_session_gets_no_fields(tmp_path):
+    store = screener.PriceStore(str(tmp_path))
+    store.append("AAA", _bars("2025-01-01", "2025-06-13"))
+    store.append("OLD", _bars("2025-01-01", "2025-06-12"))
+    result = screener.screen(["close > 0"], store=store)
+    assert [row["symbol"] for row in result["results"]] == ["AAA"]
+    assert result["traded_last_session"] == 1
+
+
+def test_split_rewrites_the_symbol(tmp_path, monkeypatch):
+    store = screener.PriceStore(str(tmp_path))
+    store.append("AAA", _bars("2025-01-01", "2025-06-10") * 4)
+    # Yahoo re-adjusted the whole history for a 4:1 split
+    adjusted = _bars("2024-06-13", "2025-06-13")
+    monkeypatch.setattr(screener, "get_history_batch", lambda symbols, period="1y", start=None: {
+        "AAA": adjusted[adjusted.index >= pd.Timestamp(start, tz="America/New_York")] if start else adjusted,
+    })
+
+    result = screener.sync(["AAA"], store=store, now=AFTER_CLOSE)
+
+    assert result["rebased"] == 1
+    stored = store.read("AAA")
+    assert len(stored["date"]) == len(adjusted)
+    assert np.allclose(stored["close"], adjusted["Close"].to_numpy())
+    assert store.symbols() == ["AAA"]
+
+
+def test_append_drops_a_half_written_bar(tmp_path):
+    store = screener.PriceStore(str(tmp_path))
+    store.append("AAA", _bars("2025-06-02", "2025-06-10"))
+    # A write that died after the close but before the date
+    with open(store._file("AAA", "close"), "ab") as f:
+        f.write(np.float64(999.0).tobytes())
+    store.append("AAA", _bars("2025-06-11", "2025-06-13"))
+    stored = store.read("AAA")
+    assert len(stored["close"]) == len(stored["date"]) == 10
+    assert 999.0 not in stored["close"]
+    assert list(stored["close"][-3:]) == [100.0, 101.0, 102.0]
+
+
+def test_failed_download_is_retried(tmp_path, monkeypatch):
+    store = screener.PriceStore(str(tmp_path))
+    year = _bars("2024-06-13", "2025-06-13")
+    # get_history_batch leaves out the symbols whose download failed
+    monkeypatch.setattr(screener, "get_history_batch", lambda symbols, period="1y", start=None: {s: year for s in symbols if s != "FAIL"})
+
+    result = screener.sync(["AAA", "FAIL"], store=store, now=AFTER_CLOSE)
+
+    assert (result["synced"], result["failed"]) == (1, 1)
+    assert store.is_synced("AAA", datetime.date(2025, 6, 13))
+    assert not store.is_synced("FAIL", datetime.date(2025, 6, 13))
+
+
+def test_screen_stocks_syncs_stored_symbols(tmp_path, monkeypatch):
+    from muti_agent.subAgent.technical_analyzer import tools
+
+    store = screener.PriceStore(str(tmp_path))
+    year = _bars("2024-06-13", "2025-06-13")
+    store.append("AAA", year, until=datetime.date(2025, 6, 6))
+    monkeypatch.setattr(screener, "get_price_store", lambda: store)
+    monkeypatch.setattr(tools, "get_price_store", lambda: store)
+    monkeypatch.setattr(tools, "SCREEN_UNIVERSE", [])
+    monkeypatch.setattr(tools, "sync", lambda symbols: screener.sync(symbols, store=store, now=AFTER_CLOSE))
+    monkeypatch.setattr(screener, "get_history_batch", lambda symbols, period="1y", start=None: {
+        s: year[year.index >= pd.Timestamp(start, tz="America/New_York")] for s in symbols
+    })
+
+    result = tools.screen_stocks(["close > 0"])
+
+    assert result["as_of"] == "2025-06-13"
+    assert "not_updated" not in result
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+from muti_agent.subAgent.technical_analyzer import tools
+
+
+def _history(dates: pd.DatetimeIndex, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+    return pd.DataFrame({"Close": close, "Volume": 1e6}, index=dates)
+
+
+def _flatten(result: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def test_batch_matches_single_ticker_for_gapped_calendars(monkeypatch):
+    us_days = pd.bdate_range(end="2025-06-13", periods=126, tz="America/New_York")
+    # Another exchange's holidays plus a halt, and a recent listing: dates the others do not share
+    other_days = us_days.delete([10, 11, 40, 75, 76, 77, 100])
+    recent_days = us_days[-60:]
+    histories = {"US": _history(us_days, 1), "OTHER": _history(other_days, 2), "RECENT": _history(recent_days, 3)}
+
+    monkeypatch.setattr(tools, "get_history_batch", lambda symbols, period="1y": {s: histories[s].copy() for s in symbols})
+    monkeypatch.setattr(tools, "get_history", lambda symbol, period="1y": histories[symbol].copy())
+
+    batch = tools.calculate_technical_indicators_batch(list(histories))
+    for symbol in histories:
+        single = _flatten(tools.calculate_technical_indicators(symbol))
+        together = _flatten(batch[symbol])
+        assert single.keys() == together.keys()
+        for key, value in single.items():
+            assert together[key] == pytest.approx(value, rel=1e-9), (symbol, key)